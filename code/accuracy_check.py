@@ -0,0 +1,240 @@
+'''
+This module is used to check the numerical accuracy of the direct and inverse discrete Fourier transforms before a backend is replaced with a faster one.
+The result of each backend is compared with a reference calculated by the forward formula in extended precision ("numpy.longdouble", the angles k*n are reduced modulo N_FRAMES),
+    the error is the relative error ||result - reference|| / ||reference|| and must not exceed the tolerance of the backend:
+    TOLERANCE * eps * log2(N_FRAMES) for the fast algorithms and TOLERANCE * eps * N_FRAMES for the sums of the forward formula (the error of the angles grows with N_FRAMES).
+Backends: forward - "dft" ("fourier_transform.py"), "DFT" ("fourier_transform_in_parallel.py"), "fft" with each algorithm ("fast_fourier_transform.py");
+    inverse - "inverse_fourier_transform" (whole and half spectrum), "iDFT" ("inverse_fourier_transform_in_parallel.py"), "ifft" and "hermitian_ifft";
+    round trip - the inverse of the result of the forward transform of the same family.
+Inputs: random data, a sum of tones ("signal_generator"), and worst cases (an impulse, the full-scale Nyquist frequency, a full-scale constant with small noise).
+Modes: "float64" - the data of 16-bit signals; "float32" - the data and the spectra are rounded to single precision (32-bit floating point ".wav" files, "complex64" ".spec" files).
+    (note: the reference is calculated from the rounded data, so the tolerance of the mode is for the arithmetic of the backend and the rounding of its result.)
+Run the module directly ("python accuracy_check.py"): the table of errors is printed and the exit code is 1 if any backend exceeds its tolerance.
+'''
+
+import contextlib
+import io
+import sys
+
+import numpy as np
+
+PI = np.longdouble("3.14159265358979323846264338327950288")
+TOLERANCE = 10.0 # Allowed error in units of eps*log2(N_FRAMES) (fast algorithms) or eps*N_FRAMES (forward formula)
+SIZES = (16, 64, 256, 1000, 1024, 4096) # Sizes of the checked signals (the fast algorithms use only the powers of two)
+DIRECT_MAX = 1024 # The backends with loops over the frames in Python are checked up to this size
+MODES = {'float64': np.float64, 'float32': np.float32}
+references = {} # Reference transforms for each (input, mode, size)
+
+def reference_dft(data, inverse=False):
+
+    '''
+    This function is used to calculate the reference discrete Fourier transform by the forward formula in extended precision.
+    The following parameters are passed to the function:
+        data ("numpy.ndarray") - the signal data (or the whole spectrum if inverse=True);
+        inverse ("bool") - if "True", the inverse transform (the sign of the angle is positive and the sum is divided by N_FRAMES).
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.clongdouble") - values of the transform (N_FRAMES values).
+    '''
+
+    data = np.asarray(data).astype(np.clongdouble)
+    N_FRAMES = data.size
+    sign = 1 if inverse else -1
+
+    # The table of exp(sign*2j*pi*m/N_FRAMES), m = 0 ... N_FRAMES-1, in extended precision; the angle k*n is taken by the index (k*n) % N_FRAMES.
+    angle = 2*PI*np.arange(N_FRAMES, dtype=np.longdouble)/N_FRAMES
+    table = np.cos(angle) + sign*1j*np.sin(angle).astype(np.clongdouble)
+
+    n = np.arange(N_FRAMES)
+    FT = np.empty(shape=N_FRAMES, dtype=np.clongdouble)
+    for k_start in range(0, N_FRAMES, 256):
+        k = np.arange(k_start, min(k_start + 256, N_FRAMES))[:, None]
+        FT[k_start:k_start + k.size] = (table[(k*n) % N_FRAMES] * data).sum(axis=1)
+
+    return FT / N_FRAMES if inverse else FT
+
+def test_signal(kind, N_FRAMES, mode):
+
+    '''
+    This function is used to create a checked signal.
+    The following parameters are passed to the function:
+        kind ("str" "random", "tone", "impulse", "nyquist" or "dc_offset") - the input;
+        N_FRAMES ("int") - number of frames;
+        mode ("str" "float64" or "float32") - the precision of the data.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.float64" or "numpy.float32") - signal data (the values of 16-bit signals).
+    '''
+
+    rng = np.random.default_rng(N_FRAMES)
+
+    if kind == "random":
+        data_signal = rng.integers(-32768, 32768, size=N_FRAMES)
+    elif kind == "tone":
+        import signal_generator
+        RATE = 8000
+        data_signal = signal_generator.generate_signal_sum(N_FRAMES/RATE, RATE, (440, 1000.5, 3321), CHUNK=1)[:N_FRAMES]
+    elif kind == "impulse":
+        data_signal = np.zeros(shape=N_FRAMES)
+        data_signal[0] = 32767 # All the bins are equal
+    elif kind == "nyquist":
+        data_signal = np.where(np.arange(N_FRAMES) % 2 == 0, 32767, -32768) # All the energy in the bin at the Nyquist frequency
+    elif kind == "dc_offset":
+        data_signal = 32000 + rng.integers(-8, 9, size=N_FRAMES) # The small bins next to a large one
+    else:
+        raise ValueError(f'The input "{kind}" is not supported.')
+
+    return np.asarray(data_signal, dtype=MODES[mode])
+
+def reference(kind, N_FRAMES, mode):
+
+    '''
+    This function is used to get the signal and its reference spectrum (the whole spectrum, calculated once for each input).
+    '''
+
+    key = (kind, N_FRAMES, mode)
+    if key not in references:
+        data_signal = test_signal(kind, N_FRAMES, mode)
+        references[key] = (data_signal, reference_dft(data_signal))
+    return references[key]
+
+def forward_backends():
+
+    '''
+    This function is used to get the checked forward transforms: name -> (function of the signal returning the spectrum from 0 to the Nyquist frequency, "fast" or "direct").
+    '''
+
+    import fourier_transform
+    import fourier_transform_in_parallel
+    import fast_fourier_transform
+
+    backends = {
+        'dft': (fourier_transform.dft, "direct"),
+        'DFT (in parallel)': (lambda x: fourier_transform_in_parallel.DFT(0, int(len(x)/2) + 1, len(x), x), "direct")
+    }
+    for kernel in fast_fourier_transform.KERNELS:
+        backends[f'fft ({kernel})'] = (lambda x, kernel=kernel: fast_fourier_transform.fft(x, kernel)[:int(len(x)/2) + 1], "fast")
+    return backends
+
+def inverse_backends():
+
+    '''
+    This function is used to get the checked inverse transforms: name -> (function of the whole spectrum returning the real frames, "fast" or "direct").
+        The backends with mirror_image=True receive the spectrum from 0 to the Nyquist frequency.
+    '''
+
+    import hermitian_inverse
+    import inverse_fourier_transform
+    import inverse_fourier_transform_in_parallel
+    import inverse_fast_fourier_transform
+
+    half = lambda FT: np.ascontiguousarray(FT[:int(len(FT)/2) + 1])
+    return {
+        'inverse_fourier_transform': (lambda FT: inverse_fourier_transform.inverse_fourier_transform(FT)[0].real, "direct"),
+        'inverse_fourier_transform (half)': (lambda FT: inverse_fourier_transform.inverse_fourier_transform(half(FT), True)[0], "direct"),
+        'iDFT (in parallel)': (lambda FT: inverse_fourier_transform_in_parallel.iDFT(0, len(FT), len(FT), FT).real, "direct"),
+        'iDFT (in parallel, half)': (lambda FT: inverse_fourier_transform_in_parallel.iDFT(0, len(FT), len(FT), half(FT)).real, "direct"),
+        'ifft': (lambda FT: inverse_fast_fourier_transform.ifft(FT).real, "fast"),
+        'hermitian_ifft': (lambda FT: hermitian_inverse.hermitian_ifft(half(FT)), "fast")
+    }
+
+def tolerance(kind_of_backend, N_FRAMES, mode):
+
+    '''
+    This function is used to get the allowed relative error of a backend.
+    '''
+
+    eps = np.finfo(MODES[mode]).eps
+    growth = N_FRAMES if kind_of_backend == "direct" else max(1.0, np.log2(N_FRAMES))
+    return TOLERANCE * eps * growth
+
+def relative_error(result, expected):
+
+    '''
+    This function is used to calculate the relative error ||result - expected|| / ||expected|| in extended precision.
+    '''
+
+    expected = np.asarray(expected, dtype=np.clongdouble)
+    difference = np.asarray(result).astype(np.clongdouble) - expected
+    norm = np.sqrt((abs(expected)**2).sum())
+    return float(np.sqrt((abs(difference)**2).sum()) / norm) if norm > 0 else float(np.sqrt((abs(difference)**2).sum()))
+
+def supported(kind_of_backend, N_FRAMES):
+
+    '''
+    This function is used to check whether a backend is checked at a size (the fast algorithms need a power of two, the direct ones are slow for long signals).
+    '''
+
+    if kind_of_backend == "fast":
+        return N_FRAMES & (N_FRAMES - 1) == 0
+    return N_FRAMES <= DIRECT_MAX
+
+def quietly(function, *arguments):
+
+    '''
+    This function is used to call a backend without printing its progress messages.
+    '''
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*arguments)
+
+def accuracy_check(sizes=SIZES, inputs=("random", "tone", "impulse", "nyquist", "dc_offset"), modes=tuple(MODES), verbose=True):
+
+    '''
+    This function allows you to check the accuracy of all backends of the direct and inverse transforms.
+    The following parameters are passed to the function:
+        sizes ("list" or "tuple" of "int") - the numbers of frames of the checked signals;
+        inputs ("list" or "tuple" of "str") - the checked inputs (please refer to "test_signal");
+        modes ("list" or "tuple" of "str") - the precision modes ("float64", "float32");
+        verbose ("bool") - if "True", the table of errors is printed.
+    The result of the function:
+        Return values:
+            results ("list" of "tuple" (check, backend, mode, input, N_FRAMES, error, tolerance)) - the errors of all checks ("check" is "forward", "inverse" or "round trip");
+            failures ("list" of "tuple") - the checks whose error exceeds the tolerance.
+    '''
+
+    forward, inverse = forward_backends(), inverse_backends()
+    # The round trip uses the inverse of the same family as the forward transform.
+    pairs = {'dft': 'inverse_fourier_transform (half)', 'DFT (in parallel)': 'iDFT (in parallel, half)'}
+
+    results = []
+    for mode in modes:
+        store = np.complex64 if mode == "float32" else np.complex128 # The precision in which the spectra are stored in this mode
+        for kind in inputs:
+            for N_FRAMES in sizes:
+                data_signal, FT_reference = reference(kind, N_FRAMES, mode)
+                half_reference = FT_reference[:int(N_FRAMES/2) + 1]
+                FT_stored = FT_reference.astype(store).astype(np.complex128)
+                inverse_reference = reference_dft(FT_stored, inverse=True).real
+
+                spectra = {}
+                for name, (function, kind_of_backend) in forward.items():
+                    if supported(kind_of_backend, N_FRAMES):
+                        spectra[name] = quietly(function, data_signal).astype(store)
+                        results.append(("forward", name, mode, kind, N_FRAMES, relative_error(spectra[name], half_reference), tolerance(kind_of_backend, N_FRAMES, mode)))
+
+                for name, (function, kind_of_backend) in inverse.items():
+                    if supported(kind_of_backend, N_FRAMES):
+                        frames = quietly(function, FT_stored)
+                        results.append(("inverse", name, mode, kind, N_FRAMES, relative_error(frames, inverse_reference), tolerance(kind_of_backend, N_FRAMES, mode)))
+
+                for name, FT in spectra.items():
+                    inverse_name = pairs.get(name, 'hermitian_ifft')
+                    function, kind_of_backend = inverse[inverse_name]
+                    frames = quietly(function, np.concatenate([FT, np.conjugate(FT[-2:0:-1])]).astype(np.complex128))
+                    growth = "direct" if "direct" in (kind_of_backend, forward[name][1]) else "fast"
+                    results.append(("round trip", f"{name} -> {inverse_name}", mode, kind, N_FRAMES, relative_error(frames, data_signal), 2*tolerance(growth, N_FRAMES, mode)))
+
+    failures = [result for result in results if not result[5] <= result[6]]
+
+    if verbose:
+        print(f"{'check':<11} | {'backend':<52} | {'mode':<7} | {'input':<9} | {'N_FRAMES':>8} | {'error':>9} | {'tolerance':>9}")
+        for check, name, mode, kind, N_FRAMES, error, limit in results:
+            print(f"{check:<11} | {name:<52} | {mode:<7} | {kind:<9} | {N_FRAMES:>8} | {'%9.1e' % error} | {'%9.1e' % limit}{'' if error <= limit else '  FAILED'}")
+        print(f"{len(results) - len(failures)} of {len(results)} checks are within the tolerance.")
+
+    return results, failures
+
+if __name__ == "__main__":
+    results, failures = accuracy_check()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,347 @@
+'''
+This module is used to analyse many files with the extension ".wav" (for example, tens of thousands of recordings of a nightly job) in one persistent pool of processes.
+Whole files are distributed between the processes (instead of parallelizing one transform of one file, as "fourier_transform_in_parallel" does with a new pool for each file):
+    the files are sorted by size and the largest are sent first, and a free process takes the next task from the common queue,
+    so the small files fill the processes that finished early (the load is balanced by the size of the files);
+    a file larger than SPLIT_FRAMES frames is split into "parts" decimated signals x[p::parts], whose "fft" are calculated in different processes
+    and combined by one radix-"parts" step of the fast Fourier transform (the parallel FFT of one large file).
+The analysis of a file: the spectrum (the signal is padded with zeros to a power of two, the channels are averaged) and its features ("spectral_features.py").
+The results are passed to a "sink" as soon as they are calculated (for example, "jsonl_sink" writes one line per file), and the throughput of each process and the depth of the queue are reported.
+'''
+
+import glob
+import json
+import os
+import time # Used to calculate the throughput of the processes
+
+import numpy as np
+
+import wave_worker
+
+SPLIT_FRAMES = 2**24 # Files with more frames are split between the processes
+MAX_PARTS = 8 # Maximum number of parts of a split file (a power of two)
+PENDING_PER_WORKER = 2 # Number of the tasks sent to the pool for each process (the other tasks wait in the queue of the driver)
+REPORT_SECONDS = 10.0 # Interval between the progress messages
+
+def analysis_sources(source):
+
+    '''
+    This function is used to find the files to analyse.
+    The following parameters are passed to the function:
+        source ("str" or "list" of "str") - a folder (all ".wav" files in it and its subfolders), a path with wildcards or a list of paths.
+    The result of the function:
+        Return values:
+            files ("list" of "tuple" ("str", "int")) - the paths to the files and their sizes in bytes, from the largest file.
+    '''
+
+    if type(source) == str:
+        if os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, "**", "*.wav"), recursive=True)
+        else:
+            paths = glob.glob(source, recursive=True) if glob.has_magic(source) else [source]
+    else:
+        paths = list(source)
+
+    files = [(path, os.path.getsize(path)) for path in sorted(set(paths))]
+    files.sort(key=lambda file: -file[1])
+    return files
+
+def read_mono(path_to_signal):
+
+    '''
+    This function is used to read a file with the extension ".wav" as a mono signal (the channels are averaged, 16-bit and 32-bit data is memory-mapped).
+    '''
+
+    data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = wave_worker.wave_read(path_to_signal, USE_MMAP=True)
+    if CHANNELS > 1:
+        data_signal = data_signal.reshape(-1, CHANNELS).mean(axis=1)
+    return data_signal, N_FRAMES, RATE
+
+def padded_size(N_FRAMES):
+
+    '''
+    This function is used to get the number of frames of the transform: the smallest power of two not less than N_FRAMES.
+    '''
+
+    return 1 << max(0, N_FRAMES - 1).bit_length()
+
+def spectrum_result(path_to_signal, FT, N_FRAMES, RATE, N):
+
+    '''
+    This function is used to make the result of the analysis of a file from its spectrum (N_FRAMES frames padded with zeros to N frames).
+    '''
+
+    import spectral_features
+
+    FT = FT[:int(N/2) + 1]
+    amplitude = 2*abs(FT)/max(N_FRAMES, 1) # Normalized signal amplitude
+    frequency = np.arange(FT.size) * RATE / N
+    return {
+        'path': path_to_signal,
+        'N_FRAMES': N_FRAMES,
+        'RATE': RATE,
+        'record': spectral_features.spectral_features(amplitude, frequency)
+    }
+
+def analyze_file(path_to_signal):
+
+    '''
+    This function is used to analyse one file. (note: It is executed in the pool of processes of "analyze_files".)
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav".
+    The result of the function:
+        Return values:
+            result ("dict") - "path", "N_FRAMES", "RATE", "record" (the features, "spectral_features.record_dtype") and
+                "worker" (the identifier of the process), "seconds" (the time of the calculation), "frames" (the number of processed frames).
+    '''
+
+    import fast_fourier_transform
+
+    start_time = time.perf_counter()
+    data_signal, N_FRAMES, RATE = read_mono(path_to_signal)
+    N = padded_size(N_FRAMES)
+    FT = fast_fourier_transform.fft(np.pad(np.asarray(data_signal, dtype=np.float64), (0, N - N_FRAMES)))
+
+    result = spectrum_result(path_to_signal, FT, N_FRAMES, RATE, N)
+    result.update(worker=os.getpid(), seconds=time.perf_counter() - start_time, frames=N_FRAMES)
+    return result
+
+def analyze_part(path_to_signal, part, parts):
+
+    '''
+    This function is used to calculate the "fft" of the decimated signal x[part::parts] of a large file. (note: It is executed in the pool of processes of "analyze_files".)
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav";
+        part ("int") - the number of the part (from 0 to parts - 1);
+        parts ("int" and a power of two) - number of parts.
+    The result of the function:
+        Return values:
+            result ("dict") - "path", "part", "parts", "FT" (the spectrum of the part, N/parts values), "N_FRAMES", "RATE", "worker", "seconds", "frames".
+    '''
+
+    import fast_fourier_transform
+
+    start_time = time.perf_counter()
+    data_signal, N_FRAMES, RATE = read_mono(path_to_signal)
+    M = padded_size(N_FRAMES) // parts
+    frames = np.asarray(data_signal[part::parts], dtype=np.float64)
+    FT = fast_fourier_transform.fft(np.pad(frames, (0, M - frames.size)))
+
+    return {
+        'path': path_to_signal,
+        'part': part,
+        'parts': parts,
+        'FT': FT,
+        'N_FRAMES': N_FRAMES,
+        'RATE': RATE,
+        'worker': os.getpid(),
+        'seconds': time.perf_counter() - start_time,
+        'frames': frames.size
+    }
+
+def combine_parts(spectra):
+
+    '''
+    This function is used to combine the spectra of the decimated signals into the spectrum of the whole signal (one radix-"parts" step of the fast Fourier transform):
+        X[k1*M + k2] = sum(exp(-2j*pi*p*k1/parts) * exp(-2j*pi*p*k2/N) * F_p[k2]), p = 0 ... parts - 1, M = N/parts.
+    The following parameters are passed to the function:
+        spectra ("list" of "numpy.ndarray") - the spectra F_p of the parts (in the order of the parts).
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - the spectrum of the signal (N values).
+    '''
+
+    import fast_fourier_transform
+
+    parts, M = len(spectra), spectra[0].size
+    N = parts*M
+    twiddled = np.stack(spectra) * np.exp(-2j*np.pi*np.arange(parts)[:, None]*np.arange(M)/N)
+    return fast_fourier_transform.fft(np.ascontiguousarray(twiddled.T)).T.reshape(N) # The transforms over p for each k2
+
+def error_result(path_to_signal, error):
+
+    '''
+    This function is used to create the result of a file that cannot be analysed (the path to the file and the description of the error).
+    '''
+
+    return {'path': path_to_signal, 'error': f"{type(error).__name__}: {error}"}
+
+def jsonl_sink(path_to_output="../data/analysis.jsonl"):
+
+    '''
+    This function is used to create a sink that writes the result of each file as one line in the ".json" format (the file is written as the results arrive).
+    The following parameters are passed to the function:
+        path_to_output ("str") - the path to the file with the results.
+    The result of the function:
+        Return values:
+            sink (function of one "dict") - the sink for "analyze_files" (the file is closed by calling sink(None)). The result of a file with an error is written as {"path", "error"}.
+    '''
+
+    os.makedirs(os.path.dirname(path_to_output) or '.', exist_ok=True)
+    file = open(path_to_output, 'w', encoding='utf-8')
+
+    def sink(result):
+        if result is None:
+            file.close()
+            return
+        if 'error' in result:
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            return
+        line = {'path': result['path'], 'N_FRAMES': result['N_FRAMES'], 'RATE': result['RATE']}
+        for field in result['record'].dtype.names:
+            line[field] = np.nan_to_num(result['record'][field], nan=0.0).tolist()
+        file.write(json.dumps(line) + "\n")
+        file.flush()
+
+    return sink
+
+def print_workers(statistics, wall_time, depths):
+
+    '''
+    This function is used to print the throughput of each process and the depth of the queue.
+    The following parameters are passed to the function:
+        statistics ("dict") - identifier of the process -> [number of tasks, number of frames, time in seconds];
+        wall_time ("float") - total time in seconds;
+        depths ("list" of "int") - the depth of the queue (the tasks that are not finished) after each finished task.
+    '''
+
+    print(f"Throughput of the processes:")
+    for worker, (tasks, frames, seconds) in sorted(statistics.items()):
+        throughput = frames / seconds if seconds > 0 else float('inf')
+        print(f"\tprocess {worker:<8} tasks: {tasks:<6} busy: {'%6.1f' % (100*seconds/wall_time if wall_time > 0 else 0)}% \t throughput: {'%14.1f' % throughput} frames/second")
+    if depths:
+        print(f"Queue depth: maximum {max(depths)}, mean {'%.1f' % (sum(depths)/len(depths))}.")
+    print(f"Total time spent {'%.3f' % wall_time} seconds.\n")
+
+def analyze_files(source="../data/examples", sink=None, workers=None, executor=None):
+
+    '''
+    This function allows you to analyse many files with the extension ".wav" in a pool of processes.
+    The following parameters are passed to the function:
+        source ("str" or "list" of "str") - a folder, a path with wildcards or a list of paths (please refer to "analysis_sources");
+        sink (function of one "dict" or None) - it is called with the result of each file as soon as it is calculated (please refer to "analyze_file"). If None, the results are returned;
+            a file that cannot be read or analysed does not stop the analysis, its result is {"path", "error"} (please refer to "error_result");
+        workers ("int" and greater than 0 or None) - number of processes. If None, the number of cores;
+        executor ("concurrent.futures.ProcessPoolExecutor" or None) - the pool of processes. If None, a pool is created for this call
+            (pass the same pool to several calls so that the processes are not started again; pass its number of processes as "workers",
+            the tasks are split and queued according to "workers").
+    The result of the function:
+        Return values:
+            results ("list" of "dict") - the results of the files in the order of completion (empty if "sink" is passed).
+        The throughput of each process and the depth of the queue will be printed.
+    '''
+
+    import concurrent.futures
+
+    files = analysis_sources(source)
+    if workers is None:
+        workers = os.cpu_count()
+    workers = max(1, workers)
+
+    # The tasks: the large files are split into parts (at most the number of processes), the files are already sorted from the largest.
+    tasks = []
+    errors = [] # The results of the files that cannot be analysed
+    for path, size in files:
+        try:
+            N_FRAMES = wave_worker.wave_info(path)[0]
+        except Exception as error:
+            errors.append(error_result(path, error))
+            continue
+        parts = min(MAX_PARTS, 1 << (workers.bit_length() - 1))
+        if N_FRAMES > SPLIT_FRAMES and parts > 1:
+            tasks.extend((analyze_part, path, part, parts) for part in range(parts))
+        else:
+            tasks.append((analyze_file, path))
+    tasks.reverse() # The next task is taken from the end of the list
+
+    print(f"The beginning of the analysis: {len(files)} files ({sum(size for path, size in files)/2**20:.1f} MB), {len(tasks)} tasks, {workers} processes.")
+    start_time = time.perf_counter()
+    last_report = start_time
+
+    results = []
+    statistics = {}
+    depths = []
+    split_parts = {} # path -> the spectra of the finished parts
+    failed = set(result['path'] for result in errors) # The paths of the files with an error (the other parts of a split file are skipped)
+    paths = {} # future -> the path to the file of the task
+    done = 0
+
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        for result in errors:
+            done += 1
+            if sink is None:
+                results.append(result)
+            else:
+                sink(result)
+
+        pending = set()
+        while tasks or pending:
+            # Only a few tasks are sent to the pool, so the free processes take the largest of the remaining tasks and the memory of the results is limited.
+            while tasks and len(pending) < PENDING_PER_WORKER*workers:
+                function, *arguments = tasks.pop()
+                future = executor.submit(function, *arguments)
+                paths[future] = arguments[0]
+                pending.add(future)
+
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                path = paths.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    if path in failed:
+                        continue # The error of the file has already been reported by another part
+                    failed.add(path)
+                    split_parts.pop(path, None)
+                    tasks = [task for task in tasks if task[1] != path] # The parts of the file that have not been sent are dropped
+                    result = error_result(path, error)
+                    errors.append(result)
+                    done += 1
+                    if sink is None:
+                        results.append(result)
+                    else:
+                        sink(result)
+                    continue
+
+                worker = statistics.setdefault(result['worker'], [0, 0, 0.0])
+                worker[0] += 1
+                worker[1] += result['frames']
+                worker[2] += result['seconds']
+
+                if path in failed:
+                    continue # Another part of the file has failed
+                if 'part' in result:
+                    spectra = split_parts.setdefault(result['path'], {})
+                    spectra[result['part']] = result['FT']
+                    if len(spectra) < result['parts']:
+                        continue # The other parts of the file are not finished yet
+                    FT = combine_parts([spectra[part] for part in range(result['parts'])])
+                    del split_parts[result['path']]
+                    result = spectrum_result(result['path'], FT, result['N_FRAMES'], result['RATE'], FT.size)
+
+                done += 1
+                if sink is None:
+                    results.append(result)
+                else:
+                    sink(result)
+
+            depths.append(len(tasks) + len(pending))
+            if time.perf_counter() - last_report > REPORT_SECONDS:
+                last_report = time.perf_counter()
+                print(f"Analysis progress: {done}/{len(files)} files, queue depth {depths[-1]}.")
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+    wall_time = time.perf_counter() - start_time
+    print(f"The end of the analysis: {done} files ({len(errors)} with errors).")
+    print_workers(statistics, wall_time, depths)
+    return results
+
+if __name__ == "__main__":
+    analyze_files("../data/examples", jsonl_sink("../data/analysis.jsonl"), workers=2)
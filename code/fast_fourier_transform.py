@@ -11,53 +11,302 @@ import numpy as np
 
 import wave_worker
 import isPowerOfTwo
-import building_a_fourier_transform_graph
+import progress
 
-def fft(data_signal):
+LEAF = 32 # Size of the transforms calculated directly by the matrix of the discrete Fourier transform in "fft_radix2" (the recursion stops at this size)
+leaf_matrices = {} # Matrices of the discrete Fourier transform for the sizes up to LEAF
+stage_twiddles = {} # Twiddle factors of the radix-4 stages for each number of rows
+W16 = np.exp(-2j*np.pi*np.arange(16)/16) # exp(-2j*pi*m/16), the constants of the codelets
+
+def fft(data_signal, kernel=None, token=None):
     
     '''
     This function is used to calculate the discrete Fourier transform using the fast Fourier transform algorithm. (note: It is used for "fast_fourier_transform" but can also be used independently.)
+        Note: A two-dimensional array is a batch of signals of the same length (one signal per row), the transform is calculated for each row.
     The following parameters are passed to the function:
-        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data. (note: the amount of data should be a power of two)
+        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data. (note: the amount of data should be a power of two);
+        kernel ("str" "radix2", "radix4" or "four_step", or None) - the algorithm. If None, the algorithm chosen for this size by "select_kernels"
+            (by default "radix2" up to LEAF frames, "four_step" from FOUR_STEP_MIN frames and "radix4" for the other sizes);
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). The token is checked before the calculation
+            and, for "four_step", between the blocks of rows (the progress is reported in frames of the signal). If None, the calculation is not observed.
     The result of the function:
         Return values:
             FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform
             or
-            -1 ("int") - if the amount of data is not a power of two.
+            -1 ("int") - if the amount of data is not a power of two
+            or
+            -3 ("int") - if the calculation was cancelled.
     '''
 
+    data_signal = np.asarray(data_signal)
+
     # Checking that the amount of data corresponds to a power of two.
-    if not isPowerOfTwo.isPowerOfTwo(len(data_signal)):
+    if not isPowerOfTwo.isPowerOfTwo(data_signal.shape[-1]):
         print(f'The amount of data does not correspond to a power of two (the "fft" function cannot be used).')
         print(f"The function terminates with a return of -1.")
         return -1
 
-    n = len(data_signal) # n is a power of 2
-    if n == 1:
-        return data_signal
-    omega = cmath.cos(2*cmath.pi/n) - 1j*cmath.sin(2*cmath.pi/n)
-    data_signal_even, data_signal_odd = data_signal[::2], data_signal[1::2]
-    y_even, y_odd = fft(data_signal_even), fft(data_signal_odd)
-    FT = np.zeros(shape=n, dtype=np.complex128)
-    for i in range(int(n/2)):
-        FT[i] = y_even[i]+(omega**i)*y_odd[i]
-        FT[i+int(n/2)] = y_even[i]-(omega**i)*y_odd[i]
+    if kernel is None:
+        kernel = kernel_by_size.get(data_signal.shape[-1], default_kernel(data_signal.shape[-1]))
+
+    if token is None:
+        return KERNELS[kernel](data_signal)
+
+    # The token is checked before any calculation, and "four_step" also checks it between the blocks of rows.
+    FT = None
+    if not progress.progress_cancelled(token):
+        FT = fft_four_step(data_signal, token) if kernel == 'four_step' else KERNELS[kernel](data_signal)
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the fast Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
     return FT
 
-def fast_fourier_transform(path_to_signal="../data/input_signal.wav", need_to_plot=False):
+def fft_radix2(data_signal):
+
+    '''
+    This function is used to calculate the fast Fourier transform by the recursive radix-2 algorithm (the amount of data is a power of two, it is not checked).
+    '''
+
+    def FFT(data_signal):
+        n = data_signal.shape[-1] # n is a power of 2
+        if n <= LEAF:
+            if n not in leaf_matrices:
+                leaf_matrices[n] = np.exp(-2j*cmath.pi*np.outer(np.arange(n), np.arange(n))/n)
+            return data_signal @ leaf_matrices[n]
+        omega = np.exp(-2j*cmath.pi*np.arange(int(n/2))/n) # omega**i for all i at once
+        data_signal_even, data_signal_odd = data_signal[..., ::2], data_signal[..., 1::2]
+        y_even, y_odd = FFT(data_signal_even), FFT(data_signal_odd)
+        y_odd *= omega
+        return np.concatenate([y_even + y_odd, y_even - y_odd], axis=-1)
+
+    return FFT(data_signal).astype(np.complex128, copy=False)
+
+def dft4(x0, x1, x2, x3):
+
+    '''
+    The discrete Fourier transform of 4 values (each value is an array, the transform is calculated for all elements at once): only additions and a multiplication by -1j.
+    '''
+
+    t0, t1 = x0 + x2, x0 - x2
+    t2, t3 = x1 + x3, (x1 - x3) * -1j
+    return t0 + t2, t1 + t3, t0 - t2, t1 - t3
+
+def codelet(x):
+
+    '''
+    The discrete Fourier transform of n = 1, 2, 4, 8 or 16 values written out by hand (x is a list of n arrays, the result is a list of n arrays).
+        The 8-point and 16-point transforms are made of "dft4" with the constant twiddle factors W16 (two and four stages of radix 2 in one pass over the memory).
+    '''
+
+    n = len(x)
+    if n == 1:
+        return [x[0]]
+    if n == 2:
+        return [x[0] + x[1], x[0] - x[1]]
+    if n == 4:
+        return list(dft4(*x))
+    if n == 8:
+        even, odd = dft4(x[0], x[2], x[4], x[6]), dft4(x[1], x[3], x[5], x[7])
+        odd = [odd[0], odd[1]*W16[2], odd[2]*-1j, odd[3]*W16[6]]
+        return [even[k] + odd[k] for k in range(4)] + [even[k] - odd[k] for k in range(4)]
+
+    # n == 16: y[k1 + 4*k2] = dft4 over q1 of (dft4(x[q1], x[q1+4], x[q1+8], x[q1+12])[k1] * W16[q1*k1])
+    columns = [dft4(x[q1], x[q1 + 4], x[q1 + 8], x[q1 + 12]) for q1 in range(4)]
+    y = [None] * 16
+    for k1 in range(4):
+        twiddled = [columns[q1][k1] if q1*k1 == 0 else columns[q1][k1] * W16[q1*k1] for q1 in range(4)]
+        for k2, value in enumerate(dft4(*twiddled)):
+            y[k1 + 4*k2] = value
+    return y
+
+def fft_radix4(data_signal):
+
+    '''
+    This function is used to calculate the fast Fourier transform by radix-4 stages (the amount of data is a power of two, it is not checked).
+    The signal of N frames is viewed as a table of rows (frequencies) and columns; column j holds the transform of the frames j, j+C, j+2C, ... (C is the number of columns):
+        the first pass ("codelet" of 16 or 8 values, or of N values if N <= 16) calculates the small transforms without twiddle factors,
+        then each radix-4 stage combines four quarters of the columns into four times more rows (two radix-2 stages in one pass over the memory, 3/4 of the multiplications).
+    '''
+
+    data_signal = np.asarray(data_signal)
+    if data_signal.dtype.kind not in 'fc':
+        data_signal = data_signal.astype(np.float64) # The sums of the integer frames must not overflow
+
+    N = data_signal.shape[-1]
+    batch = data_signal.shape[:-1]
+    power = N.bit_length() - 1
+
+    # The size of the codelet is chosen so that the number of the remaining stages of radix 2 is even.
+    n0 = N if power <= 4 else (16 if power % 2 == 0 else 8)
+    C = N // n0
+    FT = np.empty(shape=batch + (n0, C), dtype=np.complex128)
+    for k, value in enumerate(codelet([data_signal[..., q*C:(q+1)*C] for q in range(n0)])):
+        FT[..., k, :] = value
+
+    R = n0 # Number of rows
+    while R < N:
+        C = FT.shape[-1] // 4
+        if R not in stage_twiddles:
+            k = np.arange(R)
+            stage_twiddles[R] = tuple(np.exp(-2j*np.pi*q*k/(4*R))[:, None] for q in (1, 2, 3))
+        w1, w2, w3 = stage_twiddles[R]
+
+        a = FT[..., 0:C]
+        b, c, d = FT[..., C:2*C] * w1, FT[..., 2*C:3*C] * w2, FT[..., 3*C:4*C] * w3
+        t0, t1 = a + c, a - c
+        t2 = b + d
+        np.subtract(b, d, out=b)
+        b *= -1j # t3
+        del c, d
+
+        result = np.empty(shape=batch + (4*R, C), dtype=np.complex128)
+        np.add(t0, t2, out=result[..., 0:R, :])
+        np.add(t1, b, out=result[..., R:2*R, :])
+        np.subtract(t0, t2, out=result[..., 2*R:3*R, :])
+        np.subtract(t1, b, out=result[..., 3*R:4*R, :])
+        FT, R = result, 4*R
+        del a, b, t0, t1, t2
+
+    return FT.reshape(batch + (N,))
+
+FOUR_STEP_MIN = 2**20 # From this size, "fft" uses "fft_four_step" by default
+BLOCK_FRAMES = 2**15 # Number of frames of the sub-transforms calculated at once by "fft_four_step" (fits in the L2/L3 cache)
+TILE = 64 # Size of the tiles of "transpose_blocked"
+
+def transpose_blocked(matrix, out=None):
+
+    '''
+    This function is used to transpose a matrix tile by tile (the rows of a tile and the columns of its transposed copy stay in the cache).
+    '''
+
+    rows, columns = matrix.shape
+    if out is None:
+        out = np.empty(shape=(columns, rows), dtype=matrix.dtype)
+
+    for i in range(0, rows, TILE):
+        for j in range(0, columns, 8*TILE):
+            out[j:j + 8*TILE, i:i + TILE] = matrix[i:i + TILE, j:j + 8*TILE].T
+
+    return out
+
+def fft_four_step(data_signal, token=None):
+
+    '''
+    This function is used to calculate the fast Fourier transform of a large signal by the four-step algorithm (the amount of data is a power of two, it is not checked).
+    The signal of N = N1*N2 frames is viewed as a matrix A[n1, n2] = x[N2*n1 + n2], then:
+        1) the matrix is transposed, and the N2 transforms of N1 frames are calculated (over n1) in blocks of BLOCK_FRAMES frames;
+        2) the block is multiplied by the twiddle factors exp(-2j*pi*n2*k1/N) while it is still in the cache;
+        3) the matrix is transposed, and the N1 transforms of N2 frames are calculated (over n2);
+        4) the matrix is transposed: X[k1 + N1*k2] is the element [k2, k1].
+    Each sub-transform ("fft_radix4") fits in the cache, so the speed per frame does not fall for sizes larger than the cache.
+    The token (please refer to "progress.py") is checked between the blocks of rows, each of the two passes reports half of the frames; after the cancellation, the result is not valid.
+    '''
+
+    data_signal = np.asarray(data_signal)
+    N = data_signal.shape[-1]
+    if data_signal.ndim > 1:
+        batch = data_signal.reshape(-1, N)
+        return np.stack([fft_four_step(row, token) for row in batch]).reshape(data_signal.shape)
+
+    power = N.bit_length() - 1
+    N1 = 1 << (power // 2)
+    N2 = N // N1
+
+    matrix = transpose_blocked(data_signal.reshape(N1, N2).astype(np.complex128, copy=False)) # matrix[n2, n1]
+
+    # The twiddle factors exp(-2j*pi*n2*k1/N) are the products of two small tables (k1 = k_high + k_low), not N values of "numpy.exp".
+    K = 1 << (power // 4)
+    k_low, k_high = np.arange(K), np.arange(0, N1, K)
+    rows = max(1, BLOCK_FRAMES // N1)
+    for start in range(0, N2, rows):
+        if progress.progress_cancelled(token):
+            return matrix.reshape(N)
+        n2 = np.arange(start, min(start + rows, N2))[:, None]
+        block = fft_radix4(matrix[start:start + rows])
+        twiddle = np.exp(-2j*np.pi*(n2*k_high % N)/N)[:, :, None] * np.exp(-2j*np.pi*(n2*k_low)/N)[:, None, :]
+        block *= twiddle.reshape(n2.size, N1)
+        matrix[start:start + rows] = block
+        progress.progress_advance(token, n2.size*N1 // 2)
+
+    matrix = transpose_blocked(matrix) # matrix[k1, n2]
+    rows = max(1, BLOCK_FRAMES // N2)
+    for start in range(0, N1, rows):
+        if progress.progress_cancelled(token):
+            return matrix.reshape(N)
+        matrix[start:start + rows] = fft_radix4(matrix[start:start + rows])
+        progress.progress_advance(token, min(rows, N1 - start)*N2 // 2)
+
+    return transpose_blocked(matrix).reshape(N) # matrix[k2, k1]
+
+KERNELS = {
+    'radix2': fft_radix2,
+    'radix4': fft_radix4,
+    'four_step': fft_four_step
+}
+kernel_by_size = {} # The algorithm chosen for each size by "select_kernels"
+
+def default_kernel(size):
+
+    '''
+    This function is used to get the algorithm of "fft" for a size that was not measured by "select_kernels".
+        Up to LEAF frames, one multiplication by the matrix of "fft_radix2" is faster; from FOUR_STEP_MIN frames, the signal does not fit in the cache.
+    '''
+
+    if size <= LEAF:
+        return 'radix2'
+    if size >= FOUR_STEP_MIN:
+        return 'four_step'
+    return 'radix4'
+
+def select_kernels(sizes=tuple(2**p for p in range(4, 21)), repeat=3):
+
+    '''
+    This function allows you to choose the fastest algorithm ("KERNELS") of "fft" for each size by measuring them on this computer.
+    The following parameters are passed to the function:
+        sizes ("list" or "tuple" of "int" powers of two) - the sizes;
+        repeat ("int" and greater than 0) - number of measurements of each algorithm (the smallest time is taken).
+    The result of the function:
+        Return values:
+            times ("dict") - the times of the algorithms for each size: {size: {kernel: seconds}}. The fastest algorithm is saved to "kernel_by_size" and used by "fft".
+    '''
+
+    import time
+
+    times = {}
+    for size in sizes:
+        data_signal = np.random.default_rng(size).standard_normal(size)
+        times[size] = {}
+        for name, kernel in KERNELS.items():
+            best = None
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                kernel(data_signal)
+                elapsed = time.perf_counter() - start_time
+                best = elapsed if best is None else min(best, elapsed)
+            times[size][name] = best
+        kernel_by_size[size] = min(times[size], key=times[size].get)
+
+    return times
+
+def fast_fourier_transform(path_to_signal="../data/input_signal.wav", need_to_plot=False, window="rectangular", token=None):
     
     '''
     This function allows you to calculate the discrete Fourier transform (using the fast Fourier transform algorithm (function "fft")) for a signal from a file with the extension ".wav", normalize the result of this transformation and plot the result on a graph (the graph is plotted if necessary).
     The following parameters are passed to the function:
         path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav") (note: The amount of data in this file must be a power of two.);
-        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform.
+        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform;
+        window ("str" - one of "window_functions.WINDOWS") - the window applied to the signal before the transform (please refer to "window_functions.py"). "rectangular" - without a window;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
     The result of the function:
         Return values:
-            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from 0 to the Nyquist frequency);
-            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude;
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from 0 to the Nyquist frequency) of the windowed signal;
+            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude (corrected by the coherent gain of the window);
             frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz;
             or
-            -1 ("int") - if the amount of data is not a power of two.
+            -1 ("int") - if the amount of data is not a power of two
+            or
+            -3 ("int") - if the calculation was cancelled.
         Discrete Fourier transform graph (if "need_to_plot" = True):
             Please refer to the result of the "building_a_fourier_transform_graph" function implemented in the "building_a_fourier_transform_graph.py" file.
     '''
@@ -85,27 +334,39 @@ def fast_fourier_transform(path_to_signal="../data/input_signal.wav", need_to_pl
     print(f"\tSampling rate = {RATE}")
     print(f"\tNyquist frequency = {Nyquist_frequency}")
 
+    if token is None:
+        token = progress.progress_token()
+
     print(f"The beginning of the calculation of the fast Fourier transform.")
-    print(f"FFT progress...")
+    progress.progress_start(token, "FFT", N_FRAMES)
     start_time = time.time() # Starting the stopwatch
 
-    FT = fft(data_signal)
+    if window != "rectangular":
+        import window_functions
+        data_signal = window_functions.apply_window(data_signal, window)
+
+    FT = fft(data_signal, token=token)
 
     if type(FT) == int:
-        return -1
+        return FT
 
     FT = FT[:index_Nyquist_frequency]
+    progress.progress_finish(token)
 
     end_time = time.time() - start_time # Stopping the stopwatch
     print(f"The end of the calculation of the fast Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
     amplitude = abs(FT) # Unnormalized signal amplitude
-    amplitude = 2*amplitude/N_FRAMES # Normalized signal amplitude
+    if window != "rectangular":
+        amplitude = 2*amplitude/(N_FRAMES*window_functions.coherent_gain(window, N_FRAMES)) # Normalized signal amplitude (the window reduces the amplitude by its coherent gain)
+    else:
+        amplitude = 2*amplitude/N_FRAMES # Normalized signal amplitude
 
     # Declaring an array of frequencies of the signal spectrum
     frequency = np.arange(index_Nyquist_frequency) * RATE / N_FRAMES
 
     if need_to_plot == True:
+        import building_a_fourier_transform_graph # "matplotlib" is loaded only when the graph is needed
         building_a_fourier_transform_graph.building_a_fourier_transform_graph(frequency, amplitude, path_to_signal) # Plotting a discrete Fourier transform
 
     return (FT, amplitude, frequency)
@@ -0,0 +1,51 @@
+'''
+This module is used to compare the algorithms of "fft" from "fast_fourier_transform.py" (the "KERNELS": "fft_radix2", "fft_radix4" and "fft_four_step") at the sizes from 2**10 to 2**24.
+For each size, the time of each algorithm, the speedup of the fastest algorithm relative to radix 2 and the largest difference between the results are shown.
+'''
+
+import time
+
+import numpy as np
+
+import fast_fourier_transform
+
+def fft_benchmark(powers=range(10, 25), repeat=3):
+
+    '''
+    This function allows you to measure the algorithms of "fft" for signals of 2**power frames.
+    The following parameters are passed to the function:
+        powers (iterable of "int") - the powers of two of the sizes;
+        repeat ("int" and greater than 0) - number of measurements of each algorithm (the smallest time is taken).
+    The result of the function:
+        Return values:
+            results ("list" of "dict") - for each size: "size", the times of the algorithms in seconds (the names of "KERNELS"), "speedup" and "difference" (relative to "radix2").
+    '''
+
+    results = []
+    print(f"{'size':>10} | " + " | ".join(f"{name:>10}" for name in fast_fourier_transform.KERNELS) + f" | {'speedup':>8} | {'difference':>10}")
+
+    for power in powers:
+        size = 2**power
+        data_signal = np.random.default_rng(power).integers(-32768, 32768, size=size).astype(np.int16)
+        result = {'size': size}
+        outputs = {}
+
+        for name, kernel in fast_fourier_transform.KERNELS.items():
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                outputs[name] = kernel(data_signal)
+                elapsed = time.perf_counter() - start_time
+                result[name] = min(result.get(name, elapsed), elapsed)
+
+        reference = outputs['radix2']
+        result['speedup'] = result['radix2'] / min(result[name] for name in fast_fourier_transform.KERNELS if name != 'radix2')
+        result['difference'] = max(float(abs(outputs[name] - reference).max()) for name in outputs) / float(abs(reference).max())
+        results.append(result)
+        del outputs, reference
+
+        print(f"{'2**%d' % power:>10} | " + " | ".join(f"{'%.4f' % result[name]:>10}" for name in fast_fourier_transform.KERNELS) + f" | {'%.2f' % result['speedup']:>8} | {'%.1e' % result['difference']:>10}")
+
+    return results
+
+if __name__ == "__main__":
+    fft_benchmark(repeat=1)
@@ -0,0 +1,273 @@
+'''
+This module is used to find recordings with matching spectral content among many ".wav" files without calculating the transform of each file for each query.
+The fingerprint of a signal is built from the strongest peaks of its short-time Fourier transform (a "constellation" of points in time and frequency, see "spectral_features.find_peaks"):
+    pairs of neighboring peaks are packed into integer keys (frequency of the first peak, frequency of the second peak, time between them).
+    The keys do not depend on the sampling rate of the file.
+The index is a directory on disk (an inverted index: key -> the files and times at which it occurs):
+    "files.txt" - the paths of the indexed files (the line number is the identifier of the file, an empty line is an identifier without a file);
+    "segment_NNNNNN" - the keys of a group of added files sorted in ascending order ("keys.npy") and their files and times ("files.npy", "times.npy").
+    The keys are found by binary search in the memory-mapped arrays, so the time of a query grows with the logarithm of the size of the index.
+New files are added as a new segment (the index is updated incrementally, for example, after "signal_recording" saves a file), "index_compact" merges the segments.
+'''
+
+import os
+import time # Used to calculate the time spent on indexing
+
+import numpy as np
+
+import wave_worker
+
+WINDOW_SECONDS = 0.1 # Approximate duration of a frame of the short-time Fourier transform (rounded to a power of two of frames)
+PEAKS_PER_FRAME = 5 # Number of the strongest peaks taken from each frame
+THRESHOLD = 0.01 # Peaks weaker than THRESHOLD * (the strongest peak of the signal) are not used
+FAN_OUT = 10 # Number of the following peaks paired with each peak
+FREQUENCY_QUANTUM = 10.0 # Step of the frequencies in the keys in hertz (11 bits, up to 20470 Hz)
+TIME_QUANTUM = 0.05 # Step of the times in seconds (the time between the peaks of a pair is 6 bits, up to 63 steps)
+
+def constellation(data_signal, RATE):
+
+    '''
+    This function is used to find the constellation of a signal: the strongest peaks of the frames of its short-time Fourier transform.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE ("int" and greater than 0) - sampling rate in hertz.
+    The result of the function:
+        Return values:
+            times ("numpy.ndarray" with dtype="numpy.int64") - times of the peaks in steps of TIME_QUANTUM;
+            frequencies ("numpy.ndarray" with dtype="numpy.int64") - frequencies of the peaks in steps of FREQUENCY_QUANTUM.
+    '''
+
+    import spectral_features
+
+    NPERSEG = 1 << max(4, round(np.log2(RATE*WINDOW_SECONDS)))
+    record, frame_time = spectral_features.stft_features(data_signal, RATE, NPERSEG, k=PEAKS_PER_FRAME)
+
+    peak_frequency = record['peak_frequency'].astype(np.float64)
+    peak_amplitude = record['peak_amplitude'].astype(np.float64)
+    strong = np.isfinite(peak_frequency) & (peak_amplitude >= THRESHOLD * peak_amplitude.max(initial=0))
+
+    times = np.round(np.broadcast_to(frame_time[:, None], peak_frequency.shape)[strong] / TIME_QUANTUM).astype(np.int64)
+    frequencies = np.clip(np.round(peak_frequency[strong] / FREQUENCY_QUANTUM), 0, 2047).astype(np.int64)
+
+    order = np.lexsort((frequencies, times))
+    return times[order], frequencies[order]
+
+def fingerprint(data_signal, RATE):
+
+    '''
+    This function is used to calculate the fingerprint of a signal.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE ("int" and greater than 0) - sampling rate in hertz.
+    The result of the function:
+        Return values:
+            keys ("numpy.ndarray" with dtype="numpy.uint32") - the keys of the pairs of peaks (f1 << 17 | f2 << 6 | dt);
+            times ("numpy.ndarray" with dtype="numpy.int32") - the times of the first peaks of the pairs in steps of TIME_QUANTUM.
+    '''
+
+    times, frequencies = constellation(data_signal, RATE)
+
+    keys, anchors = [], []
+    for shift in range(1, FAN_OUT + 1):
+        dt = times[shift:] - times[:-shift]
+        paired = (dt >= 1) & (dt <= 63)
+        keys.append((frequencies[:-shift] << 17 | frequencies[shift:] << 6 | dt)[paired])
+        anchors.append(times[:-shift][paired])
+
+    return np.concatenate(keys).astype(np.uint32), np.concatenate(anchors).astype(np.int32)
+
+def file_fingerprint(path_to_signal):
+
+    '''
+    This function is used to calculate the fingerprint of a file with the extension ".wav" (the channels are averaged). (note: It is used for "index_add" and "index_query".)
+    '''
+
+    data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = wave_worker.wave_read(path_to_signal)
+    if CHANNELS > 1:
+        data_signal = data_signal.reshape(-1, CHANNELS).mean(axis=1)
+    return fingerprint(data_signal, RATE)
+
+def index_files(path_to_index):
+
+    '''
+    This function is used to get the list of the indexed files (the index of an element is the identifier of the file).
+        An empty path is an identifier of a segment written by an interrupted "index_add" (the segment was saved, but the paths were not), such identifiers are not used again.
+    '''
+
+    path = os.path.join(path_to_index, "files.txt")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return file.read().splitlines()
+
+def index_segments(path_to_index):
+
+    '''
+    This function is used to open the segments of the index (the arrays are memory-mapped, not read).
+    '''
+
+    segments = []
+    for name in sorted(os.listdir(path_to_index)) if os.path.isdir(path_to_index) else []:
+        if name.startswith("segment_"):
+            folder = os.path.join(path_to_index, name)
+            segments.append(tuple(np.load(os.path.join(folder, array + ".npy"), mmap_mode='r') for array in ("keys", "files", "times")))
+    return segments
+
+def write_segment(path_to_index, keys, files, times):
+
+    '''
+    This function is used to sort the keys and save them as a new segment of the index.
+    '''
+
+    order = np.argsort(keys, kind='stable')
+    number = len([name for name in os.listdir(path_to_index) if name.startswith("segment_")])
+    folder = os.path.join(path_to_index, f"segment_{number:06d}")
+    while os.path.exists(folder):
+        number += 1
+        folder = os.path.join(path_to_index, f"segment_{number:06d}")
+
+    # The segment is written to a temporary folder and renamed, so a query never sees a partially written segment.
+    temporary = folder + ".tmp"
+    os.makedirs(temporary)
+    np.save(os.path.join(temporary, "keys.npy"), keys[order])
+    np.save(os.path.join(temporary, "files.npy"), files[order])
+    np.save(os.path.join(temporary, "times.npy"), times[order])
+    os.rename(temporary, folder)
+
+def index_add(path_to_index="../data/fingerprint_index", paths=(), workers=1):
+
+    '''
+    This function allows you to add files with the extension ".wav" to the index (the files already in the index are skipped).
+    The following parameters are passed to the function:
+        path_to_index ("str") - the folder of the index (created if it does not exist);
+        paths ("list" or "tuple" of "str") - the paths to the files;
+        workers ("int" and greater than 0) - number of processes calculating the fingerprints.
+    The result of the function:
+        Return values:
+            added ("int") - number of the added files.
+    '''
+
+    os.makedirs(path_to_index, exist_ok=True)
+    known = set(index_files(path_to_index))
+    new_paths = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if path not in known:
+            known.add(path)
+            new_paths.append(path)
+
+    if not new_paths:
+        return 0
+
+    start_time = time.time() # Starting the stopwatch
+
+    if workers > 1:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            fingerprints = list(executor.map(file_fingerprint, new_paths))
+    else:
+        fingerprints = [file_fingerprint(path) for path in new_paths]
+
+    # The identifiers are taken after the largest identifier of the segments as well: if "index_add" was interrupted after the segment was saved,
+    # the paths of its files are missing from "files.txt", and their identifiers must not be given to other files.
+    paths_count = len(index_files(path_to_index))
+    first_id = max([paths_count] + [int(files.max()) + 1 for keys, files, times in index_segments(path_to_index) if files.size])
+    keys = np.concatenate([keys for keys, times in fingerprints])
+    times = np.concatenate([times for keys, times in fingerprints])
+    files = np.repeat(np.arange(first_id, first_id + len(new_paths), dtype=np.uint32), [keys.size for keys, times in fingerprints])
+    write_segment(path_to_index, keys, files, times)
+
+    with open(os.path.join(path_to_index, "files.txt"), "a", encoding="utf-8") as file:
+        file.write("\n" * (first_id - paths_count)) # The identifiers without files
+        file.writelines(path + "\n" for path in new_paths)
+
+    end_time = time.time() - start_time # Stopping the stopwatch
+    print(f"{len(new_paths)} files ({keys.size} keys) have been added to the index \"{path_to_index}\". Time spent {'%.3f' % end_time} seconds.")
+    return len(new_paths)
+
+def index_compact(path_to_index="../data/fingerprint_index"):
+
+    '''
+    This function allows you to merge all segments of the index into one (queries search fewer segments).
+    '''
+
+    segments = index_segments(path_to_index)
+    if len(segments) <= 1:
+        return
+
+    old_folders = [name for name in sorted(os.listdir(path_to_index)) if name.startswith("segment_")]
+    keys, files, times = (np.concatenate([np.asarray(segment[i]) for segment in segments]) for i in range(3))
+    del segments
+
+    import shutil
+    for name in old_folders:
+        os.rename(os.path.join(path_to_index, name), os.path.join(path_to_index, "old_" + name))
+    write_segment(path_to_index, keys, files, times)
+    for name in old_folders:
+        shutil.rmtree(os.path.join(path_to_index, "old_" + name))
+
+def index_query(path_to_index="../data/fingerprint_index", path_to_signal="../data/input_signal.wav", top=5):
+
+    '''
+    This function allows you to find the indexed files whose spectral content matches a signal.
+    The following parameters are passed to the function:
+        path_to_index ("str") - the folder of the index;
+        path_to_signal ("str" or "tuple" (data_signal, RATE)) - the path to a file with the extension ".wav" or the signal data with its sampling rate;
+        top ("int" and greater than 0) - number of the returned files.
+    The result of the function:
+        Return values:
+            matches ("list" of "tuple" (path, score, offset)) - the best files: the path, the number of keys matching at the same time offset,
+                and the offset of the signal in the file in seconds (from the best file).
+    '''
+
+    if type(path_to_signal) == str:
+        query_keys, query_times = file_fingerprint(path_to_signal)
+    else:
+        query_keys, query_times = fingerprint(*path_to_signal)
+
+    order = np.argsort(query_keys, kind='stable')
+    query_keys, query_times = query_keys[order], query_times[order]
+
+    matched_files, matched_offsets = [], []
+    for keys, files, times in index_segments(path_to_index):
+        # The range of each query key in the sorted keys of the segment (binary search).
+        left = np.searchsorted(keys, query_keys, side='left')
+        right = np.searchsorted(keys, query_keys, side='right')
+        counts = right - left
+        if counts.sum() == 0:
+            continue
+
+        # Indices of all matching entries: left[i], left[i]+1, ..., right[i]-1 for each query key.
+        owner = np.repeat(np.arange(query_keys.size), counts)
+        positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + left[owner]
+
+        matched_files.append(np.asarray(files[positions], dtype=np.int64))
+        matched_offsets.append(np.asarray(times[positions], dtype=np.int64) - query_times[owner])
+
+    if not matched_files:
+        return []
+
+    # The score of a file is the largest number of matching keys with the same time offset (the matches of a true recording are aligned in time).
+    files = np.concatenate(matched_files)
+    offsets = np.concatenate(matched_offsets)
+    pairs, votes = np.unique(files << 32 | (offsets & 0xFFFFFFFF), return_counts=True)
+    pair_files = pairs >> 32
+    pair_offsets = (pairs & 0xFFFFFFFF).astype(np.uint32).astype(np.int32)
+
+    order = np.lexsort((-votes, pair_files))
+    best = order[np.r_[True, pair_files[order][1:] != pair_files[order][:-1]]] # The best offset of each file
+    paths = index_files(path_to_index)
+    best = best[pair_files[best] < len(paths)] # The identifiers of an interrupted "index_add" have no paths
+    best = best[[paths[pair_files[i]] != "" for i in best]]
+    best = best[np.argsort(-votes[best], kind='stable')][:top]
+
+    return [(paths[pair_files[i]], int(votes[i]), pair_offsets[i] * TIME_QUANTUM) for i in best]
+
+if __name__ == "__main__":
+    import glob
+
+    path_to_index = "../data/fingerprint_index"
+    index_add(path_to_index, sorted(glob.glob("../data/examples/*.wav")))
+
+    for path, score, offset in index_query(path_to_index, "../data/examples/signal_440hz_duration_5s-95ms.wav"):
+        print(f"{path}: score = {score}, offset = {'%.2f' % offset} seconds")
@@ -9,20 +9,62 @@ import time # Used to calculate the time spent on DFT
 import numpy as np
 
 import wave_worker
-import building_a_fourier_transform_graph
+import progress
 
-def fourier_transform(path_to_signal = "../data/input_signal.wav", need_to_plot = False):
+def dft(data_signal, token=None):
+
+    '''
+    This function is used to calculate the discrete Fourier transform (from 0 to the Nyquist frequency) using the forward formula. (note: It is used for "fourier_transform" but can also be used independently.)
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from 0 to the Nyquist frequency)
+            or
+            -3 ("int") - if the calculation was cancelled.
+    '''
+
+    N_FRAMES = len(data_signal)
+    index_Nyquist_frequency = int(N_FRAMES/2) + 1
+
+    if token is None:
+        token = progress.progress_token()
+
+    FT = np.zeros(shape=index_Nyquist_frequency, dtype=np.complex128) # Declaring an array for the Fourier transform
+
+    progress.progress_start(token, "DFT", index_Nyquist_frequency)
+
+    # Discrete Fourier transform (DFT), the token is checked between the ranges of iterations
+    for index_start, index_stop in progress.progress_ranges(token, 0, index_Nyquist_frequency):
+        for i in range(index_start, index_stop):
+            precomp = 2*cmath.pi*i/N_FRAMES
+            FT[i] = sum(data_signal[j] * (cmath.cos(precomp * j) - 1j * cmath.sin(precomp * j)) for j in range(N_FRAMES))
+
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the discrete Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
+
+    progress.progress_finish(token)
+
+    return FT
+
+def fourier_transform(path_to_signal = "../data/input_signal.wav", need_to_plot = False, token = None):
 
     '''
     This function allows you to calculate the discrete Fourier transform for a signal from a file with the extension ".wav", normalize the result of this transformation and plot the result on a graph (the graph is plotted if necessary).
     The following parameters are passed to the function:
         path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
-        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform.
+        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
     The result of the function:
         Return values:
             FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from 0 to the Nyquist frequency);
             amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude;
-            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz.
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz
+            or
+            -3 ("int") - if the calculation was cancelled.
         Discrete Fourier transform graph (if "need_to_plot" = True):
             Please refer to the result of the "building_a_fourier_transform_graph" function implemented in the "building_a_fourier_transform_graph.py" file.
     '''
@@ -46,31 +88,20 @@ def fourier_transform(path_to_signal = "../data/input_signal.wav", need_to_plot
     Nyquist_frequency = int(RATE/2)
     index_Nyquist_frequency = int(N_FRAMES/2) + 1
 
-    to_track_progress = int(index_Nyquist_frequency/10)
-    progress = 0
-
-    FT = np.zeros(shape=index_Nyquist_frequency, dtype=np.complex128) # Declaring an array for the Fourier transform
-
     print(f"Info about Fourier transform:")
     print(f"\tSampling rate = {RATE}")
     print(f"\tNyquist frequency = {Nyquist_frequency}")
     print(f"\tRequired number of iterations for the Fourier transform = {index_Nyquist_frequency}")
 
     print(f"The beginning of the calculation of the discrete Fourier transform.")
-    print(f"DFT progress: {progress}% \t Iteration: {0}\{index_Nyquist_frequency}")
     start_time = time.time() # Starting the stopwatch
 
-    # Discrete Fourier transform (DFT)
-    for i in range(index_Nyquist_frequency):
-        if i==to_track_progress and progress < 90:
-            progress +=10
-            print(f"DFT progress: {progress}% \t Iteration: {to_track_progress}\{index_Nyquist_frequency}")
-            to_track_progress += int(index_Nyquist_frequency/10)
-        precomp = 2*cmath.pi*i/N_FRAMES
-        FT[i] = sum(data_signal[j] * (cmath.cos(precomp * j) - 1j * cmath.sin(precomp * j)) for j in range(N_FRAMES))
+    FT = dft(data_signal, token)
+
+    if type(FT) == int:
+        return FT
 
     end_time = time.time() - start_time # Stopping the stopwatch
-    print(f"DFT progress: {100}% \t Iteration: {index_Nyquist_frequency}\{index_Nyquist_frequency}")
     print(f"The end of the calculation of the discrete Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
     amplitude = abs(FT) # Unnormalized signal amplitude
@@ -80,6 +111,7 @@ def fourier_transform(path_to_signal = "../data/input_signal.wav", need_to_plot
     frequency = np.arange(index_Nyquist_frequency) * RATE / N_FRAMES
 
     if need_to_plot == True:
+        import building_a_fourier_transform_graph # "matplotlib" is loaded only when the graph is needed
         building_a_fourier_transform_graph.building_a_fourier_transform_graph(frequency, amplitude, path_to_signal) # Plotting a discrete Fourier transform
 
     return (FT, amplitude, frequency)
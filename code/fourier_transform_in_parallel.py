@@ -11,9 +11,9 @@ import time # Used to calculate the time spent on DFT
 import numpy as np
 
 import wave_worker
-import building_a_fourier_transform_graph
+import progress
 
-def DFT(index_start, index_stop, N_FRAMES, data_signal):
+def DFT(index_start, index_stop, N_FRAMES, data_signal, token_name=None, slot=0):
 
     '''
     This function is used to calculate the discrete Fourier transform when parallelizing calculations. (note: This function is used in conjunction with the "fourier_transform_in_parallel" function. The "DFT" function is not used separately.)
@@ -21,35 +21,44 @@ def DFT(index_start, index_stop, N_FRAMES, data_signal):
         index_start (dtype="numpy.uint32") - index of the beginning of the calculation; 
         index_stop (dtype="numpy.uint32") - index of the end of the calculation;
         N_FRAMES ("int") - the number of frames;
-        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data.
+        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data;
+        token_name ("str" or None) - the name of the shared memory of the token (created by "progress.progress_share" in "fourier_transform_in_parallel"). If None, the progress is not reported;
+        slot ("int") - the number of the counter of this process in the token.
     The result of the function:
         Return values:
-            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from index_start to the index_stop).
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from index_start to the index_stop; if the calculation was cancelled, only a part of them).
     '''
 
-    # Discrete Fourier transform (DFT)
+    token = progress.worker_token(token_name, slot)
+
+    # Discrete Fourier transform (DFT), the flag of the cancellation is checked between the ranges of iterations
     FT = np.zeros(shape=(int(N_FRAMES/2) + 1), dtype=np.complex128)
-    
-    for i in range(index_start, index_stop):
-        precomp = 2*cmath.pi*i/N_FRAMES
-        FT[i] = sum(data_signal[j] * (cmath.cos(precomp * j) - 1j * cmath.sin(precomp * j)) for j in range(N_FRAMES))
-    else:
-        print(f"DFT progress: +{12.5}% \t Iteration: {'%6d' % index_start} -> {'%6d' % i}\{int(N_FRAMES/2) + 1} completed.")
-    
+
+    for range_start, range_stop in progress.progress_ranges(token, int(index_start), int(index_stop)):
+        for i in range(range_start, range_stop):
+            precomp = 2*cmath.pi*i/N_FRAMES
+            FT[i] = sum(data_signal[j] * (cmath.cos(precomp * j) - 1j * cmath.sin(precomp * j)) for j in range(N_FRAMES))
+
+    progress.worker_release(token)
+
     return FT
 
-def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", need_to_plot = False):
+def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", need_to_plot = False, token = None):
     
     '''
     This function allows you to calculate the discrete Fourier transform (parallelizing calculations by 8 cores) for a signal from a file with the extension ".wav", normalize the result of this transformation and plot the result on a graph (the graph is plotted if necessary).
     The following parameters are passed to the function:
         path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
-        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform.
+        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called. The function "building_a_fourier_transform_graph" plots the graph of the discrete Fourier transform;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
+            The processes report their progress and check the cancellation through shared memory, so a cancelled calculation stops in all processes.
     The result of the function:
         Return values:
             FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (from 0 to the Nyquist frequency);
             amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude;
-            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz.
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz
+            or
+            -3 ("int") - if the calculation was cancelled.
         Discrete Fourier transform graph (if "need_to_plot" = True):
             Please refer to the result of the "building_a_fourier_transform_graph" function implemented in the "building_a_fourier_transform_graph.py" file.
     '''
@@ -80,8 +89,11 @@ def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", n
     print(f"\tNyquist frequency = {Nyquist_frequency}")
     print(f"\tRequired number of iterations for the Fourier transform = {index_Nyquist_frequency}")
 
+    if token is None:
+        token = progress.progress_token()
+
     print(f"The beginning of the calculation of the discrete Fourier transform.")
-    print(f"DFT progress: {0}% \t Iteration: {0}\{index_Nyquist_frequency}")
+    progress.progress_start(token, "DFT", index_Nyquist_frequency)
     start_time = time.time() # Starting the stopwatch
 
     # Creating calculation intervals for each core
@@ -93,15 +105,18 @@ def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", n
     interval[8] = index_Nyquist_frequency
 
     # Parallelization of DFT calculation on 8 cores. (If there are fewer or more cores, this is not a problem)
-    with multiprocessing.Pool(multiprocessing.cpu_count()) as p:
-        temp = p.starmap(DFT, [(interval[0], interval[1], N_FRAMES, data_signal),
-                                (interval[1], interval[2], N_FRAMES, data_signal),
-                                (interval[2], interval[3], N_FRAMES, data_signal),
-                                (interval[3], interval[4], N_FRAMES, data_signal),
-                                (interval[4], interval[5], N_FRAMES, data_signal),
-                                (interval[5], interval[6], N_FRAMES, data_signal),
-                                (interval[6], interval[7], N_FRAMES, data_signal),
-                                (interval[7], interval[8], N_FRAMES, data_signal)])
+    # The processes report their progress through the shared memory of the token, and the progress is reported while waiting for them.
+    token_name = progress.progress_share(token, 8)
+    try:
+        with multiprocessing.Pool(multiprocessing.cpu_count()) as p:
+            temp = progress.pool_wait(token, p.starmap_async(DFT, [(interval[i], interval[i+1], N_FRAMES, data_signal, token_name, i) for i in range(8)]))
+    finally:
+        progress.progress_unshare(token)
+
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the discrete Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
 
     # Assembling data from a parallel computation into a single data array
     for i in range(len(interval)-1):
@@ -109,7 +124,7 @@ def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", n
             FT[j]=temp[i][j]
 
     end_time = time.time() - start_time # Stopping the stopwatch
-    print(f"DFT progress: {100}% \t Iteration: {index_Nyquist_frequency}\{index_Nyquist_frequency}")
+    progress.progress_finish(token)
     print(f"The end of the calculation of the discrete Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
     amplitude = abs(FT) # Unnormalized signal amplitude
@@ -119,6 +134,7 @@ def fourier_transform_in_parallel(path_to_signal = "../data/input_signal.wav", n
     frequency = np.arange(index_Nyquist_frequency) * RATE / N_FRAMES
 
     if need_to_plot == True:
+        import building_a_fourier_transform_graph # "matplotlib" is loaded only when the graph is needed
         building_a_fourier_transform_graph.building_a_fourier_transform_graph(frequency, amplitude, path_to_signal) # Plotting a discrete Fourier transform
 
     return (FT, amplitude, frequency)
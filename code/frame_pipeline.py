@@ -0,0 +1,281 @@
+'''
+This module is used to process a long signal as a stream of frames of N_FRAME values (short-time Fourier transform with overlap-add), so that reading, calculations and writing overlap in time.
+The stream passes through five stages, each stage works in its own thread or process and the stages are connected by bounded queues:
+    read - the ".wav" file is read in pieces of HOP values and cut into overlapping frames;
+    transform - each frame is multiplied by the periodic Hann window and transformed by "fft" (the spectrum from 0 to the Nyquist frequency);
+    process - the spectrum is changed by a function (for example, "band_pass"); without a function, the spectrum is passed as is;
+    inverse - the frame is restored by "hermitian_ifft" from "hermitian_inverse.py";
+    write - the frames are added with the overlap (the windows with HOP = N_FRAME/2 or N_FRAME/4 sum to a constant) and written to a ".wav" file as they arrive.
+If a stage is slower than the others, its input queue fills up and the previous stages wait (backpressure), so the memory is limited by the size of the queues.
+For each stage, the time of the work, the time of waiting for the input (the stage is starved) and the time of waiting for the output (the stage is blocked by the next one) are reported.
+Unlike "pipeline.py", which passes whole signals of many files between the stages, this module divides one long file into frames.
+'''
+
+import functools
+import queue
+import threading
+import time # Used to calculate the utilization of the stages
+
+import numpy as np
+
+import wave_worker
+
+N_FRAME = 4096 # Number of values of a frame
+QUEUE_SIZE = 16 # Maximum number of frames waiting between two stages
+
+def frames_read(items, path_to_signal, N_FRAME, HOP):
+
+    '''
+    Stage "read": the frames y[i*HOP : i*HOP + N_FRAME] of the signal padded with N_FRAME - HOP zeros at the beginning and at the end (each value is covered by N_FRAME/HOP frames).
+    '''
+
+    frame = np.zeros(shape=N_FRAME, dtype=np.float64)
+    for piece in wave_worker.wave_read_chunks(path_to_signal, HOP):
+        frame[:-HOP] = frame[HOP:]
+        frame[-HOP:] = 0
+        frame[N_FRAME - HOP:N_FRAME - HOP + piece.size] = piece
+        yield frame.copy()
+
+    for i in range(N_FRAME // HOP - 1):
+        frame[:-HOP] = frame[HOP:]
+        frame[-HOP:] = 0
+        yield frame.copy()
+
+def frames_transform(items, N_FRAME):
+
+    '''
+    Stage "transform": the spectrum of each windowed frame (from 0 to the Nyquist frequency).
+    '''
+
+    import fast_fourier_transform
+    import window_functions
+
+    windowed = np.empty(shape=N_FRAME, dtype=np.float64)
+    for frame in items:
+        window_functions.apply_window(frame, "hann", windowed)
+        yield fast_fourier_transform.fft(windowed)[:int(N_FRAME/2) + 1]
+
+def frames_process(items, function, RATE, N_FRAME):
+
+    '''
+    Stage "process": the spectrum of each frame is changed by function(FT, frequency) (the frequencies of the bins are calculated once).
+    '''
+
+    frequency = np.arange(int(N_FRAME/2) + 1) * RATE / N_FRAME
+    for FT in items:
+        yield function(FT, frequency)
+
+def frames_inverse(items):
+
+    '''
+    Stage "inverse": the frames are restored from the spectra from 0 to the Nyquist frequency.
+    '''
+
+    import hermitian_inverse
+
+    for FT in items:
+        yield hermitian_inverse.hermitian_ifft(FT)
+
+def frames_write(items, path_to_output, RATE, SAMPLE_FORMAT, IS_FLOAT, N_FRAMES, N_FRAME, HOP):
+
+    '''
+    Stage "write": the frames are added with the overlap, the finished HOP values are written to the ".wav" file in the format of the input file
+        (rounded for integer data, as is for floating point data; the padding of "frames_read" is removed).
+    '''
+
+    import window_functions
+
+    gain = window_functions.window_coefficients("hann", N_FRAME).sum() / HOP # The sum of the overlapping windows
+
+    def overlap_add():
+        accumulator = np.zeros(shape=N_FRAME, dtype=np.float64)
+        skip, left = N_FRAME - HOP, N_FRAMES
+        for frame in items:
+            accumulator += frame
+            finished = accumulator[:HOP] / gain # No more frames are added to these values
+            accumulator[:-HOP] = accumulator[HOP:]
+            accumulator[-HOP:] = 0
+
+            finished = finished[min(skip, HOP):]
+            skip -= min(skip, HOP)
+            if left > 0 and finished.size > 0:
+                yield finished[:left] if IS_FLOAT else np.rint(finished[:left])
+                left -= min(left, finished.size)
+
+    wave_worker.wave_write(path_to_output, overlap_add(), RATE, 1, SAMPLE_FORMAT, IS_FLOAT)
+    return
+    yield # The stage has no output
+
+def band_pass_filter(FT, frequency, low, high):
+
+    '''
+    This function is used to keep only the bins from "low" to "high" hertz of a spectrum (the other bins are set to zero). (note: It is the function of "band_pass".)
+    '''
+
+    FT = FT.copy()
+    FT[(frequency < low) | (frequency > high)] = 0
+    return FT
+
+def band_pass(low, high):
+
+    '''
+    This function is used to create the function of the "process" stage that keeps only the frequencies from "low" to "high" hertz.
+        The result can be passed to another process (it is not a local function).
+    '''
+
+    return functools.partial(band_pass_filter, low=low, high=high)
+
+def identity(FT, frequency):
+
+    '''
+    This function is used as the function of the "process" stage when the spectrum is not changed.
+    '''
+
+    return FT
+
+END = None # The marker of the end of the stream
+
+def run_stage(name, stage, parameters, inbox, outbox, reports):
+
+    '''
+    This function is used to run one stage: it takes the items from "inbox", passes them through the stage and puts the results into "outbox".
+        (note: It is executed in a thread or in a process of "frame_pipeline".)
+    The time of waiting for "inbox" and "outbox" is measured separately from the time of the work. If the stage fails, the rest of its input is read,
+        so that the previous stages are not blocked, and the error is reported.
+    '''
+
+    timing = {'wait_in': 0.0, 'wait_out': 0.0, 'received': 0}
+
+    def items():
+        while True:
+            start_time = time.perf_counter()
+            item = inbox.get()
+            timing['wait_in'] += time.perf_counter() - start_time
+            if item is END:
+                return
+            timing['received'] += 1
+            yield item
+
+    start_time = time.perf_counter()
+    count, depth, error = 0, 0, None
+    try:
+        for result in stage(items() if inbox is not None else iter(()), **parameters):
+            put_time = time.perf_counter()
+            outbox.put(result) # Waits while the queue is full (backpressure)
+            timing['wait_out'] += time.perf_counter() - put_time
+            count += 1
+            try:
+                depth = max(depth, outbox.qsize())
+            except NotImplementedError: # "multiprocessing.Queue.qsize" is not available on some systems
+                pass
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+        if inbox is not None:
+            for item in items():
+                pass
+    finally:
+        if outbox is not None:
+            outbox.put(END)
+
+    total = time.perf_counter() - start_time
+    if inbox is not None:
+        count = timing['received'] # The frames passed through the stage (the "write" stage has no output)
+    reports.put((name, count, total - timing['wait_in'] - timing['wait_out'], timing['wait_in'], timing['wait_out'], depth, error))
+
+def print_stages(reports, wall_time):
+
+    '''
+    This function is used to print the utilization of each stage of the stream.
+    '''
+
+    print(f"Utilization of the stages:")
+    for name, count, busy, wait_in, wait_out, depth, error in reports:
+        utilization = 100*busy/wall_time if wall_time > 0 else 0.0
+        print(f"\t{name:<10} frames: {count:<7} busy: {'%5.1f' % utilization}% \t starved: {'%7.3f' % wait_in} s \t blocked: {'%7.3f' % wait_out} s \t queue: {depth}{'' if error is None else '  ' + error}")
+    print(f"Total time spent {'%.3f' % wall_time} seconds.\n")
+
+def frame_pipeline(path_to_signal="../data/input_signal.wav", path_to_output="../data/output_signal.wav", function=None, N_FRAME=N_FRAME, HOP=None, mode="thread"):
+
+    '''
+    This function allows you to process a signal from a file with the extension ".wav" frame by frame (transform, process, inverse transform) and save the result to a file.
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav" (mono);
+        path_to_output ("str") - path to save the result and its name with ".wav" extension;
+        function (function of (FT, frequency) or None) - the function of the "process" stage (for example, band_pass(300, 3000)). If None, the spectrum is not changed.
+            (note: In the "process" mode, the function must be defined at the level of a module or made by "functools.partial".);
+        N_FRAME ("int" and a power of two) - number of values of a frame;
+        HOP ("int" or None) - distance between the beginnings of the frames (N_FRAME/2 or N_FRAME/4). If None, N_FRAME/2;
+        mode ("str" "thread", "process" or "serial") - each stage in a thread or in a process, or all stages one after another in this thread (for comparison).
+    The result of the function:
+        Return values:
+            reports ("list" of "tuple" (name, frames, busy, wait_in, wait_out, queue, error)) - the statistics of the stages (empty in the "serial" mode).
+        The result will be saved to the file, and the utilization of the stages will be printed.
+    '''
+
+    if HOP is None:
+        HOP = int(N_FRAME/2)
+    if N_FRAME % HOP != 0 or N_FRAME // HOP not in (2, 4):
+        raise ValueError(f'The distance between the frames must be N_FRAME/2 or N_FRAME/4 (the windows must sum to a constant), {HOP} was passed.')
+
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_worker.wave_info(path_to_signal)
+    if CHANNELS != 1:
+        raise ValueError(f'Only mono signals can be processed frame by frame, the file "{path_to_signal}" has {CHANNELS} channels.')
+
+    stages = [
+        ('read', frames_read, {'path_to_signal': path_to_signal, 'N_FRAME': N_FRAME, 'HOP': HOP}),
+        ('transform', frames_transform, {'N_FRAME': N_FRAME}),
+        ('process', frames_process, {'function': function or identity, 'RATE': RATE, 'N_FRAME': N_FRAME}),
+        ('inverse', frames_inverse, {}),
+        ('write', frames_write, {'path_to_output': path_to_output, 'RATE': RATE, 'SAMPLE_FORMAT': SAMPLE_FORMAT, 'IS_FLOAT': IS_FLOAT, 'N_FRAMES': N_FRAMES, 'N_FRAME': N_FRAME, 'HOP': HOP})
+    ]
+
+    print(f"The beginning of the frame processing ({N_FRAMES} values, frames of {N_FRAME} values, mode \"{mode}\").")
+    start_time = time.perf_counter()
+
+    if mode == "serial":
+        items = iter(())
+        for name, stage, parameters in stages:
+            items = stage(items, **parameters)
+        for item in items:
+            pass
+        wall_time = time.perf_counter() - start_time
+        print(f"The end of the frame processing. Time spent {'%.3f' % wall_time} seconds.\n")
+        return []
+
+    if mode == "process":
+        import multiprocessing
+        Queue, Worker = (lambda: multiprocessing.Queue(maxsize=QUEUE_SIZE)), multiprocessing.Process
+        reports = multiprocessing.Queue()
+    else:
+        Queue, Worker = (lambda: queue.Queue(maxsize=QUEUE_SIZE)), threading.Thread
+        reports = queue.Queue()
+
+    queues = [None] + [Queue() for i in range(len(stages) - 1)] + [None]
+    workers = [Worker(target=run_stage, args=(name, stage, parameters, queues[i], queues[i + 1], reports), daemon=True)
+               for i, (name, stage, parameters) in enumerate(stages)]
+    for worker in workers:
+        worker.start()
+
+    results = {}
+    for i in range(len(stages)):
+        result = reports.get()
+        results[result[0]] = result
+    for worker in workers:
+        worker.join()
+
+    wall_time = time.perf_counter() - start_time
+    results = [results[name] for name, stage, parameters in stages]
+    print(f"The end of the frame processing. The signal is saved in the \"{path_to_output}\" file.")
+    print_stages(results, wall_time)
+
+    errors = [f"{name}: {error}" for name, count, busy, wait_in, wait_out, depth, error in results if error is not None]
+    if errors:
+        raise RuntimeError(f"The frame processing failed ({'; '.join(errors)}).")
+    return results
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support() # Enable support for multiprocessing
+
+    for mode in ("serial", "thread", "process"):
+        frame_pipeline("../data/examples/signal_440hz_duration_11s-89ms.wav", "../data/filtered_signal_440hz.wav", band_pass(300, 600), mode=mode)
@@ -0,0 +1,122 @@
+'''
+This module is used to calculate the inverse discrete Fourier transform of a real signal directly from the half of its spectrum (from 0 to the Nyquist frequency).
+    (note: It is used for "inverse_fourier_transform", "inverse_fourier_transform_in_parallel" and "inverse_fast_fourier_transform" with mirror_image=True.)
+The spectrum of a real signal is Hermitian (FT[N_FRAMES - k] = conjugate(FT[k])), so the mirrored half (function "mirror") does not have to be built:
+    "hermitian_ifft" - the even and odd frames are packed into one complex signal of N_FRAMES/2 frames, which is calculated by one "fft" of half the size
+        (the result is viewed as real frames without copying);
+    "hermitian_idft" - the frames are calculated by the forward formula using only the bins from 0 to the Nyquist frequency (the imaginary part, which is zero, is not calculated).
+The real frames are rounded and written to a preallocated array of signal data ("to_samples"), so the memory is close to the size of the result.
+'''
+
+import numpy as np
+
+import isPowerOfTwo
+
+twiddles = {} # exp(2j*pi*k/N_FRAMES), k = 0 ... N_FRAMES/2 - 1, for each N_FRAMES
+
+def hermitian_size(FT):
+
+    '''
+    This function is used to get the number of frames of the signal whose spectrum from 0 to the Nyquist frequency is FT (the same number as after the "mirror" function).
+    '''
+
+    return 2*(len(FT) - 1)
+
+def hermitian_ifft(FT, token=None):
+
+    '''
+    This function is used to calculate the inverse discrete Fourier transform from the half of the spectrum using "fft" of half the size.
+    The following parameters are passed to the function:
+        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform from 0 to the Nyquist frequency (N_FRAMES/2 + 1 values, N_FRAMES is a power of two);
+        token ("dict" or None) - the token of the progress and the cancellation, passed to "fft" (please refer to "progress.py").
+    The result of the function:
+        Return values:
+            iFT ("numpy.ndarray" with dtype="numpy.float64") - the real values of the inverse discrete Fourier transform (N_FRAMES values)
+            or
+            -1 ("int") - if N_FRAMES is not a power of two
+            or
+            -3 ("int") - if the calculation was cancelled.
+    '''
+
+    import fast_fourier_transform
+
+    N_FRAMES = hermitian_size(FT)
+    if N_FRAMES < 2 or not isPowerOfTwo.isPowerOfTwo(N_FRAMES):
+        print(f'The amount of data of the mirrored spectrum ({N_FRAMES}) does not correspond to a power of two (the "hermitian_ifft" function cannot be used).')
+        print(f"The function terminates with a return of -1.")
+        return -1
+
+    M = int(N_FRAMES/2)
+    if N_FRAMES not in twiddles:
+        twiddles[N_FRAMES] = 1j*np.exp(2j*np.pi*np.arange(M)/N_FRAMES)
+
+    # Z[k] = E[k] + 1j*O[k]: E and O are the spectra of the even and odd frames, FT[k + M] = conjugate(FT[M - k]) is taken from the first half.
+    Z = np.conjugate(FT[M:0:-1])
+    odd = FT[:M] - Z
+    Z += FT[:M]
+    odd *= twiddles[N_FRAMES]
+    Z += odd
+    del odd
+
+    # The inverse transform of M frames through the forward one: ifft(Z) = conjugate(fft(conjugate(Z)))/M.
+    np.conjugate(Z, out=Z)
+    z = fast_fourier_transform.fft(Z, token=token)
+    if type(z) == int:
+        return z
+    np.conjugate(z, out=z)
+    z /= N_FRAMES # z[m] = x[2m] + 1j*x[2m+1]
+
+    return z.view(np.float64)
+
+def hermitian_idft(FT, index_start, index_stop, N_FRAMES=None):
+
+    '''
+    This function is used to calculate the frames from index_start to index_stop of the inverse discrete Fourier transform from the half of the spectrum by the forward formula (any amount of data):
+        x[n] = (FT[0] + (-1)**n * FT[N_FRAMES/2] + 2*sum(Re(FT[k]) * cos(2*pi*k*n/N_FRAMES) - Im(FT[k]) * sin(2*pi*k*n/N_FRAMES)))/N_FRAMES, k = 1 ... N_FRAMES/2 - 1.
+    The following parameters are passed to the function:
+        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform from 0 to the Nyquist frequency;
+        index_start, index_stop ("int") - the range of the calculated frames;
+        N_FRAMES ("int" or None) - the number of frames of the signal. If None, 2*(len(FT) - 1).
+    The result of the function:
+        Return values:
+            iFT ("numpy.ndarray" with dtype="numpy.float64") - the real values of the inverse discrete Fourier transform (index_stop - index_start values).
+    '''
+
+    if N_FRAMES is None:
+        N_FRAMES = hermitian_size(FT)
+
+    k = np.arange(1, len(FT) - 1)
+    real, imag = 2*FT[1:-1].real, 2*FT[1:-1].imag
+    iFT = np.zeros(shape=index_stop - index_start, dtype=np.float64)
+
+    for i, n in enumerate(range(index_start, index_stop)):
+        angle = 2*np.pi*(k*n % N_FRAMES)/N_FRAMES # k*n is reduced modulo N_FRAMES, so the angle is accurate for long signals
+        iFT[i] = (FT[0].real + (-1)**n * FT[-1].real + real @ np.cos(angle) - imag @ np.sin(angle))/N_FRAMES
+
+    return iFT
+
+def to_samples(iFT, out=None):
+
+    '''
+    This function is used to round the real values of the inverse discrete Fourier transform and write them to the array of signal data (values outside the range of the type are clipped).
+    The following parameters are passed to the function:
+        iFT ("numpy.ndarray" with dtype="numpy.float64") - the real values of the inverse discrete Fourier transform;
+        out ("numpy.ndarray" with dtype="numpy.int16" or "numpy.int32", or None) - the preallocated array for the signal data. If None, an array with dtype="numpy.int32" is created.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.int16" or "numpy.int32") - value of the signal data (the "out" array if it was passed).
+    '''
+
+    if out is None:
+        out = np.empty(shape=len(iFT), dtype=np.int32)
+
+    limits = np.iinfo(out.dtype)
+    np.clip(np.rint(iFT), limits.min, limits.max, out=out, casting='unsafe')
+    return out
+
+if __name__ == "__main__":
+    data_signal = np.random.default_rng(0).integers(-32768, 32768, size=1024)
+    FT = np.fft.rfft(data_signal)
+
+    print(f"hermitian_ifft: {np.array_equal(to_samples(hermitian_ifft(FT)), data_signal)}")
+    print(f"hermitian_idft: {np.array_equal(to_samples(hermitian_idft(FT, 0, 1024), np.empty(shape=1024, dtype=np.int16)), data_signal)}")
@@ -10,24 +10,34 @@ import time # Used to calculate the time spent on iFFT
 import numpy as np
 
 import isPowerOfTwo
+import hermitian_inverse
+import progress
 
-def ifft(FT):
+IFFT_CHECK = 2**12 # The token is checked by the sub-transforms of "ifft" of this size and larger (the smaller ones are not observed)
+
+def ifft(FT, token=None):
     
     '''
     This function is used to calculate the inverse discrete Fourier transform using the inverse fast Fourier Transform algorithm. (note: It is used for "inverse_fast_fourier_transform" but can also be used independently.)
     The following parameters are passed to the function:
-        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (note: The amount of data must be a power of two.).
+        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (note: The amount of data must be a power of two.);
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). The token is checked by the sub-transforms of IFFT_CHECK frames and larger,
+            the progress is reported in butterflies (N/2*log2(N) in total). If None, the calculation is not observed.
     The result of the function:
         Return values:
             iFT ("numpy.ndarray" with dtype="numpy.complex128") - values of the inverse discrete Fourier transform
             or
-            -1 ("int") - if the amount of data is not a power of two.
+            -1 ("int") - if the amount of data is not a power of two
+            or
+            -3 ("int") - if the calculation was cancelled.
     '''
 
     def iFFT(FT):
         n = len(FT) # n is a power of 2
         if n == 1:
             return FT
+        if n >= IFFT_CHECK and progress.progress_cancelled(token):
+            return FT # The result is not used after the cancellation
         omega = (cmath.cos(2*cmath.pi/n) + 1j*cmath.sin(2*cmath.pi/n))
         FT_even, FT_odd = FT[::2], FT[1::2]
         y_even, y_odd = iFFT(FT_even), iFFT(FT_odd)
@@ -35,6 +45,9 @@ def ifft(FT):
         for i in range(int(n/2)):
             iFT[i] = y_even[i]+(omega**i)*y_odd[i]
             iFT[i+int(n/2)] = y_even[i]-(omega**i)*y_odd[i]
+        if n >= IFFT_CHECK:
+            # The sub-transform of IFFT_CHECK frames reports its butterflies and the butterflies of its sub-transforms, the larger ones report only their own.
+            progress.progress_advance(token, int(n/2)*(n.bit_length() - 1) if n == IFFT_CHECK else int(n/2))
         return iFT
 
     # Checking that the amount of data corresponds to a power of two.
@@ -44,6 +57,10 @@ def ifft(FT):
         return -1
 
     iFT = iFFT(FT)
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the inverse fast Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
     iFT = iFT * (1/len(iFT))
     return iFT
 
@@ -66,21 +83,26 @@ def mirror(FT_need_mirror):
 
     return FT_need_mirror
 
-def inverse_fast_fourier_transform(FT, mirror_image=False):
+def inverse_fast_fourier_transform(FT, mirror_image=False, out=None, token=None):
     
     '''    
     This function allows you to calculate the inverse discrete Fourier transform (using the inverse fast Fourier transform algorithm (function "ifft")) and the value of the signal data.
     The following parameters are passed to the function:
         FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform. (note: The amount of data must be a power of two.);
-        mirror_image ("bool") - If "True", the "mirror" function will be called, if "False", the "mirror" function will not be called.
+        mirror_image ("bool") - If "True", FT is the spectrum from 0 to the Nyquist frequency: the inverse transform is calculated from it by "hermitian_ifft" from "hermitian_inverse.py"
+            (the result is the same as after the "mirror" function, but the mirrored spectrum is not built). If "False", FT is the whole spectrum;
+        out ("numpy.ndarray" with dtype="numpy.int16" or "numpy.int32", or None) - the preallocated array for the signal data. If None, an array with dtype="numpy.int32" is created;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
     The result of the function:
         Return values:
-            iFT ("numpy.ndarray" with dtype="numpy.complex128") - values of the inverse discrete Fourier transform;
-            data_signal ("numpy.ndarray" with dtype="numpy.int32") - value of the signal data
+            iFT ("numpy.ndarray" with dtype="numpy.complex128", or with dtype="numpy.float64" if mirror_image=True (the imaginary part is zero)) - values of the inverse discrete Fourier transform;
+            data_signal ("numpy.ndarray" with dtype="numpy.int32" or the dtype of "out") - value of the signal data
             or
             -1 ("int") - if the amount of data is not a power of two
             or
-            -2 ("int") - if an error occurs in the values of the discrete Fourier transform, incorrect data is provided, instead of the expected "numpy.ndarray" with dtype="numpy.complex128".
+            -2 ("int") - if an error occurs in the values of the discrete Fourier transform, incorrect data is provided, instead of the expected "numpy.ndarray" with dtype="numpy.complex128"
+            or
+            -3 ("int") - if the calculation was cancelled.
     '''
 
     # Checking for the correctness of the input data
@@ -93,24 +115,27 @@ def inverse_fast_fourier_transform(FT, mirror_image=False):
         mirror_image = False
         print(f'The boolean key value "mirror_image" is specified incorrectly. The default value is set:\n\t mirror_image = "{mirror_image}"')
 
-    if mirror_image == True:
-        FT = mirror(FT)
+    if token is None:
+        token = progress.progress_token()
 
     print(f"The beginning of the calculation of the inverse fast Fourier transform.")
-    print(f"iFFT progress...")
     start_time = time.time() # Starting the stopwatch
 
-    iFT = ifft(FT)
+    if mirror_image == True:
+        progress.progress_start(token, "iFFT", int(hermitian_inverse.hermitian_size(FT)/2))
+        iFT = hermitian_inverse.hermitian_ifft(FT, token)
+    else:
+        progress.progress_start(token, "iFFT", int(len(FT)/2)*(len(FT).bit_length() - 1))
+        iFT = ifft(FT, token)
 
     if type(iFT) == int:
-        return -1
+        return iFT
+    progress.progress_finish(token)
 
     end_time = time.time() - start_time # Stopping the stopwatch
     print(f"The end of the calculation of the inverse fast Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
-    data_signal = np.around(iFT.real)
-    data_signal = data_signal.astype(np.int32)
-    data_signal = data_signal
+    data_signal = hermitian_inverse.to_samples(iFT.real, out)
 
     return (iFT, data_signal)
 
@@ -124,4 +149,4 @@ if __name__ == "__main__":
                      (-103.7553472119934-76.84810214449848j),
                      (662-0j)], dtype=np.complex128)
 
-    inverse_fast_fourier_transform(test, True) # The length of "test" is 9, but inside the "inverse_fast_fourier_transform" function, the "mirror" function will be called (since the "True" flag was passed), resulting in the array size becoming 16 (which is a power of two, as required for the inverse fast Fourier transform algorithm).
+    inverse_fast_fourier_transform(test, True) # The length of "test" is 9, but since the "True" flag was passed, it is the half of the spectrum of a signal of 16 frames (which is a power of two, as required for the inverse fast Fourier transform algorithm).
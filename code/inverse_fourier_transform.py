@@ -8,6 +8,9 @@ import time # Used to calculate the time spent on iDFT
 
 import numpy as np
 
+import hermitian_inverse
+import progress
+
 def mirror(FT_need_mirror):
 
     '''
@@ -27,17 +30,24 @@ def mirror(FT_need_mirror):
     
     return FT_need_mirror
 
-def inverse_fourier_transform(FT, mirror_image=False):
+def inverse_fourier_transform(FT, mirror_image=False, out=None, token=None):
     
     '''
     This function allows you to calculate the inverse discrete Fourier transform and the value of the signal data.
     The following parameters are passed to the function:
         FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform;
-        mirror_image ("bool") - If "True", the "mirror" function will be called, if "False", the "mirror" function will not be called.
+        mirror_image ("bool") - If "True", FT is the spectrum from 0 to the Nyquist frequency: the frames are calculated from it by "hermitian_idft" from "hermitian_inverse.py"
+            (the result is the same as after the "mirror" function, but the mirrored spectrum is not built). If "False", FT is the whole spectrum;
+        out ("numpy.ndarray" with dtype="numpy.int16" or "numpy.int32", or None) - the preallocated array for the signal data. If None, an array with dtype="numpy.int32" is created;
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
     The result of the function:
         Return values:
-            iFT ("numpy.ndarray" with dtype="numpy.complex128") - values of the inverse discrete Fourier transform;
-            data_signal ("numpy.ndarray" with dtype="numpy.int32") - value of the signal data.
+            iFT ("numpy.ndarray" with dtype="numpy.complex128", or with dtype="numpy.float64" if mirror_image=True (the imaginary part is zero)) - values of the inverse discrete Fourier transform;
+            data_signal ("numpy.ndarray" with dtype="numpy.int32" or the dtype of "out") - value of the signal data
+            or
+            -2 ("int") - if an error occurs in the values of the discrete Fourier transform, incorrect data is provided, instead of the expected "numpy.ndarray" with dtype="numpy.complex128"
+            or
+            -3 ("int") - if the calculation was cancelled.
     '''
 
     # Checking for the correctness of the input data
@@ -50,35 +60,40 @@ def inverse_fourier_transform(FT, mirror_image=False):
         mirror_image = False
         print(f'The boolean key value "mirror_image" is specified incorrectly. The default value is set:\n\t mirror_image = "{mirror_image}"')
 
-    if mirror_image == True:
-        FT = mirror(FT)
+    N_FRAMES = hermitian_inverse.hermitian_size(FT) if mirror_image == True else FT.size
 
-    N_FRAMES = FT.size
+    iFT = np.zeros(shape=N_FRAMES, dtype=np.float64 if mirror_image == True else np.complex128) # Declaring an array for the inverse Fourier transform
 
-    iFT = np.zeros(shape=N_FRAMES, dtype=np.complex128) # Declaring an array for the inverse Fourier transform
+    if token is None:
+        token = progress.progress_token()
 
-    to_track_progress = int(N_FRAMES/10)
-    progress = 0
     print(f"The beginning of the calculation of the inverse discrete Fourier transform.")
-    print(f"iDFT progress: {progress}% \t Iteration: {0}\{N_FRAMES}")
+    progress.progress_start(token, "iDFT", N_FRAMES)
     start_time = time.time() # Starting the stopwatch
 
-    # inverse Discrete Fourier transform (iDFT)
-    for i in range(N_FRAMES):
-        if i == to_track_progress and progress < 90:
-                progress +=10
-                print(f"iDFT progress: {progress}% \t Iteration: {to_track_progress}\{N_FRAMES}")
-                to_track_progress += int(N_FRAMES/10)
-        precomp = 2*cmath.pi*i/N_FRAMES
-        iFT[i] = sum(FT[j] * (cmath.cos(precomp*j) + 1j*cmath.sin(precomp*j)) for j in range(N_FRAMES))
-        iFT[i] = iFT[i] * (1/N_FRAMES)
+    # The token is checked between the ranges of frames.
+    if mirror_image == True:
+        # inverse Discrete Fourier transform (iDFT) from the half of the spectrum, a range of frames at a time
+        for index_start, index_stop in progress.progress_ranges(token, 0, N_FRAMES):
+            iFT[index_start:index_stop] = hermitian_inverse.hermitian_idft(FT, index_start, index_stop, N_FRAMES)
+    else:
+        # inverse Discrete Fourier transform (iDFT)
+        for index_start, index_stop in progress.progress_ranges(token, 0, N_FRAMES):
+            for i in range(index_start, index_stop):
+                precomp = 2*cmath.pi*i/N_FRAMES
+                iFT[i] = sum(FT[j] * (cmath.cos(precomp*j) + 1j*cmath.sin(precomp*j)) for j in range(N_FRAMES))
+                iFT[i] = iFT[i] * (1/N_FRAMES)
+
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the inverse discrete Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
 
     end_time = time.time() - start_time # Stopping the stopwatch
-    print(f"iDFT progress: {100}% \t Iteration: {N_FRAMES}\{N_FRAMES}")
+    progress.progress_finish(token)
     print(f"The end of the calculation of the inverse discrete Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
-    data_signal = np.around(iFT.real)
-    data_signal = data_signal.astype(np.int32)
+    data_signal = hermitian_inverse.to_samples(iFT.real, out)
 
     return (iFT, data_signal)
 
@@ -1,38 +1,109 @@
 '''
 This module is used to calculate the inverse discrete Fourier transform and obtain signal data.
 The calculation of the inverse discrete Fourier transform is parallelized into 8 cores. If there are fewer or more cores, this will not cause problems.
+Each process calculates its part of the frames by matrix multiplication with the table of sines and cosines ("trig_table"), which is calculated once and shared between the processes.
 The inverse discrete Fourier transform is calculated from the data of the discrete Fourier transform. Signal data is the value of the signal in time.
 '''
 
 import multiprocessing
-import cmath
 import time # Used to calculate the time spent on iDFT
 
 import numpy as np
 
-def iDFT(index_start, index_stop, N_FRAMES, FT):
+import hermitian_inverse
+import progress
+
+BLOCK = 16 # Number of frames calculated by one row block of the table (the table has BLOCK rows of N_FRAMES values)
+
+def trig_table(N_FRAMES, out=None):
+
+    '''
+    This function is used to calculate the table of the inverse discrete Fourier transform: table[r, k] = exp(2j*pi*r*k/N_FRAMES), r = 0 ... BLOCK-1, k = 0 ... N_FRAMES-1.
+        The row 1 contains exp(2j*pi*m/N_FRAMES) for all m, so any other value is taken from it by the index (n*k) % N_FRAMES.
+    The following parameters are passed to the function:
+        N_FRAMES ("int") - the number of frames;
+        out ("numpy.ndarray" with dtype="numpy.complex128" and shape (BLOCK, N_FRAMES) or None) - the array for the table (for example, in shared memory).
+    The result of the function:
+        Return values:
+            table ("numpy.ndarray" with dtype="numpy.complex128") - the table.
+    '''
+
+    if out is None:
+        out = np.empty(shape=(BLOCK, N_FRAMES), dtype=np.complex128)
+
+    k = np.arange(N_FRAMES, dtype=np.int64)
+    out[1] = np.exp(2j*np.pi*k/N_FRAMES)
+    for r in range(BLOCK):
+        if r != 1:
+            out[r] = out[1][r*k % N_FRAMES]
+
+    return out
+
+def iDFT(index_start, index_stop, N_FRAMES, FT, real_output=False, table_name=None, token_name=None, slot=0):
 
     '''
-    This function is used to calculate the inverse discrete Fourier transform when parallelizing calculations. (note: This function is used in conjunction with the "inverse_fourier_transform_in_parallel" function. The "iDFT" function is not used separately.)
+    This function is used to calculate the inverse discrete Fourier transform when parallelizing calculations. (note: This function is used in conjunction with the "inverse_fourier_transform_in_parallel" function, but can also be used separately.)
+    The frames are calculated in blocks of BLOCK frames n0, n0+1, ..., n0+BLOCK-1 by matrix multiplication:
+        x[n0 + r] = sum(table[r, k] * (FT[k] * exp(2j*pi*n0*k/N_FRAMES)))/N_FRAMES, BLOCK blocks at once (the sines and cosines are taken from the table, they are not calculated).
     The following parameters are passed to the function:
         index_start (dtype="numpy.uint32") - index of the beginning of the calculation; 
         index_stop (dtype="numpy.uint32") - index of the end of the calculation;
         N_FRAMES ("int") - the number of frames;
-        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform.
+        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (the whole spectrum, or the spectrum from 0 to the Nyquist frequency if len(FT) < N_FRAMES);
+        real_output ("bool") - if "True", only the real part is calculated (always for the spectrum from 0 to the Nyquist frequency);
+        table_name ("str" or None) - the name of the shared memory with the table "trig_table" (created by "inverse_fourier_transform_in_parallel"). If None, the table is calculated;
+        token_name ("str" or None) - the name of the shared memory of the token (created by "progress.progress_share" in "inverse_fourier_transform_in_parallel"). If None, the progress is not reported;
+        slot ("int") - the number of the counter of this process in the token.
     The result of the function:
         Return values:
-            iFT ("numpy.ndarray" with dtype="numpy.complex128") - values of the inverse discrete Fourier transform (from index_start to the index_stop).
+            iFT ("numpy.ndarray" with dtype="numpy.complex128", or "numpy.float64" for the real part) - values of the inverse discrete Fourier transform
+                (from index_start to the index_stop, only this part; if the calculation was cancelled, only a part of them).
     '''
 
-    # inverse Discrete Fourier transform (iDFT)
-    iFT = np.zeros(shape=N_FRAMES, dtype=np.complex128)
+    index_start, index_stop = int(index_start), int(index_stop)
 
-    for i in range(index_start, index_stop):
-        precomp = 2*cmath.pi*i/N_FRAMES
-        iFT[i] = sum(FT[j] * (cmath.cos(precomp*j) + 1j*cmath.sin(precomp*j)) for j in range(N_FRAMES))
-        iFT[i] = iFT[i] * (1/N_FRAMES)
+    if table_name is not None:
+        from multiprocessing import shared_memory
+        memory = shared_memory.SharedMemory(name=table_name)
+        table = np.ndarray(shape=(BLOCK, N_FRAMES), dtype=np.complex128, buffer=memory.buf)
     else:
-        print(f"iDFT progress: +{12.5}% \t Iteration: {'%6d' % index_start} -> {'%6d' % i}\{N_FRAMES} completed.")
+        memory = None
+        table = trig_table(N_FRAMES)
+
+    K = len(FT)
+    if K < N_FRAMES:
+        # The spectrum from 0 to the Nyquist frequency: the bins from 1 to N_FRAMES/2 - 1 are counted twice (together with their mirror image), the result is real.
+        FT = FT * 2
+        FT[0], FT[-1] = FT[0]/2, FT[-1]/2
+        real_output = True
+
+    k = np.arange(K, dtype=np.int64)
+    rows = table[:, :K]
+    if real_output:
+        rows_real = np.hstack([rows.real, -rows.imag]) # Re(row @ V) = row.real @ V.real - row.imag @ V.imag as one product
+
+    starts = np.arange(index_start, index_stop, BLOCK, dtype=np.int64)
+    iFT = np.zeros(shape=(starts.size, BLOCK), dtype=np.float64 if real_output else np.complex128)
+
+    # The groups of BLOCK blocks, the flag of the cancellation is checked between the ranges of groups.
+    token = progress.worker_token(token_name, slot)
+    for group_start, group_stop in progress.progress_ranges(token, 0, -(-starts.size // BLOCK), BLOCK*BLOCK):
+        for group in range(group_start*BLOCK, group_stop*BLOCK, BLOCK):
+            n0 = starts[group:group + BLOCK]
+            V = FT[:, None] * table[1][np.outer(k, n0) % N_FRAMES] # shape (K, blocks)
+            if real_output:
+                iFT[group:group + BLOCK] = (rows_real @ np.concatenate([V.real, V.imag])).T
+            else:
+                iFT[group:group + BLOCK] = (rows @ V).T
+    progress.worker_release(token)
+
+    iFT = iFT.reshape(-1)[:index_stop - index_start]
+    iFT /= N_FRAMES
+
+    # The views of the shared memory are released before it is closed.
+    del table, rows
+    if memory is not None:
+        memory.close()
 
     return iFT
 
@@ -55,17 +126,26 @@ def mirror(FT_need_mirror):
 
     return FT_need_mirror
 
-def inverse_fourier_transform_in_parallel(FT, mirror_image=False):
+def inverse_fourier_transform_in_parallel(FT, mirror_image=False, out=None, real_output=False, token=None):
     
     '''
     This function allows you to calculate the inverse discrete Fourier transform (parallelizing calculations by 8 cores) and the value of the signal data.
     The following parameters are passed to the function:
         FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform;
-        mirror_image ("bool") - If "True", the "mirror" function will be called, if "False", the "mirror" function will not be called.
+        mirror_image ("bool") - If "True", FT is the spectrum from 0 to the Nyquist frequency: the frames are calculated from it directly
+            (the result is the same as after the "mirror" function, but the mirrored spectrum is not built). If "False", FT is the whole spectrum;
+        out ("numpy.ndarray" with dtype="numpy.int16" or "numpy.int32", or None) - the preallocated array for the signal data. If None, an array with dtype="numpy.int32" is created;
+        real_output ("bool") - if "True", only the real part of the inverse transform is calculated (half of the calculations, enough for the signal data);
+        token ("dict" or None) - the token of the progress and the cancellation (please refer to "progress.py"). If None, the progress is printed.
+            The processes report their progress and check the cancellation through shared memory, so a cancelled calculation stops in all processes.
     The result of the function:
         Return values:
-            iFT ("numpy.ndarray" with dtype="numpy.complex128") - values of the inverse discrete Fourier transform;
-            data_signal ("numpy.ndarray" with dtype="numpy.int32") - value of the signal data.
+            iFT ("numpy.ndarray" with dtype="numpy.complex128", or with dtype="numpy.float64" if mirror_image=True or real_output=True) - values of the inverse discrete Fourier transform;
+            data_signal ("numpy.ndarray" with dtype="numpy.int32" or the dtype of "out") - value of the signal data
+            or
+            -2 ("int") - if an error occurs in the values of the discrete Fourier transform, incorrect data is provided, instead of the expected "numpy.ndarray" with dtype="numpy.complex128"
+            or
+            -3 ("int") - if the calculation was cancelled.
     '''
 
     # Checking for the correctness of the input data
@@ -78,15 +158,16 @@ def inverse_fourier_transform_in_parallel(FT, mirror_image=False):
         mirror_image = False
         print(f'The boolean key value "mirror_image" is specified incorrectly. The default value is set:\n\t mirror_image = "{mirror_image}"')
 
-    if mirror_image == True:
-        FT = mirror(FT)
+    N_FRAMES = hermitian_inverse.hermitian_size(FT) if mirror_image == True else FT.size
+    real_output = real_output == True or mirror_image == True
 
-    N_FRAMES = FT.size
+    iFT = np.zeros(shape=N_FRAMES, dtype=np.float64 if real_output else np.complex128) # Declaring an array for the inverse Fourier transform
 
-    iFT = np.zeros(shape=N_FRAMES, dtype=np.complex128) # Declaring an array for the inverse Fourier transform
+    if token is None:
+        token = progress.progress_token()
 
     print(f"The beginning of the calculation of the inverse discrete Fourier transform.")
-    print(f"iDFT progress: {0}% \t Iteration: {0}\{N_FRAMES}")
+    progress.progress_start(token, "iDFT", N_FRAMES)
     start_time = time.time() # Starting the stopwatch
 
     # Creating calculation intervals for each core
@@ -97,28 +178,36 @@ def inverse_fourier_transform_in_parallel(FT, mirror_image=False):
         interval[i] = interval[i-1] + step
     interval[8] = N_FRAMES
 
-    # Parallelization of iDFT calculation on 8 cores. (If there are fewer or more cores, this is not a problem)
-    with multiprocessing.Pool(multiprocessing.cpu_count()) as p:
-        temp = p.starmap(iDFT, [(interval[0], interval[1], N_FRAMES, FT),
-                                (interval[1], interval[2], N_FRAMES, FT),
-                                (interval[2], interval[3], N_FRAMES, FT),
-                                (interval[3], interval[4], N_FRAMES, FT),
-                                (interval[4], interval[5], N_FRAMES, FT),
-                                (interval[5], interval[6], N_FRAMES, FT),
-                                (interval[6], interval[7], N_FRAMES, FT),
-                                (interval[7], interval[8], N_FRAMES, FT)])
-
-    # Assembling data from a parallel computation into a single data array
+    # The table of sines and cosines is calculated once and placed in shared memory (the processes do not receive copies of it).
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(create=True, size=BLOCK*N_FRAMES*16)
+    token_name = progress.progress_share(token, 8)
+    try:
+        trig_table(N_FRAMES, np.ndarray(shape=(BLOCK, N_FRAMES), dtype=np.complex128, buffer=memory.buf))
+
+        # Parallelization of iDFT calculation on 8 cores. (If there are fewer or more cores, this is not a problem)
+        # The processes report their progress through the shared memory of the token, and the progress is reported while waiting for them.
+        with multiprocessing.Pool(multiprocessing.cpu_count()) as p:
+            temp = progress.pool_wait(token, p.starmap_async(iDFT, [(interval[i], interval[i+1], N_FRAMES, FT, real_output, memory.name, token_name, i) for i in range(8)]))
+    finally:
+        progress.progress_unshare(token)
+        memory.close()
+        memory.unlink()
+
+    if progress.progress_cancelled(token):
+        print(f"The calculation of the inverse discrete Fourier transform was cancelled.")
+        print(f"The function terminates with a return of -3.")
+        return -3
+
+    # Assembling data from a parallel computation into a single data array (each process returns only its part)
     for i in range(len(interval)-1):
-        for j in range(interval[i], interval[i+1]):
-            iFT[j]=temp[i][j]
+        iFT[interval[i]:interval[i+1]] = temp[i]
 
     end_time = time.time() - start_time # Stopping the stopwatch
-    print(f"iDFT progress: {100}% \t Iteration: {N_FRAMES}\{N_FRAMES}")
+    progress.progress_finish(token)
     print(f"The end of the calculation of the inverse discrete Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
 
-    data_signal = np.around(iFT.real)
-    data_signal = data_signal.astype(np.int32)
+    data_signal = hermitian_inverse.to_samples(iFT.real, out)
 
     return (iFT, data_signal)
 
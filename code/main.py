@@ -1,18 +1,17 @@
-import multiprocessing
-
-import matplotlib.pyplot as plt
-
-import signal_recording
-import signal_playback
-import signal_generator
-import building_a_wave
-import fourier_transform # Does not require data of degree two
-import fourier_transform_in_parallel # Does not require data of degree two
-import fast_fourier_transform # Requires data of degree two
-import inverse_fourier_transform # Does not require data of degree two
-import inverse_fourier_transform_in_parallel # Does not require data of degree two
-import inverse_fast_fourier_transform # Requires data of degree two
-import wave_worker
+'''
+The modules used by the examples are imported inside the examples, so the menu is shown without loading "matplotlib", "pyaudio" and the calculation modules.
+    Each example loads only the modules it uses. (note: the start time can be checked with the "startup_benchmark.py" module.)
+'''
+
+def interactive_plotting():
+
+    '''
+    This function is used to load "matplotlib" and enable its interactive mode before the first graph is plotted.
+        Note: The program continues to work after the graph is displayed.
+    '''
+
+    import matplotlib.pyplot as plt
+    plt.ion()  # Enables interactive mode
 
 def example1():
 
@@ -26,6 +25,15 @@ def example1():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_recording
+    import signal_playback
+    import building_a_wave
+    import fourier_transform # Does not require data of degree two
+    import inverse_fourier_transform # Does not require data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/input_signal.wav"
     filename_output = "../data/output_signal.wav"
     rate_low = 4000
@@ -55,6 +63,15 @@ def example2():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_recording
+    import signal_playback
+    import building_a_wave
+    import fourier_transform_in_parallel # Does not require data of degree two
+    import inverse_fourier_transform_in_parallel # Does not require data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/input_signal2.wav"
     filename_output = "../data/output_signal2.wav"
     rate_mid = 9000
@@ -86,6 +103,15 @@ def example3():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_recording
+    import signal_playback
+    import building_a_wave
+    import fast_fourier_transform # Requires data of degree two
+    import inverse_fast_fourier_transform # Requires data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/input_signal3.wav"
     filename_output = "../data/output_signal3.wav"
     rate_high = 44100
@@ -117,6 +143,14 @@ def example4():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_playback
+    import building_a_wave
+    import fast_fourier_transform # Requires data of degree two
+    import inverse_fast_fourier_transform # Requires data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/examples/signal_440hz_duration_11s-89ms.wav"
     filename_output = "../data/reconstructed_signal_440hz_duration_11s-89ms.wav"
     rate = 11025
@@ -150,6 +184,15 @@ def example5():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_playback
+    import signal_generator
+    import building_a_wave
+    import fast_fourier_transform # Requires data of degree two
+    import inverse_fast_fourier_transform # Requires data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/input_generated_signal5.wav"
     filename_output = "../data/output_generated_signal5.wav"
     rate_high = 44100
@@ -182,6 +225,15 @@ def example6():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_playback
+    import signal_generator
+    import building_a_wave
+    import fast_fourier_transform # Requires data of degree two
+    import inverse_fast_fourier_transform # Requires data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input = "../data/input_generated_signal6.wav"
     filename_output = "../data/output_generated_signal6.wav"
     rate_high = 44100
@@ -216,6 +268,15 @@ def example7():
     note: The graphs of the "input" and "output" signals will coincide.
     '''
 
+    import signal_playback
+    import signal_generator
+    import building_a_wave
+    import fast_fourier_transform # Requires data of degree two
+    import inverse_fast_fourier_transform # Requires data of degree two
+    import wave_worker
+
+    interactive_plotting()
+
     filename_input1 = "../data/input_generated_signal_sum7.wav"
     filename_input2 = "../data/input_generated_signal_sequence7.wav"
     filename_signal_concatenate = "../data/concatenated_generated_signal7.wav"
@@ -307,8 +368,67 @@ def main():
         if answer == -10:
             break
 
+def cli(argv=None):
+
+    '''
+    This function is the command-line interface of the program.
+        python main.py                                  - the interactive menu;
+        python main.py example 4                        - run the example 4 (0 - all examples);
+        python main.py help                             - information about the examples;
+        python main.py pipeline PIPELINE [INPUTS ...]   - run the pipeline described in the ".json" file PIPELINE (see "pipeline.py");
+        python main.py analyzer [--synthetic]           - show the spectrum of the microphone (or of a generated signal) in real time (see "spectrum_analyzer.py").
+    The following parameters are passed to the function:
+        argv ("list" of "str" or None) - command-line arguments. If None, the arguments of the program are used.
+    The result of the function:
+        Return values:
+            True ("bool") - if the interactive menu was used
+            or
+            False ("bool") - if a command was executed.
+    '''
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Signal analysis and processing.")
+    commands = parser.add_subparsers(dest="command")
+
+    command_example = commands.add_parser("example", help="run an example (0 - all examples)")
+    command_example.add_argument("number", type=int, choices=range(0, 8))
+
+    commands.add_parser("help", help="show information about the examples")
+
+    command_pipeline = commands.add_parser("pipeline", help='run the pipeline described in a ".json" file')
+    command_pipeline.add_argument("pipeline", help='the path to the ".json" file with the description of the pipeline')
+    command_pipeline.add_argument("inputs", nargs="*", help='paths to ".wav" files (replace the "inputs" of the description)')
+    command_pipeline.add_argument("--workers", type=int, default=None, help="number of processes")
+
+    command_analyzer = commands.add_parser("analyzer", help="show the spectrum of a live signal in real time")
+    command_analyzer.add_argument("--synthetic", action="store_true", help="analyse a generated signal instead of the microphone")
+    command_analyzer.add_argument("--seconds", type=float, default=None, help="duration (by default, until the window is closed)")
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return True
+
+    if args.command == "example":
+        examples = [example1, example2, example3, example4, example5, example6, example7]
+        for number, example in enumerate(examples, start=1):
+            if args.number == number or args.number == 0:
+                example()
+    elif args.command == "help":
+        help()
+    elif args.command == "pipeline":
+        import pipeline
+        pipeline.run_pipeline(args.pipeline, inputs=args.inputs or None, workers=args.workers)
+    elif args.command == "analyzer":
+        import spectrum_analyzer
+        spectrum_analyzer.spectrum_analyzer(source="synthetic" if args.synthetic else "microphone", SECONDS=args.seconds)
+
+    return False
+
 if __name__ == "__main__":
+    import multiprocessing
     multiprocessing.freeze_support()  # Enable support for multiprocessing
-    plt.ion()  # Enables interactive mode (The program continues to work after the graph is displayed)
-    main()
-    input("Have a great day! Press enter...\t")
+    if cli():
+        input("Have a great day! Press enter...\t")
@@ -0,0 +1,391 @@
+'''
+This module is used to run a processing pipeline described in a ".json" file.
+The pipeline consists of stages (generation or reading of a signal, resampling, direct and inverse discrete Fourier transforms, writing and plotting),
+    the signal data is passed from stage to stage in memory, without saving intermediate results to ".wav" files.
+The input files are processed concurrently (one file per process), and the throughput of each stage is reported.
+
+Example of a pipeline description (see also "../data/source/pipeline_example.json"):
+    {
+        "inputs": ["../data/examples/*.wav"],
+        "workers": 4,
+        "stages": [
+            {"stage": "read"},
+            {"stage": "resample", "rate": 11025},
+            {"stage": "fft"},
+            {"stage": "plot_spectrum", "path_to_signal": "../data/pipeline/{name}.wav"},
+            {"stage": "ifft", "mirror_image": true},
+            {"stage": "write", "output": "../data/pipeline/reconstructed_{name}.wav"}
+        ]
+    }
+The elements of "inputs" are paths to ".wav" files (wildcards are allowed) or descriptions of generated signals
+    (example: {"name": "chord", "type": "sum", "seconds": 2.98, "rate": 44100, "frequencies": [440, 554, 659]}), which are used by the "generate" stage.
+    The "load" stage accepts both kinds of inputs.
+'''
+
+import glob
+import json
+import os
+import time # Used to calculate the time spent on each stage
+
+import numpy as np
+
+def stage_read(item):
+
+    '''
+    Stage "read": the signal data is read from the ".wav" file (the input of the pipeline is the path to the file).
+    '''
+
+    if type(item['source']) != str:
+        raise ValueError(f'The "read" stage expects the path to a ".wav" file, but "{item["source"]}" was passed.')
+
+    import wave_worker
+
+    item['data_signal'], item['N_FRAMES'], item['RATE'], item['CHANNELS'], item['SAMPLE_FORMAT'] = wave_worker.wave_read(item['source'])
+    item['IS_FLOAT'] = wave_worker.wave_info(item['source'])[4] # The "write" stage keeps the format of the input (32-bit floating point data is not converted to integers)
+    item['path'] = item['source']
+    return item
+
+def stage_generate(item):
+
+    '''
+    Stage "generate": the signal is generated from the sum or sequence of sinusoids (the input of the pipeline is the description of the signal).
+    '''
+
+    source = item['source']
+    if type(source) != dict:
+        raise ValueError(f'The "generate" stage expects a description of the signal, but "{source}" was passed.')
+
+    import signal_generator
+
+    generate = {
+        'sum': signal_generator.generate_signal_sum,
+        'sequence': signal_generator.generate_signal_sequence
+    }[source.get('type', 'sum')]
+
+    item['RATE'] = source.get('rate', 44100)
+    item['data_signal'] = generate(float(source.get('seconds', 5.0)), item['RATE'], source.get('frequencies', (440, 556, 659)))
+    item['N_FRAMES'] = item['data_signal'].size
+    item['CHANNELS'] = 1
+    item['SAMPLE_FORMAT'] = 2
+    item['IS_FLOAT'] = False
+    return item
+
+def stage_load(item):
+
+    '''
+    Stage "load": the "read" stage is used for the paths to ".wav" files and the "generate" stage is used for the descriptions of signals.
+    '''
+
+    if type(item['source']) == dict:
+        return stage_generate(item)
+    return stage_read(item)
+
+def stage_resample(item, rate=11025, method="polyphase"):
+
+    '''
+    Stage "resample": the sampling rate of the signal is changed (function "resample" from "resampling.py"), for example, to decimate a 44100 Hz recording before the transform.
+    '''
+
+    import resampling
+
+    item['data_signal'] = resampling.resample(item['data_signal'], item['RATE'], rate, method)
+    item['N_FRAMES'] = item['data_signal'].size
+    item['RATE'] = rate
+    item['path'] = None # The last file no longer corresponds to the signal data
+    return item
+
+def spectrum(item, FT, window="rectangular"):
+
+    '''
+    The values of the discrete Fourier transform (from 0 to the Nyquist frequency) are saved in the item together with the normalized amplitude and the frequencies.
+        The amplitude of a windowed signal is corrected by the coherent gain of the window ("window_amplitude" from "window_functions.py").
+    '''
+
+    import window_functions
+
+    item['FT'] = FT
+    item['window'] = window
+    item['amplitude'] = window_functions.window_amplitude(FT, item['N_FRAMES'], window) # Normalized signal amplitude
+    item['frequency'] = np.arange(FT.size) * item['RATE'] / item['N_FRAMES']
+    return item
+
+def stage_dft(item):
+
+    '''
+    Stage "dft": the discrete Fourier transform by the forward formula (function "dft" from "fourier_transform.py").
+    '''
+
+    import fourier_transform
+
+    item['backend'] = 'dft'
+    return spectrum(item, fourier_transform.dft(item['data_signal']))
+
+def stage_fft(item, window="rectangular"):
+
+    '''
+    Stage "fft": the fast Fourier transform (function "fft" from "fast_fourier_transform.py"). (note: the amount of data must be a power of two.)
+        If "window" is not "rectangular", the signal is multiplied by the window ("window_functions.py") before the transform (the signal data of the item is not changed).
+    '''
+
+    import fast_fourier_transform
+    import window_functions
+
+    data_signal = item['data_signal'] if window == "rectangular" else window_functions.apply_window(item['data_signal'], window)
+    FT = fast_fourier_transform.fft(data_signal)
+    if type(FT) == int:
+        raise ValueError(f'The amount of data of "{item["name"]}" ({item["N_FRAMES"]}) does not correspond to a power of two (the "fft" stage cannot be used).')
+
+    item['backend'] = 'fft'
+    return spectrum(item, FT[:int(item['N_FRAMES']/2) + 1], window)
+
+def stage_idft(item, mirror_image=True):
+
+    '''
+    Stage "idft": the inverse discrete Fourier transform by the forward formula (function "inverse_fourier_transform").
+    '''
+
+    import inverse_fourier_transform
+
+    item['iFT'], item['data_signal'] = inverse_fourier_transform.inverse_fourier_transform(item['FT'], mirror_image)
+    return item
+
+def stage_ifft(item, mirror_image=True):
+
+    '''
+    Stage "ifft": the inverse fast Fourier transform (function "inverse_fast_fourier_transform"). (note: the amount of data must be a power of two.)
+    '''
+
+    import inverse_fast_fourier_transform
+
+    result = inverse_fast_fourier_transform.inverse_fast_fourier_transform(item['FT'], mirror_image)
+    if type(result) == int:
+        raise ValueError(f'The inverse fast Fourier transform of "{item["name"]}" cannot be calculated (error code {result}).')
+
+    item['iFT'], item['data_signal'] = result
+    return item
+
+def stage_write(item, output="../data/pipeline/{name}.wav"):
+
+    '''
+    Stage "write": the current signal data is saved to a ".wav" file in the sound depth of the input. The "{name}" in the path is replaced with the name of the input.
+    '''
+
+    import wave_worker
+
+    path = output.format(name=item['name'])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    wave_worker.wave_write(path, item['data_signal'], item['RATE'], item['CHANNELS'], item['SAMPLE_FORMAT'], item['IS_FLOAT'])
+    item['path'] = path
+    item['outputs'].append(path)
+    return item
+
+def stage_write_spectrum(item, output="../data/pipeline/{name}.spec", mode="complex128"):
+
+    '''
+    Stage "write_spectrum": the current values of the discrete Fourier transform are saved to a ".spec" file (function "spectrum_write" from "spectrum_file.py").
+    '''
+
+    import spectrum_file
+
+    path = output.format(name=item['name'])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    spectrum_file.spectrum_write(path, item['FT'], item['RATE'], item['N_FRAMES'], mode, item.get('window', 'rectangular'), item.get('backend', ''))
+    item['outputs'].append(path)
+    return item
+
+def stage_plot_wave(item):
+
+    '''
+    Stage "plot_wave": the graph of the signal is saved (function "building_a_wave"). The last read or written ".wav" file is plotted.
+    '''
+
+    if item.get('path') is None:
+        raise ValueError(f'The "plot_wave" stage requires a ".wav" file, use the "read" or "write" stage before it.')
+
+    import matplotlib
+    matplotlib.use('Agg') # The graphs are only saved (the pipeline does not wait for the windows to be closed)
+    import matplotlib.pyplot as plt
+    import building_a_wave
+
+    building_a_wave.building_a_wave(item['path'])
+    plt.close('all')
+    return item
+
+def stage_plot_spectrum(item, path_to_signal="../data/pipeline/{name}.wav"):
+
+    '''
+    Stage "plot_spectrum": the graph of the discrete Fourier transform is saved (function "building_a_fourier_transform_graph").
+        The name of the graph is made from "path_to_signal" as in "building_a_fourier_transform_graph" (example: "../data/pipeline/fourier_transform_graph_{name}.png").
+    '''
+
+    import matplotlib
+    matplotlib.use('Agg') # The graphs are only saved (the pipeline does not wait for the windows to be closed)
+    import matplotlib.pyplot as plt
+    import building_a_fourier_transform_graph
+
+    path = path_to_signal.format(name=item['name'])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    building_a_fourier_transform_graph.building_a_fourier_transform_graph(item['frequency'], item['amplitude'], path)
+    plt.close('all')
+    return item
+
+STAGES = {
+    'read': stage_read,
+    'generate': stage_generate,
+    'load': stage_load,
+    'resample': stage_resample,
+    'dft': stage_dft,
+    'fft': stage_fft,
+    'idft': stage_idft,
+    'ifft': stage_ifft,
+    'write': stage_write,
+    'write_spectrum': stage_write_spectrum,
+    'plot_wave': stage_plot_wave,
+    'plot_spectrum': stage_plot_spectrum
+}
+
+def load_pipeline(path_to_pipeline):
+
+    '''
+    This function is used to read and check the description of the pipeline.
+    The following parameters are passed to the function:
+        path_to_pipeline ("str") - the path to the ".json" file with the description of the pipeline.
+    The result of the function:
+        Return values:
+            pipeline ("dict") - the description of the pipeline ("inputs", "stages" and "workers").
+    '''
+
+    with open(path_to_pipeline, 'r', encoding='utf-8') as f:
+        pipeline = json.load(f)
+
+    check_pipeline(pipeline)
+    return pipeline
+
+def check_pipeline(pipeline):
+
+    '''
+    This function is used to check the description of the pipeline. (note: If the description is incorrect, an exception is raised.)
+    The following parameters are passed to the function:
+        pipeline ("dict") - the description of the pipeline.
+    '''
+
+    if type(pipeline) != dict or type(pipeline.get('stages')) != list or len(pipeline['stages']) == 0:
+        raise ValueError(f'The pipeline is described incorrectly. The description must contain a non-empty list of "stages".')
+
+    for stage in pipeline['stages']:
+        if type(stage) != dict or stage.get('stage') not in STAGES:
+            raise ValueError(f'The stage "{stage}" is described incorrectly. Available stages: {", ".join(STAGES)}.')
+
+def expand_inputs(inputs):
+
+    '''
+    This function is used to expand the wildcards in the paths to the input files.
+    The following parameters are passed to the function:
+        inputs ("list") - paths to ".wav" files (wildcards are allowed) and descriptions of generated signals.
+    The result of the function:
+        Return values:
+            sources ("list" of "tuple" ("str", "str" or "dict")) - the names of the inputs and the inputs.
+    '''
+
+    sources = []
+    for source in inputs:
+        if type(source) == dict:
+            sources.append((source.get('name', f'generated_signal_{len(sources)}'), source))
+            continue
+
+        paths = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        for path in paths:
+            sources.append((os.path.splitext(os.path.basename(path))[0], path))
+
+    return sources
+
+def run_item(name, source, stages):
+
+    '''
+    This function is used to pass one input through all the stages of the pipeline. (note: It is used for "run_pipeline", each input is processed in a separate process.)
+    The following parameters are passed to the function:
+        name ("str") - the name of the input (used in the paths of the saved files);
+        source ("str" or "dict") - the path to the ".wav" file or the description of the generated signal;
+        stages ("list" of "dict") - the stages of the pipeline.
+    The result of the function:
+        Return values:
+            outputs ("list" of "str") - the paths to the saved ".wav" files;
+            timings ("list" of "tuple" ("str", "float", "int")) - the name of each stage, the time spent on it in seconds and the number of processed frames.
+    '''
+
+    item = {'name': name, 'source': source, 'outputs': []}
+    timings = []
+
+    for stage in stages:
+        parameters = {key: value for key, value in stage.items() if key != 'stage'}
+        start_time = time.perf_counter()
+        item = STAGES[stage['stage']](item, **parameters)
+        timings.append((stage['stage'], time.perf_counter() - start_time, item.get('N_FRAMES', 0)))
+
+    return item['outputs'], timings
+
+def print_report(results, wall_time):
+
+    '''
+    This function is used to print the throughput of each stage of the pipeline.
+    The following parameters are passed to the function:
+        results ("list") - the results of the "run_item" function for each input;
+        wall_time ("float") - total time of the pipeline in seconds.
+    '''
+
+    report = {}
+    for outputs, timings in results:
+        for stage, seconds, n_frames in timings:
+            stage_time, stage_frames, stage_files = report.get(stage, (0.0, 0, 0))
+            report[stage] = (stage_time + seconds, stage_frames + n_frames, stage_files + 1)
+
+    print(f"Pipeline throughput:")
+    for stage, (seconds, n_frames, n_files) in report.items():
+        throughput = n_frames / seconds if seconds > 0 else float('inf')
+        print(f"\t{stage:<14} files: {n_files:<6} time: {'%10.3f' % seconds} seconds \t throughput: {'%14.1f' % throughput} frames/second")
+    print(f"Total time spent {'%.3f' % wall_time} seconds.\n")
+
+def run_pipeline(pipeline, inputs=None, workers=None):
+
+    '''
+    This function allows you to run the pipeline for all the inputs.
+    The following parameters are passed to the function:
+        pipeline ("dict" or "str") - the description of the pipeline or the path to the ".json" file with it;
+        inputs ("list" or None) - the inputs of the pipeline. If None, the "inputs" from the description are used;
+        workers ("int" and greater than 0 or None) - the number of processes. If None, the "workers" from the description are used (by default, the number of cores).
+    The result of the function:
+        Return values:
+            results ("list" of "tuple") - the result of the "run_item" function for each input (in the order of the inputs).
+        The throughput of each stage will be printed.
+    '''
+
+    if type(pipeline) == str:
+        pipeline = load_pipeline(pipeline)
+    else:
+        check_pipeline(pipeline)
+
+    sources = expand_inputs(inputs if inputs is not None else pipeline.get('inputs', []))
+    if len(sources) == 0:
+        raise ValueError(f'The pipeline has no inputs.')
+
+    if workers is None:
+        workers = pipeline.get('workers', os.cpu_count())
+    workers = max(1, min(workers, len(sources)))
+
+    print(f"The pipeline has been launched: {len(sources)} inputs, {workers} processes, stages: {' -> '.join(stage['stage'] for stage in pipeline['stages'])}.")
+    start_time = time.perf_counter()
+
+    if workers == 1:
+        results = [run_item(name, source, pipeline['stages']) for name, source in sources]
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_item, name, source, pipeline['stages']) for name, source in sources]
+            results = [future.result() for future in futures]
+
+    print_report(results, time.perf_counter() - start_time)
+    return results
+
+if __name__ == "__main__":
+    run_pipeline("../data/source/pipeline_example.json")
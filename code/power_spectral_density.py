@@ -0,0 +1,191 @@
+'''
+This module is used to estimate the power spectral density of a signal by Welch's method (averaged periodogram) and plot the result on a graph (the graph is plotted if necessary).
+The signal is divided into overlapping segments, each segment is multiplied by a window and transformed by "fft" from "fast_fourier_transform.py", and the periodograms of the segments are averaged.
+    Unlike the single spectrum of "fast_fourier_transform", the estimate has a low variance, which is useful for noisy recordings.
+The segments are transformed in batches (one call of "fft" per batch). The file is read in pieces and the periodograms are summed as they are calculated,
+    so the memory does not grow with the length of the file. If necessary, the segments are divided between several processes.
+'''
+
+import time # Used to calculate the time spent on the estimation
+
+import numpy as np
+
+import wave_worker
+import fast_fourier_transform
+import isPowerOfTwo
+import window_functions
+
+BATCH = 64 # Number of segments transformed by one call of "fft"
+
+def segment_window(window, NPERSEG):
+
+    '''
+    This function is used to get the coefficients of the window of a segment (function "window_coefficients" from "window_functions.py", the coefficients are cached).
+    The following parameters are passed to the function:
+        window ("str" - one of "window_functions.WINDOWS", or "numpy.ndarray") - the window (an array is used as is);
+        NPERSEG ("int") - number of frames in a segment.
+    The result of the function:
+        Return values:
+            window ("numpy.ndarray" with dtype="numpy.float64") - the coefficients of the window (read-only).
+    '''
+
+    return window_functions.window_coefficients(window, NPERSEG)
+
+def periodogram_sum(data_signal, NPERSEG, step, window, index_start=0, index_stop=None):
+
+    '''
+    This function is used to calculate the sum of the periodograms of the segments of a signal. (note: It is used for "welch_psd" and for the parallel calculation.)
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data (the segments begin at the indices 0, step, 2*step, ...);
+        NPERSEG ("int" and a power of two) - number of frames in a segment;
+        step ("int" and greater than 0) - distance between the beginnings of the segments in frames;
+        window ("numpy.ndarray" with dtype="numpy.float64") - the coefficients of the window;
+        index_start, index_stop ("int") - the range of the indices of the segments that are calculated. (If index_stop is None, all complete segments are calculated.)
+    The result of the function:
+        Return values:
+            power ("numpy.ndarray" with dtype="numpy.float64") - the sum of |FT|**2 of the segments (from 0 to the Nyquist frequency);
+            n_segments ("int") - number of the summed segments.
+    '''
+
+    if index_stop is None:
+        index_stop = max(0, (len(data_signal) - NPERSEG) // step + 1)
+
+    power = np.zeros(shape=int(NPERSEG/2) + 1, dtype=np.float64)
+    offsets = np.arange(NPERSEG)
+    segments = np.empty(shape=(BATCH, NPERSEG), dtype=np.float64) # The windowed segments of a batch (the array is reused)
+
+    for batch_start in range(index_start, index_stop, BATCH):
+        starts = np.arange(batch_start, min(batch_start + BATCH, index_stop)) * step
+        windowed = window_functions.apply_window(np.asarray(data_signal)[starts[:, None] + offsets], window, segments[:starts.size]) # shape (segments, NPERSEG)
+        FT = fast_fourier_transform.fft(windowed)[:, :power.size]
+        power += (FT.real**2 + FT.imag**2).sum(axis=0)
+
+    return power, max(0, index_stop - index_start)
+
+def welch_psd(pieces, RATE, NPERSEG=1024, NOVERLAP=None, window="hann"):
+
+    '''
+    This function is used to estimate the power spectral density of a signal passed in pieces (the signal is not kept in memory).
+    The following parameters are passed to the function:
+        pieces (iterable of "numpy.ndarray") - the signal data in pieces (for example, "wave_worker.wave_read_chunks"). An array can be passed as a list with one element;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        NPERSEG ("int" and a power of two) - number of frames in a segment (the step between the frequencies is RATE/NPERSEG);
+        NOVERLAP ("int" from 0 to NPERSEG-1 or None) - number of common frames of neighboring segments. If None, NPERSEG/2;
+        window ("str" - one of "window_functions.WINDOWS", or "numpy.ndarray") - the window applied to the segments.
+    The result of the function:
+        Return values:
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - frequency in hertz (from 0 to the Nyquist frequency);
+            PSD ("numpy.ndarray" with dtype="numpy.float64") - power spectral density (square of the amplitude per hertz);
+            n_segments ("int") - number of the averaged segments.
+    '''
+
+    if NOVERLAP is None:
+        NOVERLAP = int(NPERSEG/2)
+    step = NPERSEG - NOVERLAP
+    window = segment_window(window, NPERSEG)
+
+    power = np.zeros(shape=int(NPERSEG/2) + 1, dtype=np.float64)
+    n_segments = 0
+    rest = np.zeros(shape=0, dtype=np.float64) # The frames of the incomplete segments from the previous pieces
+
+    for piece in pieces:
+        rest = np.concatenate([rest, np.asarray(piece, dtype=np.float64)])
+        piece_power, piece_segments = periodogram_sum(rest, NPERSEG, step, window)
+        power += piece_power
+        n_segments += piece_segments
+        rest = rest[piece_segments * step:]
+
+    return psd_from_power(power, n_segments, RATE, NPERSEG, window)
+
+def psd_from_power(power, n_segments, RATE, NPERSEG, window):
+
+    '''
+    This function is used to average and scale the sum of the periodograms into the one-sided power spectral density.
+    '''
+
+    frequency = np.arange(power.size) * RATE / NPERSEG
+    if n_segments == 0:
+        return frequency, power, 0
+
+    PSD = power / (n_segments * RATE * np.sum(window**2))
+    PSD[1:-1] *= 2 # The power of the negative frequencies is added to the positive ones (the first and last bins are not repeated)
+    return frequency, PSD, n_segments
+
+def power_spectral_density(path_to_signal="../data/input_signal.wav", NPERSEG=1024, NOVERLAP=None, window="hann", workers=1, need_to_plot=False):
+
+    '''
+    This function allows you to estimate the power spectral density (Welch's method) for a signal from a file with the extension ".wav" and plot the result on a graph (the graph is plotted if necessary).
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
+        NPERSEG ("int" and a power of two) - number of frames in a segment;
+        NOVERLAP ("int" from 0 to NPERSEG-1 or None) - number of common frames of neighboring segments. If None, NPERSEG/2;
+        window ("str" - one of "window_functions.WINDOWS", or "numpy.ndarray") - the window applied to the segments;
+        workers ("int" and greater than 0) - number of processes. If 1, the file is read in pieces in this process;
+        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called with the power spectral density instead of the amplitude.
+    The result of the function:
+        Return values:
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - frequency in hertz;
+            PSD ("numpy.ndarray" with dtype="numpy.float64") - power spectral density.
+        Graph (if "need_to_plot" = True):
+            Please refer to the result of the "building_a_fourier_transform_graph" function implemented in the "building_a_fourier_transform_graph.py" file.
+    '''
+
+    # Checking for the correctness of the input data
+    if type(path_to_signal) != str or '.wav' not in path_to_signal:
+        path_to_signal = "../data/input_signal.wav"
+        print(f'The path to the signal for power_spectral_density is specified incorrectly. The default value is set:\n\t path_to_signal = "{path_to_signal}"')
+
+    if type(NPERSEG) != int or not isPowerOfTwo.isPowerOfTwo(NPERSEG):
+        NPERSEG = 1024
+        print(f'The number of frames in a segment must be a power of two. The default value is set:\n\t NPERSEG = {NPERSEG}')
+
+    if NOVERLAP is not None and (type(NOVERLAP) != int or not 0 <= NOVERLAP < NPERSEG):
+        NOVERLAP = None
+        print(f'The overlap of the segments is specified incorrectly. The default value is set:\n\t NOVERLAP = {int(NPERSEG/2)}')
+
+    if type(workers) != int or workers <= 0:
+        workers = 1
+        print(f'The number of processes is specified incorrectly. The default value is set:\n\t workers = {workers}')
+
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_worker.wave_info(path_to_signal)
+
+    print(f"The beginning of the estimation of the power spectral density (Welch's method).")
+    start_time = time.time() # Starting the stopwatch
+
+    if workers == 1:
+        frequency, PSD, n_segments = welch_psd(wave_worker.wave_read_chunks(path_to_signal), RATE, NPERSEG, NOVERLAP, window)
+    else:
+        import concurrent.futures
+
+        step = NPERSEG - (int(NPERSEG/2) if NOVERLAP is None else NOVERLAP)
+        n_segments = max(0, (N_FRAMES - NPERSEG) // step + 1)
+        bounds = np.linspace(0, n_segments, workers + 1).astype(int)
+
+        # Each process reads the file itself (the 16-bit and 32-bit data is mapped to memory and not copied).
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(file_periodogram_sum, path_to_signal, NPERSEG, step, window, bounds[i], bounds[i+1]) for i in range(workers)]
+            power = sum(future.result()[0] for future in futures)
+
+        frequency, PSD, n_segments = psd_from_power(power, n_segments, RATE, NPERSEG, segment_window(window, NPERSEG))
+
+    end_time = time.time() - start_time # Stopping the stopwatch
+    print(f"The end of the estimation of the power spectral density ({n_segments} segments). Time spent {'%.3f' % end_time} seconds.\n")
+
+    if need_to_plot == True:
+        import building_a_fourier_transform_graph # "matplotlib" is loaded only when the graph is needed
+        building_a_fourier_transform_graph.building_a_fourier_transform_graph(frequency, PSD, path_to_signal)
+
+    return (frequency, PSD)
+
+def file_periodogram_sum(path_to_signal, NPERSEG, step, window, index_start, index_stop):
+
+    '''
+    This function is used to calculate the sum of the periodograms of a range of segments of a file in a separate process. (note: It is used for "power_spectral_density".)
+    '''
+
+    data_signal = wave_worker.wave_read(path_to_signal, USE_MMAP=True)[0]
+    return periodogram_sum(data_signal, NPERSEG, step, segment_window(window, NPERSEG), index_start, index_stop)
+
+if __name__ == "__main__":
+    frequency, PSD = power_spectral_density("../data/examples/signal_440hz_duration_11s-89ms.wav", NPERSEG=2048)
+    print(f"The strongest frequency: {frequency[np.argmax(PSD)]} Hz")
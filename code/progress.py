@@ -0,0 +1,238 @@
+'''
+This module is used to observe the progress of the forward and inverse transforms and to cancel them (for example, from a graphical interface or a service).
+A token ("progress_token") is passed to a transform:
+    the transform reports the number of finished iterations, and the callback of the token is called not more often than once per "interval" seconds
+        (the first and the last report are always made); by default, the progress is printed ("print_progress");
+    "progress_cancel" (from another thread or from the callback) asks the transform to stop: the transform stops at the next check and returns -3.
+The loops of the transforms do not check the token in each iteration: they iterate over the ranges of "progress_ranges", whose size is adapted
+    so that one range takes about CHECK_SECONDS, so the token is checked a few times per second regardless of the cost of an iteration.
+The processes of a pool get the token through shared memory ("progress_share", "worker_token"): the flag of the cancellation and one counter per process,
+    the process writes its counter and reads the flag without messages, and the main process sums the counters ("progress_collect").
+'''
+
+import time # Used to limit the rate of the callbacks
+
+import numpy as np
+
+PROGRESS_INTERVAL = 1.0 # Minimum interval between two calls of the callback in seconds
+CHECK_SECONDS = 0.05 # The token is checked about once per this time (the size of the ranges of "progress_ranges" is adapted)
+POLL_SECONDS = 0.05 # Interval of polling of the processes of a pool by the main process
+
+def print_progress(label, done, total, elapsed):
+
+    '''
+    This function is used as the callback of a token by default: it prints the progress of the transform.
+    '''
+
+    print(f"{label} progress: {int(100*done/total) if total > 0 else 100}% \t Iteration: {done}\\{total} \t Time: {'%.1f' % elapsed} s")
+
+def progress_token(callback=print_progress, interval=PROGRESS_INTERVAL):
+
+    '''
+    This function is used to create a token of the progress and the cancellation.
+    The following parameters are passed to the function:
+        callback (function of (label, done, total, elapsed) or None) - it is called with the name of the transform, the number of finished and all iterations
+            and the time since the beginning in seconds. If None, the progress is not reported (only the cancellation is used);
+        interval ("float" and not less than 0) - minimum interval between two calls of the callback in seconds.
+    The result of the function:
+        Return values:
+            token ("dict") - the token (pass it to the transforms with the parameter "token"; the same token can be used for several transforms one after another).
+    '''
+
+    return {
+        'callback': callback,
+        'interval': interval,
+        'cancelled': False,
+        'label': '',
+        'done': 0,
+        'total': 0,
+        'start_time': time.perf_counter(),
+        'last_report': 0.0,
+        'memory': None, # The shared memory for the processes of a pool ("progress_share")
+        'flags': None # [the flag of the cancellation, the counters of the processes] in the shared memory
+    }
+
+def progress_report(token, force=False):
+
+    '''
+    This function is used to call the callback of a token (not more often than once per "interval" seconds, unless "force" is True).
+    '''
+
+    now = time.perf_counter()
+    if token['callback'] is not None and (force or now - token['last_report'] >= token['interval']):
+        token['last_report'] = now
+        token['callback'](token['label'], token['done'], token['total'], now - token['start_time'])
+
+def progress_start(token, label, total):
+
+    '''
+    This function is used by a transform to start the reporting: "label" - the name of the transform, "total" - the number of iterations.
+    '''
+
+    if token is None:
+        return
+    token['label'], token['done'], token['total'] = label, 0, total
+    token['start_time'] = time.perf_counter()
+    progress_report(token, force=True)
+
+def progress_advance(token, amount):
+
+    '''
+    This function is used by a transform to add "amount" finished iterations (in a process of a pool, the counter of the process is increased).
+    '''
+
+    if token is None:
+        return
+    if 'slot' in token:
+        token['flags'][1 + token['slot']] += amount
+        return
+    token['done'] += amount
+    progress_report(token)
+
+def progress_finish(token):
+
+    '''
+    This function is used by a transform to report the end of the calculation (if it was not cancelled).
+    '''
+
+    if token is None or progress_cancelled(token):
+        return
+    token['done'] = token['total']
+    progress_report(token, force=True)
+
+def progress_cancel(token):
+
+    '''
+    This function is used to ask the transform to stop (it can be called from another thread or from the callback).
+        The transform stops at the next check (after about CHECK_SECONDS), the processes of a pool stop too.
+    '''
+
+    token['cancelled'] = True
+    if token['flags'] is not None:
+        token['flags'][0] = 1
+
+def progress_cancelled(token):
+
+    '''
+    This function is used to check whether the cancellation was asked.
+    '''
+
+    if token is None:
+        return False
+    if token['flags'] is not None and token['flags'][0] != 0:
+        return True
+    return token.get('cancelled', False)
+
+def progress_ranges(token, index_start, index_stop, unit=1):
+
+    '''
+    This function is used to iterate over the iterations from index_start to index_stop in ranges (the token is checked between the ranges).
+    The size of a range begins with 1 and is doubled while a range takes less than CHECK_SECONDS (halved if it takes more than 4*CHECK_SECONDS).
+    The following parameters are passed to the function:
+        token ("dict" or None) - the token ("progress_token" or "worker_token"). If None, the ranges are not checked;
+        index_start, index_stop ("int") - the iterations;
+        unit ("int") - number of reported iterations per iteration of the range (for example, the frames of a block).
+    The result of the function:
+        Generator of "tuple" ("int", "int") - the ranges (start, stop) of the iterations. If the cancellation is asked, the generator stops.
+    '''
+
+    size = 1
+    while index_start < index_stop:
+        if progress_cancelled(token):
+            return
+        stop = min(index_start + size, index_stop)
+        start_time = time.perf_counter()
+        yield index_start, stop
+        elapsed = time.perf_counter() - start_time
+        if elapsed < CHECK_SECONDS:
+            size *= 2
+        elif elapsed > 4*CHECK_SECONDS and size > 1:
+            size //= 2
+        progress_advance(token, unit*(stop - index_start))
+        index_start = stop
+
+def progress_share(token, workers):
+
+    '''
+    This function is used to place the flag of the cancellation and the counters of "workers" processes in shared memory.
+    The result of the function:
+        Return values:
+            name ("str" or None) - the name of the shared memory (it is passed to the processes, please refer to "worker_token"). If the token is None, None.
+    '''
+
+    if token is None:
+        return None
+
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(create=True, size=8*(1 + workers))
+    token['memory'] = memory
+    token['flags'] = np.ndarray(shape=1 + workers, dtype=np.int64, buffer=memory.buf)
+    token['flags'][:] = 0
+    token['flags'][0] = 1 if token['cancelled'] else 0
+    return memory.name
+
+def progress_collect(token, base=0):
+
+    '''
+    This function is used by the main process to report the progress of the processes of a pool (the sum of their counters plus "base").
+    '''
+
+    if token is None or token['flags'] is None:
+        return
+    token['done'] = min(token['total'], base + int(token['flags'][1:].sum()))
+    progress_report(token)
+
+def progress_unshare(token):
+
+    '''
+    This function is used to release the shared memory of "progress_share" (the flag of the cancellation is kept in the token).
+    '''
+
+    if token is None or token['memory'] is None:
+        return
+    token['cancelled'] = progress_cancelled(token)
+    token['flags'] = None
+    token['memory'].close()
+    token['memory'].unlink()
+    token['memory'] = None
+
+def worker_token(name, slot):
+
+    '''
+    This function is used in a process of a pool to get the token from the shared memory of "progress_share".
+    The following parameters are passed to the function:
+        name ("str" or None) - the name of the shared memory. If None, None is returned (the process is not observed);
+        slot ("int") - the number of the counter of the process.
+    The result of the function:
+        Return values:
+            token ("dict" or None) - the token of the process (pass it to "progress_ranges", release it by "worker_release").
+    '''
+
+    if name is None:
+        return None
+
+    from multiprocessing import shared_memory
+    memory = shared_memory.SharedMemory(name=name)
+    return {'memory': memory, 'flags': np.ndarray(shape=slot + 2, dtype=np.int64, buffer=memory.buf), 'slot': slot}
+
+def worker_release(token):
+
+    '''
+    This function is used in a process of a pool to release the token of "worker_token".
+    '''
+
+    if token is None:
+        return
+    del token['flags'] # The view of the shared memory is released before it is closed
+    token['memory'].close()
+
+def pool_wait(token, result):
+
+    '''
+    This function is used by the main process to wait for the result of a pool ("multiprocessing.pool.AsyncResult") while reporting the progress of the processes.
+    '''
+
+    while not result.ready():
+        result.wait(POLL_SECONDS)
+        progress_collect(token)
+    return result.get()
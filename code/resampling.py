@@ -0,0 +1,219 @@
+'''
+This module is used to change the sampling rate of a signal (resampling), for example, to decimate a 44100 Hz recording before the discrete Fourier transform
+    (the cost of "fourier_transform" decreases quadratically and the cost of "fast_fourier_transform" decreases proportionally with the number of frames).
+Two methods are available:
+    "polyphase" - a polyphase FIR filter (windowed sinc with the Kaiser window): the rate is changed by the ratio up/down of integers,
+        only the needed outputs of the filter are calculated, and the signal can be processed in pieces (streaming);
+    "fft" - the spectrum of the entire signal is cut or padded with zeros (exact for periodic signals), the transform is calculated by "czt" from "zoom_fourier_transform.py".
+The result ("numpy.ndarray" with dtype="numpy.float64") can be passed directly to "wave_worker.wave_write" and to the transform functions.
+'''
+
+import math
+import time # Used to calculate the time spent on resampling
+
+import numpy as np
+
+import wave_worker
+
+ZERO_CROSSINGS = 10 # Half-length of the filter in zero crossings of the sinc function (more - sharper filter, but more calculations)
+KAISER_BETA = 8.0 # Parameter of the Kaiser window of the filter (more - stronger suppression of the stopband)
+BLOCK = 4096 # Maximum number of outputs calculated at once
+
+def resample_init(RATE_in, RATE_out, zero_crossings=ZERO_CROSSINGS, beta=KAISER_BETA):
+
+    '''
+    This function is used to create the state of the polyphase resampler (the filter is calculated once).
+    The following parameters are passed to the function:
+        RATE_in ("int" and greater than 0) - sampling rate of the input signal in hertz;
+        RATE_out ("int" and greater than 0) - sampling rate of the output signal in hertz;
+        zero_crossings ("int" and greater than 0) - half-length of the filter in zero crossings of the sinc function;
+        beta ("float") - parameter of the Kaiser window of the filter.
+    The result of the function:
+        Return values:
+            state ("dict") - the state of the resampler.
+    '''
+
+    divisor = math.gcd(RATE_in, RATE_out)
+    up, down = RATE_out // divisor, RATE_in // divisor
+
+    # Low-pass filter at the rate RATE_in*up: the cutoff is the lower of the two Nyquist frequencies.
+    cutoff = 0.5 / max(up, down) # In cycles per frame of the rate RATE_in*up
+    half_length = zero_crossings * max(up, down)
+    j = np.arange(-half_length, half_length + 1)
+    h = 2*cutoff*np.sinc(2*cutoff*j) * np.kaiser(j.size, beta) * up # "up" compensates the inserted zeros
+
+    # Polyphase decomposition: phases[p, k] = h[p + k*up], the output uses one phase.
+    taps = -(-h.size // up) # Number of taps of one phase
+    phases = np.ascontiguousarray(np.pad(h, (0, taps*up - h.size)).reshape(taps, up).T)
+
+    return {
+        'up': up,
+        'down': down,
+        'delay': half_length, # The filter is centered, so the output is not shifted relative to the input
+        'phases': phases,
+        'taps': taps,
+        'buffer': np.zeros(shape=taps, dtype=np.float64), # Input frames (with zeros before the beginning of the signal)
+        'base': -taps, # Index of the input frame buffer[0]
+        'n_in': 0, # Number of received input frames
+        'm': 0 # Index of the next output frame
+    }
+
+def resample_update(state, frames, final=False):
+
+    '''
+    This function is used to pass the next piece of the signal to the polyphase resampler.
+    The following parameters are passed to the function:
+        state ("dict") - the state of the resampler;
+        frames ("numpy.ndarray") - the next frames of the input signal;
+        final ("bool") - if "True", this is the last piece: the rest of the output is calculated.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.float64") - the output frames that can be calculated from the received frames.
+    '''
+
+    up, down, delay, taps = state['up'], state['down'], state['delay'], state['taps']
+
+    frames = np.asarray(frames, dtype=np.float64).reshape(-1)
+    state['buffer'] = np.concatenate([state['buffer'], frames])
+    state['n_in'] += frames.size
+
+    # The output m uses the input frames up to (m*down + delay)//up.
+    if final:
+        m_stop = -(-state['n_in']*up // down) # All outputs of the signal
+        state['buffer'] = np.concatenate([state['buffer'], np.zeros(shape=delay // up + 1)])
+    else:
+        m_stop = max(state['m'], ((state['n_in'] - 1)*up - delay) // down + 1)
+
+    outputs = []
+    for m_start in range(state['m'], m_stop, BLOCK):
+        t = np.arange(m_start, min(m_start + BLOCK, m_stop)) * down + delay
+        phase, n = t % up, t // up
+        indices = (n - state['base'])[:, None] - np.arange(taps) # The frames n, n-1, ..., n-taps+1
+        outputs.append(np.einsum('ij,ij->i', state['buffer'][indices], state['phases'][phase]))
+
+    # The frames that are no longer needed are removed from the buffer.
+    state['m'] = m_stop
+    first_needed = (m_stop*down + delay) // up - taps + 1
+    if first_needed > state['base']:
+        state['buffer'] = state['buffer'][first_needed - state['base']:]
+        state['base'] = first_needed
+
+    return np.concatenate(outputs) if outputs else np.zeros(shape=0, dtype=np.float64)
+
+def resample_stream(pieces, RATE_in, RATE_out):
+
+    '''
+    This function is used to resample a signal passed in pieces (the signal is not kept in memory).
+    The following parameters are passed to the function:
+        pieces (iterable of "numpy.ndarray") - the signal data in pieces (for example, "wave_worker.wave_read_chunks");
+        RATE_in, RATE_out ("int" and greater than 0) - sampling rates of the input and output signals in hertz.
+    The result of the function:
+        Generator of "numpy.ndarray" with dtype="numpy.float64" - the output signal in pieces (can be passed to "wave_worker.wave_write").
+    '''
+
+    state = resample_init(RATE_in, RATE_out)
+    for piece in pieces:
+        yield resample_update(state, piece)
+    yield resample_update(state, np.zeros(shape=0), final=True)
+
+def resample_fft(data_signal, RATE_in, RATE_out):
+
+    '''
+    This function is used to resample a signal by cutting or padding its spectrum with zeros.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE_in, RATE_out ("int" and greater than 0) - sampling rates of the input and output signals in hertz.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.float64") - the resampled signal.
+    '''
+
+    import zoom_fourier_transform
+
+    N_FRAMES = len(data_signal)
+    M_FRAMES = -(-N_FRAMES*RATE_out // RATE_in)
+    if N_FRAMES == 0:
+        return np.zeros(shape=0, dtype=np.float64)
+
+    # The signal is padded with zeros to a multiple of RATE_in/gcd, so that the number of output frames is an integer and the rate is exactly RATE_out.
+    down = RATE_in // math.gcd(RATE_in, RATE_out)
+    N = -(-N_FRAMES // down) * down
+    M = N*RATE_out // RATE_in
+    data_signal = np.pad(np.asarray(data_signal, dtype=np.float64), (0, N - N_FRAMES))
+
+    FT = zoom_fourier_transform.czt(data_signal, N, np.exp(-2j*np.pi/N), PERIOD=N)
+
+    # The frequencies from 0 to the lower of the two Nyquist frequencies are kept (positive and negative).
+    FT_out = np.zeros(shape=M, dtype=np.complex128)
+    half = (min(N, M) - 1) // 2
+    FT_out[:half + 1] = FT[:half + 1]
+    FT_out[M - half:] = FT[N - half:]
+    if min(N, M) % 2 == 0:
+        # The bin at the Nyquist frequency of the shorter spectrum is divided between the positive and negative frequencies.
+        nyquist = FT[N // 2] if N <= M else FT[M // 2] + FT[N - M // 2]
+        FT_out[min(N, M) // 2] += nyquist / 2
+        FT_out[M - min(N, M) // 2] += nyquist / 2
+
+    return zoom_fourier_transform.czt(FT_out, M, np.exp(2j*np.pi/M), PERIOD=M).real[:M_FRAMES] / N
+
+def resample(data_signal, RATE_in, RATE_out, method="polyphase"):
+
+    '''
+    This function allows you to change the sampling rate of a signal.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE_in, RATE_out ("int" and greater than 0) - sampling rates of the input and output signals in hertz;
+        method ("str" "polyphase" or "fft") - the method of resampling.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.float64") - the resampled signal (ceil(N_FRAMES*RATE_out/RATE_in) frames).
+    '''
+
+    if method == "fft":
+        return resample_fft(data_signal, RATE_in, RATE_out)
+
+    state = resample_init(RATE_in, RATE_out)
+    return resample_update(state, data_signal, final=True)
+
+def resample_file(path_to_signal="../data/input_signal.wav", path_to_output="../data/resampled_signal.wav", RATE_out=11025, method="polyphase"):
+
+    '''
+    This function allows you to change the sampling rate of a signal from a file with the extension ".wav" and save the result to a file.
+        Note: With the "polyphase" method, the file is read and written in pieces, so its size is not limited by memory.
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav";
+        path_to_output ("str") - path to save the result and its name with ".wav" extension;
+        RATE_out ("int" and greater than 0) - sampling rate of the result in hertz;
+        method ("str" "polyphase" or "fft") - the method of resampling.
+    The result of the function will be a saved resampled signal (mono, with the sound depth of the input file).
+    '''
+
+    # Checking for the correctness of the input data
+    if type(RATE_out) != int or RATE_out <= 0:
+        RATE_out = 11025
+        print(f'The sampling rate is set incorrectly. The default value is set:\n\t RATE_out = {RATE_out}')
+
+    if method not in ("polyphase", "fft"):
+        method = "polyphase"
+        print(f'The method of resampling is set incorrectly. The default value is set:\n\t method = "{method}"')
+
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_worker.wave_info(path_to_signal)
+    if CHANNELS != 1:
+        raise ValueError(f'Only mono signals can be resampled, the file "{path_to_signal}" has {CHANNELS} channels.')
+
+    print(f"The beginning of resampling from {RATE} Hz to {RATE_out} Hz (method \"{method}\").")
+    start_time = time.time() # Starting the stopwatch
+
+    if method == "polyphase":
+        frames = resample_stream(wave_worker.wave_read_chunks(path_to_signal), RATE, RATE_out)
+    else:
+        frames = resample_fft(wave_worker.wave_read(path_to_signal)[0], RATE, RATE_out)
+    wave_worker.wave_write(path_to_output, frames, RATE_out, CHANNELS, SAMPLE_FORMAT, IS_FLOAT)
+
+    end_time = time.time() - start_time # Stopping the stopwatch
+    print(f'The end of resampling. The signal is saved in the "{path_to_output}" file. Time spent {"%.3f" % end_time} seconds.\n')
+
+if __name__ == "__main__":
+    resample_file("../data/examples/signal_440hz_duration_11s-89ms.wav", "../data/resampled_signal_440hz_4000hz.wav", 4000)
+    data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = wave_worker.wave_read("../data/resampled_signal_440hz_4000hz.wav")
+    print(f"N_FRAMES = {N_FRAMES}, RATE = {RATE}")
@@ -1,6 +1,7 @@
 '''
 This module is used for generating signals and recording them into a file with a ".wav" extension.
 Generation is done through combinations of sinusoids with specified frequencies.
+A sequence of notes is calculated by "numpy" in pieces (the phase is continuous between the notes, optional short crossfades remove the clicks), and the pieces are written to the file as they are generated.
 '''
 
 import math
@@ -25,6 +26,126 @@ def note(frequency): # y = sin(2*math.pi*frequency*x)
 
     return lambda x: math.sin(2*math.pi*frequency*x) 
 
+def generate_signal_sum(SECONDS, RATE, FREQUENCIES, CHUNK=1024):
+
+    '''
+    This function is used to generate a signal composed of a sum of sinusoids with specified frequencies (the signal is not saved). (note: It is used for "signal_generator_sum" but can also be used independently.)
+    The following parameters are passed to the function:
+        SECONDS ("float" and greater than 0) - duration of the generated signal in seconds;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        FREQUENCIES ("list" or "tuple" with elements of "int" or "float") - collection of frequencies that will be used for generating sine waves of the form sin(2*pi*frequency*x);
+        CHUNK ("int" and greater than 0) - the number of frames is rounded down to a multiple of CHUNK (as when recording from a microphone).
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.int16") - value of the generated signal data.
+    '''
+
+    time = np.linspace(0, SECONDS, int(RATE / CHUNK * SECONDS)*CHUNK)
+    data_signal = np.zeros(shape=time.size)
+
+    for frequency in FREQUENCIES:
+        musical_note = note(frequency)
+        data_signal += np.array([musical_note(t) for t in time])
+
+    # Normalize the signal data
+    data_signal /= np.max(np.abs(data_signal))
+
+    # Scaling audio data to 16-bit format: Multiplying by 32767 and converting to the np.int16 type.
+    data_signal *= 32767 # 32767 is the maximum value that can be represented in the np.int16 format, which is used for audio signals.
+    data_signal = data_signal.astype(np.int16)
+
+    return data_signal
+
+def sequence_boundaries(N_FRAMES, count):
+
+    '''
+    This function is used to get the boundaries of the notes of a sequence: N_FRAMES frames are divided into "count" equal segments, the last segment takes the rest.
+    The result of the function:
+        Return values:
+            starts ("numpy.ndarray" with dtype="numpy.int64") - the first frame of each segment and N_FRAMES at the end (count + 1 values).
+    '''
+
+    starts = np.arange(count + 1, dtype=np.int64) * (N_FRAMES // count)
+    starts[-1] = N_FRAMES
+    return starts
+
+def sequence_chunks(N_FRAMES, RATE, FREQUENCIES, CROSSFADE=0.0, BLOCK=wave_worker.CHUNK_FRAMES):
+
+    '''
+    This function is used to generate a sequence of sinusoids in pieces (the signal is not kept in memory, the pieces can be passed directly to "wave_worker.wave_write").
+    Each piece is calculated by one expression of "numpy" for all its frames (the segment of each frame is found by binary search in the precomputed boundaries,
+        so the time does not depend on the number of notes, 10**5 notes and more are supported).
+    The phase is continuous: each note begins with the phase at which the previous note ended (no jumps of the signal at the boundaries of the notes).
+    The frequency 0 is silence.
+    The following parameters are passed to the function:
+        N_FRAMES ("int" and greater than 0) - number of frames of the signal;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        FREQUENCIES ("list", "tuple" or "numpy.ndarray" with elements of "int" or "float") - the frequencies of the notes (the duration of a note is N_FRAMES/len(FREQUENCIES) frames);
+        CROSSFADE ("float" and not less than 0) - duration of the crossfade between neighboring notes in seconds (0 - without crossfades; not longer than a note).
+            Around each boundary, the previous note fades out and the next one fades in (raised cosine), which removes the clicks at the beginning and end of silence;
+        BLOCK ("int" and greater than 0) - number of frames of a piece.
+    The result of the function:
+        Generator of "numpy.ndarray" with dtype="numpy.int16" - value of the generated signal data in pieces of BLOCK frames (the last piece may be shorter).
+    '''
+
+    frequencies = np.asarray(FREQUENCIES, dtype=np.float64)
+    count = frequencies.size
+    starts = sequence_boundaries(N_FRAMES, count)
+    lengths = np.diff(starts)
+    amplitudes = (frequencies != 0).astype(np.float64)
+
+    # The phase at the beginning of each note (the sum of the phases of the previous notes, reduced modulo 2*pi).
+    phases = np.zeros(shape=count)
+    phases[1:] = np.cumsum(2*np.pi*frequencies[:-1]*lengths[:-1]/RATE % (2*np.pi)) % (2*np.pi)
+
+    fade = min(int(CROSSFADE*RATE), int(lengths.min())) if count > 1 else 0 # Number of frames of a crossfade
+    half = fade / 2
+
+    def wave(segment, frames):
+        # The sinusoid of the note "segment" continued to any frames (the phase grows from the beginning of the note).
+        return amplitudes[segment] * np.sin(phases[segment] + 2*np.pi*frequencies[segment]*(frames - starts[segment])/RATE)
+
+    for block_start in range(0, N_FRAMES, BLOCK):
+        frames = np.arange(block_start, min(block_start + BLOCK, N_FRAMES))
+        segment = np.searchsorted(starts, frames, side='right') - 1
+        data_signal = wave(segment, frames)
+
+        if fade > 0:
+            # The frames closer than fade/2 to the boundary "boundary" (the beginning of a note) are mixed from the notes boundary-1 and boundary.
+            boundary = np.where((frames - starts[segment] < half) & (segment > 0), segment,
+                                np.where((starts[segment + 1] - frames <= half) & (segment + 1 < count), segment + 1, -1))
+            mixed = boundary > 0
+            if mixed.any():
+                boundary, mixed_frames = boundary[mixed], frames[mixed]
+                weight = 0.5 - 0.5*np.cos(np.pi*(mixed_frames - starts[boundary] + half)/fade)
+                data_signal[mixed] = (1 - weight)*wave(boundary - 1, mixed_frames) + weight*wave(boundary, mixed_frames)
+
+        # Scaling audio data to 16-bit format: Multiplying by 32767 and converting to the np.int16 type.
+        data_signal *= 32767
+        yield data_signal.astype(np.int16)
+
+def generate_signal_sequence(SECONDS, RATE, FREQUENCIES, CHUNK=1024, CROSSFADE=0.0):
+
+    '''
+    This function is used to generate a signal composed of a sequence of sinusoids with specified frequencies (the signal is not saved). (note: It is used for "signal_generator_sequence" but can also be used independently.)
+    The signal is calculated by "sequence_chunks" (the notes are calculated by "numpy", the phase is continuous between the notes).
+    The following parameters are passed to the function:
+        SECONDS ("float" and greater than 0) - duration of the generated signal in seconds;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        FREQUENCIES ("list" or "tuple" with elements of "int" or "float") - collection of frequencies that will be used for generating sine waves of the form sin(2*pi*frequency*x);
+        CHUNK ("int" and greater than 0) - the number of frames is rounded down to a multiple of CHUNK (as when recording from a microphone);
+        CROSSFADE ("float" and not less than 0) - duration of the crossfade between neighboring notes in seconds (please refer to "sequence_chunks").
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.int16") - value of the generated signal data.
+    '''
+
+    N_FRAMES = int(RATE / CHUNK * SECONDS)*CHUNK
+    if N_FRAMES == 0:
+        return np.zeros(shape=0, dtype=np.int16)
+
+    return np.concatenate(list(sequence_chunks(N_FRAMES, RATE, FREQUENCIES, CROSSFADE)))
+
 def signal_generator_sum(FILENAME = "../data/generated_signal_sum.wav", SECONDS = 5.0, RATE = 44100, FREQUENCIES = None):
 
     '''
@@ -75,30 +196,15 @@ def signal_generator_sum(FILENAME = "../data/generated_signal_sum.wav", SECONDS
     # Checking if the volume of recorded data matches a power of two. (If it doesn't match, it can be corrected by changing the recording duration.)
     SECONDS = isPowerOfTwo.isPowerOfTwo_DataVolume(SECONDS, RATE, CHUNK)
     
-    time = np.linspace(0, SECONDS, int(RATE / CHUNK * SECONDS)*CHUNK)
-    data_signal = np.zeros(shape=time.size)
-
-    for frequency in FREQUENCIES:
-        musical_note = note(frequency)
-        data_signal += np.array([musical_note(t) for t in time])
-
-    # Normalize the signal data
-    data_signal /= np.max(np.abs(data_signal))
-
-    # Scaling audio data to 16-bit format: Multiplying by 32767 and converting to the np.int16 type.
-    data_signal *= 32767 # 32767 is the maximum value that can be represented in the np.int16 format, which is used for audio signals.
-    data_signal = data_signal.astype(np.int16)
-
-    # Converting int to bytes for further writing to the ".wav" file.
-    frames = data_signal.tobytes()
+    data_signal = generate_signal_sum(SECONDS, RATE, FREQUENCIES, CHUNK)
 
     # Save the generated data in a WAV file
-    wave_worker.wave_write(FILENAME, frames, RATE, CHANNELS)
+    wave_worker.wave_write(FILENAME, data_signal, RATE, CHANNELS)
 
     print(f'Finished signal generation. The signal is saved in the "{FILENAME}" file!\n')
 
 
-def signal_generator_sequence(FILENAME = "../data/generated_signal_sequence.wav", SECONDS = 5.0, RATE = 44100, FREQUENCIES = None):
+def signal_generator_sequence(FILENAME = "../data/generated_signal_sequence.wav", SECONDS = 5.0, RATE = 44100, FREQUENCIES = None, CROSSFADE = 0.0):
 
     '''
     This function allows you to generate a signal composed of a sequence of sinusoids with specified frequencies and save it to a file.
@@ -106,7 +212,9 @@ def signal_generator_sequence(FILENAME = "../data/generated_signal_sequence.wav"
         FILENAME ("str") - path to save the file and its name with ".wav" extension. (example: "../the_path_to_save_the_file/name_of_the_saved_file.wav");
         SECONDS ("float" and greater than 0) - recording duration of the generated signal in seconds (note: The "int" type is supported, it will be cast to the "float" type.);
         RATE ("int" and greater than 0) - sampling rate in hertz (note: 44100 hertz is the standard CD quality.);
-        FREQUENCIES ("list" or "tuple" with elements of "int" or "float" (may use a combination of "int" and "float")) - collection of frequencies that will be used for generating sine waves of the form sin(2*pi*frequency*x).
+        FREQUENCIES ("list" or "tuple" with elements of "int" or "float" (may use a combination of "int" and "float")) - collection of frequencies that will be used for generating sine waves of the form sin(2*pi*frequency*x);
+        CROSSFADE ("float" and not less than 0) - duration of the crossfade between neighboring notes in seconds (0 - without crossfades, please refer to "sequence_chunks").
+            Note: The signal is written to the file in pieces as it is generated (it is not kept in memory).
     The result of the function will be a recorded generated signal (where the generated signal consists of sequences of sinusoids with the different frequencies, i.e., sin(...), sin(...), ... (the duration of playing one sinusoidis determined as SECONDS/len(FREQUENCIES))) and saved according to the provided parameters.
     '''
 
@@ -148,31 +256,12 @@ def signal_generator_sequence(FILENAME = "../data/generated_signal_sequence.wav"
     # Checking if the volume of recorded data matches a power of two. (If it doesn't match, it can be corrected by changing the recording duration.)
     SECONDS = isPowerOfTwo.isPowerOfTwo_DataVolume(SECONDS, RATE, CHUNK)
 
-    time = np.linspace(0, SECONDS, int(RATE / CHUNK * SECONDS)*CHUNK)
-    data_signal = np.zeros(shape=time.size)
-
-    for i in range(len(FREQUENCIES)):
-        if i != len(FREQUENCIES)-1:
-            for t in range(int(len(time)/len(FREQUENCIES))*i, int(len(time)/len(FREQUENCIES))*(i+1)):
-                musical_note = note(FREQUENCIES[i])
-                data_signal[t] = musical_note(time[t]) 
-        else:
-            for t in range(int(len(time)/len(FREQUENCIES))*i, len(time)):
-                musical_note = note(FREQUENCIES[i])
-                data_signal[t] = musical_note(time[t])
+    if (type(CROSSFADE) != int and type(CROSSFADE) != float) or CROSSFADE < 0:
+        CROSSFADE = 0.0
+        print(f'The duration of the crossfade is set incorrectly. The default value is set:\n\t CROSSFADE = {CROSSFADE}')
 
-    # Normalize the signal data
-    data_signal /= np.max(np.abs(data_signal))
-
-    # Scaling audio data to 16-bit format: Multiplying by 32767 and converting to the np.int16 type.
-    data_signal *= 32767 # 32767 is the maximum value that can be represented in the np.int16 format, which is used for audio signals.
-    data_signal = data_signal.astype(np.int16)
-
-    # Converting int to bytes for further writing to the ".wav" file.
-    frames = data_signal.tobytes()
-
-    # Save the generated data in a WAV file
-    wave_worker.wave_write(FILENAME, frames, RATE, CHANNELS)
+    # The generated data is saved in a WAV file in pieces.
+    wave_worker.wave_write(FILENAME, sequence_chunks(int(RATE / CHUNK * SECONDS)*CHUNK, RATE, FREQUENCIES, CROSSFADE), RATE, CHANNELS)
 
     print(f'Finished signal generation. The signal is saved in the "{FILENAME}" file!\n')
 
@@ -199,4 +288,4 @@ if __name__ == '__main__':
     B = 493.88 # Hz
     frequencies = (A,E,A,E,A,G,0,G,0,G,E,G,E,G,A,0,A,0,A,E,A,E,A,G,0,G,0,G,E,G,E,G,A,0,0,A,B,0,B,0,B,0,B,0,B,C,0,C,0,C,0,C,0,C,0,C,B,A,G,A,0,A,0,A,B,0,B,0,B,0,B,0,B,C,0,C,0,C,0,C,0,C,0,C,B,A,G,A)
 
-    signal_generator_sequence(path_to_save_signal, seconds, rate, frequencies)
+    signal_generator_sequence(path_to_save_signal, seconds, rate, frequencies, CROSSFADE=0.005) # 5 ms crossfades between the notes
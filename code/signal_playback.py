@@ -5,8 +5,6 @@ Signal from a file with the extension ".wav" is played from your speakers.
 
 import wave
 
-import pyaudio
-
 def signal_playback(FILENAME = "../data/output_signal.wav"): # FILENAME must contain the path and file name of the playback. FILENAME must end in ".wav"
 
     '''
@@ -23,6 +21,8 @@ def signal_playback(FILENAME = "../data/output_signal.wav"): # FILENAME must con
     else:
         FILENAME = "./" + FILENAME
 
+    import pyaudio # The audio library is loaded only when playing (it is not needed by the modules that import "signal_playback")
+
     with wave.open(FILENAME, 'rb') as wf:
         audio = pyaudio.PyAudio() # Initialize PyAudio object
 
@@ -3,18 +3,17 @@ This module is used to record the signal.
 The signal is recorded from your microphone and saved to a file with the extension ".wav".
 '''
 
-import pyaudio
+import numpy as np
 
 import wave_worker
 import isPowerOfTwo
 
-SAMPLE_FORMAT = pyaudio.paInt16  # Sound depth = 16 bits = 2 bytes
-
 def signal_recording(FILENAME = "../data/input_signal.wav", # FILENAME must contain the path and file name of the record. FILENAME must end in ".wav"
                      SECONDS = 5.0, # Recording duration
                      RATE = 44100, # Sampling rate - number of frames per second
                      CHUNK = 1024, # The number of frames per one "request" to the microphone (read in pieces)
                      CHANNELS = 1, # Mono
+                     on_chunk = None, # Function called for each CHUNK (for example, "sliding_dft_update" from "sliding_fourier_transform.py")
                     ):
 
     '''
@@ -24,7 +23,8 @@ def signal_recording(FILENAME = "../data/input_signal.wav", # FILENAME must cont
         SECONDS ("float" and greater than 0) - recording duration in seconds (note: The "int" type is supported, it will be cast to the "float" type.);
         RATE ("int" and greater than 0) - sampling rate in hertz. (note: 44100 is enough for a voice);
         CHUNK ("int", greater than 0 and a power of two) - number of frames per one "request" to the microphone. (note: 1024 is enough for a voice);
-        CHANNELS ("int" and greater than 0) - number of audio tracks. (note: use 1 (mono sound)).
+        CHANNELS ("int" and greater than 0) - number of audio tracks. (note: use 1 (mono sound));
+        on_chunk (function or None) - if passed, it is called for each recorded CHUNK with the signal data of this CHUNK ("numpy.ndarray" with dtype="numpy.int16") (for example, to track the spectrum during recording).
     The result of the function will be a recorded signal, saved in accordance with the passed parameters.
     '''
 
@@ -57,6 +57,10 @@ def signal_recording(FILENAME = "../data/input_signal.wav", # FILENAME must cont
     # Checking if the volume of recorded data matches a power of two. (If it doesn't match, it can be corrected by changing the recording duration.)
     SECONDS = isPowerOfTwo.isPowerOfTwo_DataVolume(SECONDS, RATE, CHUNK)
 
+    import pyaudio # The audio library is loaded only when recording (it is not needed by the modules that import "signal_recording")
+
+    SAMPLE_FORMAT = pyaudio.paInt16  # Sound depth = 16 bits = 2 bytes
+
     audio = pyaudio.PyAudio() # Initialize PyAudio object
 
     while True: # The loop runs until the correct data is entered
@@ -97,6 +101,8 @@ def signal_recording(FILENAME = "../data/input_signal.wav", # FILENAME must cont
     for i in range(0, int(RATE / CHUNK * SECONDS)): # RATE / CHUNK - number of requests per second
         data = stream.read(CHUNK) # reading a string of bytes long CHUNK * SAMPLE_FORMAT
         frames.append(data)
+        if on_chunk is not None:
+            on_chunk(np.frombuffer(data, dtype=np.int16))
 
     frames = b''.join(frames)
     print(f"Finished recording!\n")
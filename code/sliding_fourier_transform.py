@@ -0,0 +1,155 @@
+'''
+This module is used to track the spectrum of a live signal (sliding discrete Fourier transform).
+The spectrum of the last N_WINDOW frames is updated when new frames arrive (for example, each CHUNK from the microphone, see "on_chunk" in "signal_recording.py"),
+    instead of calculating the transform of the entire window again: the update costs O(bins) per frame or O(bins*CHUNK) per CHUNK.
+The tracked bins can be all bins of the window or only a chosen set of them.
+    The update pays off when bins*CHUNK is less than the cost of the recalculation of the window (about N_WINDOW*log2(N_WINDOW) for "fft"):
+    for a few bins or a small CHUNK. Otherwise (for example, all bins with a large CHUNK) the new frames are written to the window and the spectrum is recalculated.
+Rounding errors accumulate with updates, so the spectrum is periodically recalculated from the window
+    ("fft" from "fast_fourier_transform.py" if N_WINDOW is a power of two, otherwise "sparse_dft" from "sparse_fourier_transform.py").
+'''
+
+import numpy as np
+
+import fast_fourier_transform
+import sparse_fourier_transform
+import isPowerOfTwo
+
+def sliding_dft_init(N_WINDOW, bins=None, resync_interval=None):
+
+    '''
+    This function is used to create the state of the sliding discrete Fourier transform (the window is filled with zeros).
+    The following parameters are passed to the function:
+        N_WINDOW ("int" and greater than 0) - number of frames in the window;
+        bins ("list", "tuple" or "numpy.ndarray" with elements of "int" or None) - indices of the tracked bins (frequency = index * RATE / N_WINDOW). If None, the bins from 0 to the Nyquist frequency are tracked
+            (all bins are updated faster than they are recalculated only for a small CHUNK, about 2*log2(N_WINDOW) frames, otherwise the spectrum is recalculated for each CHUNK);
+        resync_interval ("int" and greater than 0 or None) - number of frames after which the spectrum is recalculated from the window. If None, 64 * N_WINDOW.
+    The result of the function:
+        Return values:
+            state ("dict") - the state of the sliding discrete Fourier transform (the current spectrum is state["FT"]).
+    '''
+
+    if bins is None:
+        bins = np.arange(int(N_WINDOW/2) + 1)
+
+    return {
+        'N_WINDOW': N_WINDOW,
+        'bins': np.asarray(bins, dtype=np.int64),
+        'FT': np.zeros(shape=len(bins), dtype=np.complex128),
+        'window': np.zeros(shape=N_WINDOW, dtype=np.float64), # Ring buffer of the last N_WINDOW frames
+        'position': 0, # Index of the oldest frame in the ring buffer
+        'since_resync': 0,
+        'resync_interval': resync_interval or 64 * N_WINDOW,
+        'twiddles': (0, None, None) # The update matrix of the last size of the received pieces: (size, twiddle, rotation)
+    }
+
+def sliding_dft_resync(state):
+
+    '''
+    This function is used to recalculate the spectrum of the tracked bins from the frames of the window (removes the accumulated rounding errors).
+    The following parameters are passed to the function:
+        state ("dict") - the state of the sliding discrete Fourier transform.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform of the window at the tracked bins.
+    '''
+
+    N_WINDOW = state['N_WINDOW']
+    window = np.roll(state['window'], -state['position']) # From the oldest frame to the newest
+
+    if isPowerOfTwo.isPowerOfTwo(N_WINDOW) and state['bins'].size > np.log2(N_WINDOW):
+        state['FT'] = fast_fourier_transform.fft(window)[state['bins'] % N_WINDOW]
+    else:
+        state['FT'] = sparse_fourier_transform.sparse_dft(window, state['bins'], N_WINDOW)
+
+    state['since_resync'] = 0
+    return state['FT']
+
+def sliding_dft_update(state, frames):
+
+    '''
+    This function is used to update the spectrum of the window with new frames.
+    The following parameters are passed to the function:
+        state ("dict") - the state of the sliding discrete Fourier transform;
+        frames ("numpy.ndarray") - the new frames (any number).
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform of the last N_WINDOW frames at the tracked bins.
+    '''
+
+    N_WINDOW = state['N_WINDOW']
+    bins = state['bins']
+    frames = np.asarray(frames, dtype=np.float64).reshape(-1)
+    size = frames.size
+    if size == 0:
+        return state['FT']
+
+    if size >= N_WINDOW:
+        # The whole window is replaced, the spectrum is recalculated from the last N_WINDOW frames.
+        state['window'][:] = frames[-N_WINDOW:]
+        state['position'] = 0
+        return sliding_dft_resync(state)
+
+    # The update costs size*bins operations, the recalculation costs about N_WINDOW*log2(N_WINDOW) ("fft") or N_WINDOW*bins ("sparse_dft").
+    if isPowerOfTwo.isPowerOfTwo(N_WINDOW) and bins.size > np.log2(N_WINDOW):
+        resync_cost = N_WINDOW*np.log2(N_WINDOW)
+    else:
+        resync_cost = N_WINDOW*bins.size
+
+    indices = (state['position'] + np.arange(size)) % N_WINDOW
+    if size*bins.size < resync_cost:
+        # X[k] (after "size" frames) = w**size * X[k] + sum((new[m] - old[m]) * w**(size - m)), w = exp(2j*pi*k/N_WINDOW)
+        if state['twiddles'][0] != size:
+            exponent = np.arange(size, 0, -1)[:, None] * bins[None, :] % N_WINDOW
+            state['twiddles'] = (size, np.exp(2j*np.pi*exponent/N_WINDOW), np.exp(2j*np.pi*(size*bins % N_WINDOW)/N_WINDOW))
+        _, twiddle, rotation = state['twiddles']
+
+        difference = frames - state['window'][indices]
+        state['FT'] = state['FT'] * rotation + difference @ twiddle
+        state['since_resync'] += size
+    else:
+        state['since_resync'] = state['resync_interval'] # The update is more expensive than the recalculation
+
+    state['window'][indices] = frames
+    state['position'] = (state['position'] + size) % N_WINDOW
+
+    if state['since_resync'] >= state['resync_interval']:
+        sliding_dft_resync(state)
+
+    return state['FT']
+
+def sliding_dft_amplitude(state, RATE):
+
+    '''
+    This function is used to get the normalized amplitude and the frequencies of the tracked bins (as in "fast_fourier_transform").
+    The following parameters are passed to the function:
+        state ("dict") - the state of the sliding discrete Fourier transform;
+        RATE ("int" and greater than 0) - sampling rate in hertz.
+    The result of the function:
+        Return values:
+            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude;
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz.
+    '''
+
+    amplitude = 2*abs(state['FT'])/state['N_WINDOW'] # Normalized signal amplitude
+    frequency = state['bins'] * RATE / state['N_WINDOW']
+    return amplitude, frequency
+
+if __name__ == "__main__":
+    import signal_generator
+
+    RATE = 8000
+    CHUNK = 256
+    N_WINDOW = 2048
+    data_signal = signal_generator.generate_signal_sequence(3.0, RATE, (440, 0, 880), CHUNK)
+
+    state = sliding_dft_init(N_WINDOW)
+    for start in range(0, data_signal.size, CHUNK):
+        sliding_dft_update(state, data_signal[start:start + CHUNK])
+        if start % (8 * CHUNK) == 0:
+            amplitude, frequency = sliding_dft_amplitude(state, RATE)
+            print(f"{'%.3f' % ((start + CHUNK) / RATE)} seconds: the strongest frequency {frequency[np.argmax(amplitude)]} Hz (amplitude {'%.1f' % amplitude.max()})")
+
+    FT = state['FT'].copy()
+    error = abs(FT - sliding_dft_resync(state)).max()
+    print(f"The maximum difference from the recalculated spectrum: {error}")
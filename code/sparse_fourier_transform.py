@@ -0,0 +1,119 @@
+'''
+This module is used to calculate the discrete Fourier transform only at the specified frequencies (for example, to check for the presence of the 220 Hz and 440 Hz tones).
+The result is the same as that of the Goertzel algorithm: for k frequencies and N frames, k*N operations are needed instead of calculating the entire spectrum.
+    The calculation is done in blocks of frames by matrix multiplication (all frequencies and all signals of a batch at once), so the signal can be passed in pieces (streaming).
+The frequencies can be arbitrary (they do not have to coincide with the frequencies of the spectrum "fourier_transform" or "fast_fourier_transform").
+'''
+
+import time # Used to calculate the time spent on the calculation
+
+import numpy as np
+
+import wave_worker
+
+BLOCK = 4096 # The number of frames processed by one matrix multiplication
+
+def sparse_dft(data_signal, frequencies, RATE, index_start=0):
+
+    '''
+    This function is used to calculate the discrete Fourier transform at the specified frequencies.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray" with dtype=Depends_on_SAMPLE_FORMAT) - signal data. A two-dimensional array is a batch of signals of the same length (one signal per row);
+        frequencies ("list", "tuple" or "numpy.ndarray" with elements of "int" or "float") - frequencies in hertz at which the transform is calculated;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        index_start ("int") - index of the first frame of data_signal in the whole signal. (note: it is used when the signal is passed in pieces.)
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform at the frequencies (shape (len(frequencies),) or (number of signals, len(frequencies)) for a batch).
+    '''
+
+    data_signal = np.asarray(data_signal)
+    batch = data_signal.reshape(int(np.prod(data_signal.shape[:-1])), data_signal.shape[-1]) if data_signal.ndim > 1 else data_signal.reshape(1, -1)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    omega = 2*np.pi*frequencies/RATE # Angular frequencies in radians per frame
+
+    N_FRAMES = batch.shape[1]
+    block = max(1, min(BLOCK, N_FRAMES)) # An empty signal (for example, the last piece of a stream) gives zeros
+
+    # The matrix of the first block is calculated once. For the following blocks it is multiplied by the phase of the beginning of the block.
+    twiddle = np.exp(-1j*np.outer(np.arange(block), omega)) # shape (block, frequencies)
+    FT = np.zeros(shape=(batch.shape[0], frequencies.size), dtype=np.complex128)
+
+    for start in range(0, N_FRAMES, block):
+        piece = batch[:, start:start + block]
+        phase = np.exp(-1j*omega*(index_start + start))
+        FT += (piece @ twiddle[:piece.shape[1]]) * phase
+
+    return FT.reshape(data_signal.shape[:-1] + (frequencies.size,))
+
+def sparse_dft_stream(pieces, frequencies, RATE):
+
+    '''
+    This function is used to calculate the discrete Fourier transform at the specified frequencies for a signal passed in pieces (the signal is not kept in memory).
+    The following parameters are passed to the function:
+        pieces (iterable of "numpy.ndarray") - the signal data in pieces (for example, "wave_worker.wave_read_chunks");
+        frequencies ("list", "tuple" or "numpy.ndarray" with elements of "int" or "float") - frequencies in hertz at which the transform is calculated;
+        RATE ("int" and greater than 0) - sampling rate in hertz.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform at the frequencies;
+            N_FRAMES ("int") - number of frames of the signal.
+    '''
+
+    FT = np.zeros(shape=len(frequencies), dtype=np.complex128)
+    N_FRAMES = 0
+    for piece in pieces:
+        FT += sparse_dft(piece, frequencies, RATE, N_FRAMES)
+        N_FRAMES += len(piece)
+
+    return FT, N_FRAMES
+
+def sparse_fourier_transform(path_to_signal="../data/input_signal.wav", frequencies=(220, 440)):
+
+    '''
+    This function allows you to calculate the discrete Fourier transform at the specified frequencies for a signal from a file (or several files) with the extension ".wav" and normalize the result.
+        Note: The file is read in pieces, so its size is not limited by memory.
+    The following parameters are passed to the function:
+        path_to_signal ("str" or "list" of "str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav"). If a list is passed, each file is processed;
+        frequencies ("list" or "tuple" with elements of "int" or "float") - frequencies in hertz at which the transform is calculated.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform at the frequencies;
+            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude at the frequencies (normalized as in "fast_fourier_transform");
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - the frequencies in hertz
+            or
+            a "list" of such results (if a list of files was passed).
+    '''
+
+    if type(path_to_signal) == list or type(path_to_signal) == tuple:
+        return [sparse_fourier_transform(path, frequencies) for path in path_to_signal]
+
+    # Checking for the correctness of the input data
+    if type(path_to_signal) != str or '.wav' not in path_to_signal:
+        path_to_signal = "../data/input_signal.wav"
+        print(f'The path to the signal for sparse_fourier_transform is specified incorrectly. The default value is set:\n\t path_to_signal = "{path_to_signal}"')
+
+    if type(frequencies) not in (list, tuple, np.ndarray) or len(frequencies) == 0:
+        frequencies = (220, 440)
+        print(f'The frequencies are set incorrectly. The default value is set:\n\t frequencies = {frequencies}')
+
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_worker.wave_info(path_to_signal)
+
+    start_time = time.time() # Starting the stopwatch
+    FT, N_FRAMES = sparse_dft_stream(wave_worker.wave_read_chunks(path_to_signal), frequencies, RATE)
+    end_time = time.time() - start_time # Stopping the stopwatch
+    print(f"The discrete Fourier transform at {len(frequencies)} frequencies has been calculated for \"{path_to_signal}\". Time spent {'%.3f' % end_time} seconds.")
+
+    amplitude = 2*abs(FT)/N_FRAMES # Normalized signal amplitude
+    frequency = np.asarray(frequencies, dtype=np.float64)
+
+    return (FT, amplitude, frequency)
+
+if __name__ == "__main__":
+    paths = ["../data/examples/signal_220hz_duration_5s-95ms.wav", "../data/examples/signal_440hz_duration_5s-95ms.wav"]
+    frequencies = (220, 440, 880)
+
+    for path, (FT, amplitude, frequency) in zip(paths, sparse_fourier_transform(paths, frequencies)):
+        print(f"{path}:")
+        for f, a in zip(frequency, amplitude):
+            print(f"\t{f} Hz: amplitude = {'%.2f' % a}")
@@ -0,0 +1,182 @@
+'''
+This module is used to extract features from the result of the discrete Fourier transform ("amplitude" and "frequency" of "fast_fourier_transform" and the other transforms):
+    the strongest peaks (the frequency is refined by parabolic interpolation between the bins),
+    the spectral centroid, bandwidth, rolloff and flatness, and the energy in frequency bands.
+The features are calculated without loops over the bins (the peaks are chosen by "numpy.argpartition", the time is linear in the number of bins),
+    for one spectrum or for a batch of spectra (one spectrum per row, for example, the frames of a short-time Fourier transform).
+The result is a compact record ("numpy.ndarray" with the structured dtype "record_dtype", float32 fields), which can be saved with "numpy.save" and indexed for many recordings.
+'''
+
+import numpy as np
+
+K_PEAKS = 5 # Number of the strongest peaks in a record
+ROLLOFF = 0.85 # Part of the energy below the rolloff frequency
+BANDS = (0, 250, 500, 1000, 2000, 4000, 8000) # Edges of the frequency bands in hertz (the last band continues to the Nyquist frequency)
+
+def record_dtype(k=K_PEAKS, n_bands=len(BANDS)):
+
+    '''
+    This function is used to get the dtype of a record of features.
+    The following parameters are passed to the function:
+        k ("int" and greater than 0) - number of peaks;
+        n_bands ("int" and greater than 0) - number of frequency bands.
+    The result of the function:
+        Return values:
+            dtype ("numpy.dtype") - the structured dtype of a record (4*(2*k + 4 + n_bands) bytes).
+    '''
+
+    return np.dtype([
+        ('peak_frequency', np.float32, (k,)), # Hertz, from the strongest peak (NaN if there are fewer peaks)
+        ('peak_amplitude', np.float32, (k,)),
+        ('centroid', np.float32),
+        ('bandwidth', np.float32),
+        ('rolloff', np.float32),
+        ('flatness', np.float32),
+        ('band_energy', np.float32, (n_bands,))
+    ])
+
+def find_peaks(amplitude, frequency, k=K_PEAKS):
+
+    '''
+    This function is used to find the k strongest peaks (local maxima) of a spectrum.
+    The following parameters are passed to the function:
+        amplitude ("numpy.ndarray") - signal amplitude (one spectrum or a batch of spectra with one spectrum per row);
+        frequency ("numpy.ndarray") - signal frequency in hertz (evenly spaced, the same for all spectra of a batch);
+        k ("int" and greater than 0) - number of peaks.
+    The result of the function:
+        Return values:
+            peak_frequency ("numpy.ndarray" with dtype="numpy.float64") - frequencies of the peaks (shape (..., k), from the strongest peak, NaN if there are fewer than k peaks);
+            peak_amplitude ("numpy.ndarray" with dtype="numpy.float64") - amplitudes of the peaks (0 if there are fewer than k peaks).
+    '''
+
+    amplitude = np.asarray(amplitude, dtype=np.float64)
+    frequency = np.asarray(frequency, dtype=np.float64)
+    step = frequency[1] - frequency[0]
+
+    # Local maxima (the first and last bins are not peaks); the other bins get -inf.
+    candidates = np.full(shape=amplitude.shape, fill_value=-np.inf)
+    inner = amplitude[..., 1:-1]
+    is_peak = (inner > amplitude[..., :-2]) & (inner >= amplitude[..., 2:])
+    candidates[..., 1:-1] = np.where(is_peak, inner, -np.inf)
+
+    # The k largest in linear time, then only these k are sorted.
+    k_found = min(k, candidates.shape[-1])
+    index = np.argpartition(candidates, -k_found, axis=-1)[..., -k_found:]
+    order = np.argsort(-np.take_along_axis(candidates, index, axis=-1), axis=-1)
+    index = np.take_along_axis(index, order, axis=-1)
+    found = np.isfinite(np.take_along_axis(candidates, index, axis=-1))
+
+    # Parabola through the logarithms of the three neighboring amplitudes: the vertex is shifted by delta bins from the maximum.
+    left, center, right = (np.log(np.take_along_axis(amplitude, np.clip(index + shift, 0, amplitude.shape[-1] - 1), axis=-1) + 1e-300) for shift in (-1, 0, 1))
+    denominator = left - 2*center + right
+    delta = np.where(found & (denominator < 0), 0.5*(left - right)/np.where(denominator < 0, denominator, -1), 0.0)
+
+    peak_frequency = np.where(found, frequency[0] + (index + delta)*step, np.nan)
+    peak_amplitude = np.where(found, np.exp(center - 0.25*(left - right)*delta), 0.0)
+
+    if k_found < k:
+        pad = [(0, 0)] * (amplitude.ndim - 1) + [(0, k - k_found)]
+        peak_frequency = np.pad(peak_frequency, pad, constant_values=np.nan)
+        peak_amplitude = np.pad(peak_amplitude, pad)
+
+    return peak_frequency, peak_amplitude
+
+def spectral_features(amplitude, frequency, k=K_PEAKS, bands=BANDS, rolloff=ROLLOFF):
+
+    '''
+    This function is used to calculate the features of a spectrum (or of a batch of spectra).
+    The following parameters are passed to the function:
+        amplitude ("numpy.ndarray") - signal amplitude (one spectrum or a batch of spectra with one spectrum per row);
+        frequency ("numpy.ndarray") - signal frequency in hertz (evenly spaced, from 0, the same for all spectra of a batch);
+        k ("int" and greater than 0) - number of peaks;
+        bands ("list" or "tuple" of increasing "int" or "float") - edges of the frequency bands in hertz;
+        rolloff ("float" from 0 to 1) - part of the energy below the rolloff frequency.
+    The result of the function:
+        Return values:
+            record ("numpy.ndarray" with dtype=record_dtype(k, len(bands))) - the features (shape () for one spectrum or (number of spectra,) for a batch).
+                centroid - the frequency weighted by the amplitude; bandwidth - the standard deviation of the frequency around the centroid;
+                rolloff - the frequency below which the part "rolloff" of the energy (amplitude**2) lies; flatness - the geometric mean of the energy divided by the arithmetic mean (1 for noise, near 0 for tones);
+                band_energy - the sum of amplitude**2 in each band.
+    '''
+
+    amplitude = np.asarray(amplitude, dtype=np.float64)
+    frequency = np.asarray(frequency, dtype=np.float64)
+    batch = amplitude.reshape(-1, amplitude.shape[-1])
+
+    record = np.zeros(shape=batch.shape[0], dtype=record_dtype(k, len(bands)))
+    record['peak_frequency'], record['peak_amplitude'] = find_peaks(batch, frequency, k)
+
+    total = batch.sum(axis=-1)
+    safe_total = np.where(total > 0, total, 1)
+    centroid = batch @ frequency / safe_total
+    record['centroid'] = centroid
+    record['bandwidth'] = np.sqrt(np.maximum(batch @ frequency**2 / safe_total - centroid**2, 0))
+
+    energy = batch**2
+    cumulative = np.cumsum(energy, axis=-1)
+    record['rolloff'] = frequency[np.minimum((cumulative < rolloff*cumulative[:, -1:]).sum(axis=-1), frequency.size - 1)]
+
+    mean_energy = energy.mean(axis=-1)
+    record['flatness'] = np.where(mean_energy > 0, np.exp(np.log(energy + 1e-300).mean(axis=-1)) / np.where(mean_energy > 0, mean_energy, 1), 0)
+
+    # The bins of each band are summed by "numpy.add.reduceat" (the frequencies are sorted, the bands are found by binary search).
+    # For an empty band (edges[i] == edges[i+1]), "reduceat" returns the value of the bin edges[i] instead of 0, so the empty bands are set to zero.
+    edges = np.searchsorted(frequency, bands)
+    band_energy = np.add.reduceat(np.pad(energy, ((0, 0), (0, 1))), np.minimum(edges, frequency.size), axis=-1)
+    empty = (edges >= frequency.size) | np.append(edges[1:] == edges[:-1], False)
+    record['band_energy'] = np.where(empty, 0, band_energy)
+
+    return record.reshape(amplitude.shape[:-1])
+
+def stft_features(data_signal, RATE, NPERSEG=2048, step=None, k=K_PEAKS, bands=BANDS, rolloff=ROLLOFF, window="hann"):
+
+    '''
+    This function is used to calculate the features of the frames of a signal (short-time Fourier transform, the frames are transformed in batches by "fft").
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        NPERSEG ("int" and a power of two) - number of frames of the signal in a frame of the transform;
+        step ("int" and greater than 0 or None) - distance between the beginnings of the frames. If None, NPERSEG/2;
+        k, bands, rolloff - please refer to "spectral_features";
+        window ("str" - one of "window_functions.WINDOWS") - the window applied to the frames (the coefficients are calculated once, "window_functions.py").
+    The result of the function:
+        Return values:
+            record ("numpy.ndarray" with dtype=record_dtype(k, len(bands))) - the features of each frame (shape (number of frames,));
+            time ("numpy.ndarray" with dtype="numpy.float64") - the time of the beginning of each frame in seconds.
+    '''
+
+    import fast_fourier_transform
+    import power_spectral_density
+    import window_functions
+
+    if step is None:
+        step = int(NPERSEG/2)
+
+    data_signal = np.asarray(data_signal) # The integer frames are converted when the window is applied
+    n_frames = max(0, (data_signal.size - NPERSEG) // step + 1)
+    frequency = np.arange(int(NPERSEG/2) + 1) * RATE / NPERSEG
+    offsets = np.arange(NPERSEG)
+    frames = np.empty(shape=(power_spectral_density.BATCH, NPERSEG), dtype=np.float64) # The windowed frames of a batch (the array is reused)
+
+    records = []
+    for batch_start in range(0, n_frames, power_spectral_density.BATCH):
+        starts = np.arange(batch_start, min(batch_start + power_spectral_density.BATCH, n_frames)) * step
+        FT = fast_fourier_transform.fft(window_functions.apply_window(data_signal[starts[:, None] + offsets], window, frames[:starts.size]))[:, :frequency.size]
+        amplitude = window_functions.window_amplitude(FT, NPERSEG, window) # Normalized amplitude (the window reduces the amplitude by its mean)
+        records.append(spectral_features(amplitude, frequency, k, bands, rolloff))
+
+    record = np.concatenate(records) if records else np.zeros(shape=0, dtype=record_dtype(k, len(bands)))
+    return record, np.arange(n_frames) * step / RATE
+
+if __name__ == "__main__":
+    import fast_fourier_transform
+    import signal_generator
+
+    FT, amplitude, frequency = fast_fourier_transform.fast_fourier_transform("../data/examples/signal_440hz_duration_5s-95ms.wav")
+    record = spectral_features(amplitude, frequency)
+    print(f"Peaks: {record['peak_frequency']} Hz, centroid = {record['centroid']} Hz, flatness = {record['flatness']}, record size = {record.itemsize} bytes")
+
+    data_signal = signal_generator.generate_signal_sequence(3.0, 8000, (440, 0, 880), 256)
+    record, time = stft_features(data_signal, 8000, NPERSEG=1024)
+    for t, f in zip(time[::8], record['peak_frequency'][::8, 0]):
+        print(f"{'%.3f' % t} seconds: the strongest frequency {'%.1f' % f} Hz")
@@ -0,0 +1,316 @@
+'''
+This module is used to show the spectrum of a live signal (a real-time spectrum analyzer): the capture, the transform and the graph work at the same time.
+    Capture - "pyaudio" in the callback mode (the audio thread only puts the CHUNK into a bounded queue) or a synthetic source from "signal_generator" (for tests without a microphone);
+    Transform - a worker thread takes the new CHUNKs from the queue, keeps the last N_WINDOW frames and calculates their spectrum with a prepared plan
+        (the window coefficients, the buffer and the algorithm of "fft" for N_WINDOW are chosen once, the twiddle factors are calculated before the start);
+    Graph - the line of the spectrum is created once and updated by "set_ydata" with blitting (only the line is redrawn over the saved background) at REFRESH_RATE times per second.
+If the worker thread does not keep up, the queue overflows and the CHUNKs are dropped (the capture is never blocked); if the graph does not keep up, the refreshes are late.
+    Both are counted and reported at the end ("analyzer_report").
+'''
+
+import queue
+import threading
+import time # Used to keep the refresh rate and to calculate the time spent on the transforms
+
+import numpy as np
+
+import fast_fourier_transform
+import window_functions
+
+QUEUE_CHUNKS = 32 # Maximum number of CHUNKs waiting for the worker thread (the next CHUNKs are dropped)
+FLOOR_DB = -120.0 # The lower limit of the graph in decibels relative to the full scale
+
+def analyzer_init(RATE=44100, N_WINDOW=4096, CHUNK=1024, window="hann"):
+
+    '''
+    This function is used to create the state of the analyzer and prepare the plan of the transform.
+    The following parameters are passed to the function:
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        N_WINDOW ("int" and a power of two) - number of frames of the analyzed window (the step between the frequencies is RATE/N_WINDOW);
+        CHUNK ("int" and greater than 0) - number of frames per one piece of the capture;
+        window ("str" - one of "window_functions.WINDOWS") - the window applied to the frames.
+    The result of the function:
+        Return values:
+            state ("dict") - the state of the analyzer (the last spectrum in decibels is state["spectrum"], the counters are used by "analyzer_report").
+    '''
+
+    kernel = fast_fourier_transform.kernel_by_size.get(N_WINDOW, fast_fourier_transform.default_kernel(N_WINDOW))
+    plan = {
+        'kernel': fast_fourier_transform.KERNELS[kernel],
+        'window': window,
+        'buffer': np.zeros(shape=N_WINDOW, dtype=np.float64), # The windowed frames
+        'scale': 2/(N_WINDOW*window_functions.coherent_gain(window, N_WINDOW)*32768) # The normalized amplitude relative to the full scale of 16-bit data
+    }
+    plan['kernel'](plan['buffer']) # The twiddle factors of this size are calculated before the start
+
+    return {
+        'RATE': RATE,
+        'N_WINDOW': N_WINDOW,
+        'CHUNK': CHUNK,
+        'plan': plan,
+        'frequency': np.arange(int(N_WINDOW/2) + 1) * RATE / N_WINDOW,
+        'history': np.zeros(shape=N_WINDOW, dtype=np.float64), # The last N_WINDOW frames
+        'spectrum': np.full(shape=int(N_WINDOW/2) + 1, fill_value=FLOOR_DB),
+        'queue': queue.Queue(maxsize=QUEUE_CHUNKS),
+        'stop': threading.Event(),
+        'chunks': 0, # Captured CHUNKs
+        'dropped_chunks': 0, # CHUNKs dropped because the queue was full (or reported lost by the audio device)
+        'spectra': 0, # Calculated spectra
+        'compute_time': 0.0, # Time spent on the spectra in seconds
+        'refreshes': 0, # Redrawn graphs
+        'late_refreshes': 0, # Refreshes that missed their time
+        'refresh_start': None, # Beginning of the refreshes of the graph (after the window is shown)
+        'start_time': time.perf_counter()
+    }
+
+def capture_chunk(state, chunk):
+
+    '''
+    This function is used to pass a captured CHUNK to the worker thread (it does not wait: if the queue is full, the CHUNK is dropped and counted).
+    '''
+
+    state['chunks'] += 1
+    try:
+        state['queue'].put_nowait(chunk)
+    except queue.Full:
+        state['dropped_chunks'] += 1
+
+def analyzer_update(state, chunks):
+
+    '''
+    This function is used to add new frames to the window and calculate its spectrum (the plan of "analyzer_init" is used, nothing is allocated except the result).
+    The following parameters are passed to the function:
+        state ("dict") - the state of the analyzer;
+        chunks ("list" of "numpy.ndarray") - the new frames.
+    The result of the function:
+        Return values:
+            spectrum ("numpy.ndarray" with dtype="numpy.float64") - the amplitude in decibels relative to the full scale (from 0 to the Nyquist frequency).
+    '''
+
+    start_time = time.perf_counter()
+    history, plan = state['history'], state['plan']
+
+    frames = np.concatenate(chunks)[-history.size:] if len(chunks) > 1 else chunks[0][-history.size:]
+    history[:-frames.size or None] = history[frames.size:]
+    history[-frames.size:] = frames
+
+    window_functions.apply_window(history, plan['window'], plan['buffer'])
+    FT = plan['kernel'](plan['buffer'])[:state['spectrum'].size]
+    spectrum = 20*np.log10(np.maximum(abs(FT)*plan['scale'], 10**(FLOOR_DB/20)))
+
+    state['spectrum'] = spectrum # The graph takes the last complete spectrum (the reference is replaced at once)
+    state['spectra'] += 1
+    state['compute_time'] += time.perf_counter() - start_time
+    return spectrum
+
+def analyzer_worker(state):
+
+    '''
+    This function is used to calculate the spectra in a separate thread while the analyzer works: all the CHUNKs waiting in the queue are added at once and one spectrum is calculated.
+    '''
+
+    while not state['stop'].is_set():
+        try:
+            chunks = [state['queue'].get(timeout=0.1)]
+        except queue.Empty:
+            continue
+        while True:
+            try:
+                chunks.append(state['queue'].get_nowait())
+            except queue.Empty:
+                break
+        analyzer_update(state, chunks)
+
+def synthetic_source(state, FREQUENCIES=(440, 1000, 5000), realtime=True):
+
+    '''
+    This function is used to capture a synthetic signal instead of the microphone (function "generate_signal_sum" from "signal_generator.py"), for example, in tests.
+    The following parameters are passed to the function:
+        state ("dict") - the state of the analyzer;
+        FREQUENCIES ("list" or "tuple" with elements of "int" or "float") - the frequencies of the signal;
+        realtime ("bool") - if "True", the CHUNKs are passed at the rate of a microphone, otherwise as fast as possible.
+    The result of the function:
+        Return values:
+            thread ("threading.Thread") - the started thread of the source (it stops with state["stop"]).
+    '''
+
+    import signal_generator
+
+    RATE, CHUNK = state['RATE'], state['CHUNK']
+    data_signal = signal_generator.generate_signal_sum(1.0, RATE, FREQUENCIES, CHUNK) # One second of the signal is repeated
+
+    def run():
+        next_time = time.perf_counter()
+        position = 0
+        while not state['stop'].is_set():
+            capture_chunk(state, data_signal[position:position + CHUNK])
+            position = (position + CHUNK) % data_signal.size
+            if realtime:
+                next_time += CHUNK / RATE
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def microphone_source(state, input_device=None):
+
+    '''
+    This function is used to capture the signal from the microphone ("pyaudio" in the callback mode: the CHUNKs are passed by the audio thread, the program does not wait for them).
+    The following parameters are passed to the function:
+        state ("dict") - the state of the analyzer;
+        input_device ("int" or None) - the index of the recording device. If None, the default device.
+    The result of the function:
+        Return values:
+            close (function) - stops the stream and closes the audio system.
+    '''
+
+    import pyaudio # The audio library is loaded only for the microphone
+
+    audio = pyaudio.PyAudio()
+
+    def callback(in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            state['dropped_chunks'] += 1 # The audio device lost frames before the callback
+        capture_chunk(state, np.frombuffer(in_data, dtype=np.int16))
+        return (None, pyaudio.paContinue)
+
+    stream = audio.open(format=pyaudio.paInt16,
+                        channels=1,
+                        rate=state['RATE'],
+                        frames_per_buffer=state['CHUNK'],
+                        input_device_index=input_device,
+                        input=True,
+                        stream_callback=callback)
+    stream.start_stream()
+
+    def close():
+        stream.stop_stream()
+        stream.close()
+        audio.terminate()
+
+    return close
+
+def analyzer_plot(state, REFRESH_RATE=30, SECONDS=None):
+
+    '''
+    This function is used to show the spectrum and update it REFRESH_RATE times per second until the window is closed or SECONDS have passed.
+        The line is created once; at each refresh, the saved background is restored, the new values are set by "set_ydata" and only the line is drawn (blitting).
+    '''
+
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(nrows=1, ncols=1, figsize=(14, 8))
+    line, = axes.plot(state['frequency'], state['spectrum'], animated=True)
+    axes.set_xlim(0, state['RATE']/2)
+    axes.set_ylim(FLOOR_DB, 0)
+    axes.set_title(f"Spectrum analyzer ({state['N_WINDOW']} frames, {state['plan']['window']} window)", fontsize=10)
+    axes.set_xlabel('Frequency', fontsize=10)
+    axes.set_ylabel('Amplitude, dB', fontsize=10)
+    axes.grid(alpha=0.1)
+
+    # The background (the axes without the line) is saved after each full drawing, for example, after the window is resized.
+    background = {}
+    def save_background(event):
+        background['image'] = fig.canvas.copy_from_bbox(axes.bbox)
+        axes.draw_artist(line)
+    fig.canvas.mpl_connect('draw_event', save_background)
+
+    plt.show(block=False)
+    fig.canvas.draw()
+
+    shown = -1
+    next_time = state['refresh_start'] = time.perf_counter()
+    while plt.fignum_exists(fig.number) and (SECONDS is None or time.perf_counter() - state['start_time'] < SECONDS):
+        if state['spectra'] != shown:
+            shown = state['spectra']
+            fig.canvas.restore_region(background['image'])
+            line.set_ydata(state['spectrum'])
+            axes.draw_artist(line)
+            fig.canvas.blit(axes.bbox)
+            state['refreshes'] += 1
+        fig.canvas.flush_events()
+
+        next_time += 1/REFRESH_RATE
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            state['late_refreshes'] += 1
+            next_time = time.perf_counter() # The missed refreshes are not caught up
+
+    plt.close(fig)
+
+def analyzer_report(state):
+
+    '''
+    This function is used to print and return the statistics of the analyzer: the dropped frames, the time of the transforms and the refresh rate.
+    '''
+
+    seconds = time.perf_counter() - state['start_time']
+    refresh_seconds = time.perf_counter() - state['refresh_start'] if state['refresh_start'] is not None else 0.0
+    report = {
+        'seconds': seconds,
+        'chunks': state['chunks'],
+        'dropped_chunks': state['dropped_chunks'],
+        'dropped_frames': state['dropped_chunks'] * state['CHUNK'],
+        'spectra': state['spectra'],
+        'compute_time': state['compute_time'] / max(state['spectra'], 1),
+        'refresh_rate': state['refreshes'] / refresh_seconds if refresh_seconds > 0 else 0.0,
+        'late_refreshes': state['late_refreshes']
+    }
+
+    print(f"Spectrum analyzer: {'%.1f' % seconds} seconds, {report['chunks']} CHUNKs captured, {report['dropped_chunks']} dropped ({report['dropped_frames']} frames).")
+    print(f"\t{report['spectra']} spectra, {'%.3f' % (1000*report['compute_time'])} ms per spectrum; {'%.1f' % report['refresh_rate']} refreshes per second, {report['late_refreshes']} late.\n")
+    return report
+
+def spectrum_analyzer(source="microphone", SECONDS=None, RATE=44100, N_WINDOW=4096, CHUNK=1024, REFRESH_RATE=30, window="hann", FREQUENCIES=(440, 1000, 5000), need_to_plot=True):
+
+    '''
+    This function allows you to show the spectrum of a live signal in real time.
+    The following parameters are passed to the function:
+        source ("str" "microphone" or "synthetic") - the captured signal ("synthetic" - the sum of sinusoids with FREQUENCIES from "signal_generator", without a microphone);
+        SECONDS ("float" or None) - duration of the work in seconds. If None, until the window of the graph is closed (required if need_to_plot=False);
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        N_WINDOW ("int" and a power of two) - number of frames of the analyzed window;
+        CHUNK ("int" and greater than 0) - number of frames per one piece of the capture;
+        REFRESH_RATE ("int" and greater than 0) - target number of refreshes of the graph per second;
+        window ("str" - one of "window_functions.WINDOWS") - the window applied to the frames;
+        FREQUENCIES ("list" or "tuple") - the frequencies of the synthetic signal;
+        need_to_plot ("bool") - if "False", the spectra are calculated without the graph (for example, to check the analyzer with the synthetic source).
+    The result of the function:
+        Return values:
+            report ("dict") - the statistics of the analyzer (please refer to "analyzer_report");
+            state ("dict") - the state of the analyzer (the last spectrum is state["spectrum"], the frequencies are state["frequency"]).
+    '''
+
+    if need_to_plot == False and SECONDS is None:
+        SECONDS = 5.0
+        print(f'The duration is required without the graph. The default value is set:\n\t SECONDS = {SECONDS}')
+
+    state = analyzer_init(RATE, N_WINDOW, CHUNK, window)
+    worker = threading.Thread(target=analyzer_worker, args=(state,), daemon=True)
+    worker.start()
+
+    close = None
+    if source == "synthetic":
+        synthetic_source(state, FREQUENCIES)
+    else:
+        close = microphone_source(state)
+    state['start_time'] = time.perf_counter() # The preparation of the source is not counted
+
+    try:
+        if need_to_plot == True:
+            analyzer_plot(state, REFRESH_RATE, SECONDS)
+        else:
+            time.sleep(SECONDS)
+    finally:
+        state['stop'].set()
+        if close is not None:
+            close()
+        worker.join()
+
+    return analyzer_report(state), state
+
+if __name__ == "__main__":
+    spectrum_analyzer(source="synthetic")
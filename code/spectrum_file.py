@@ -0,0 +1,165 @@
+'''
+This module is used to save the result of the discrete Fourier transform to a binary file with the extension ".spec" and read it back.
+The file consists of a header of 64 bytes and the values of the bins stored one after another (little-endian):
+    "SPEC" | version (uint16) | mode (uint16) | RATE (uint32) | N_FRAMES (uint64) | first_bin (uint64) | n_bins (uint64) | window (12 bytes) | backend (16 bytes)
+    N_FRAMES is the number of frames of the transformed signal (the frequency of the bin k is k*RATE/N_FRAMES), window and backend describe how the spectrum was calculated.
+The values are stored as "complex128" or "complex64", or only the normalized amplitude 2*abs(FT)/N_FRAMES is stored as "float32" or "float16"
+    (2 to 8 times smaller, but the inverse transform is not possible; "float16" holds amplitudes up to 65504, which is enough for 16-bit signals).
+The values are read through "numpy.memmap": nothing is copied until it is used, and any range of bins is read without reading the rest of the file.
+'''
+
+import struct
+
+import numpy as np
+
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQQQ12s16s') # 64 bytes
+MODES = {
+    'complex128': np.dtype('<c16'),
+    'complex64': np.dtype('<c8'),
+    'float32': np.dtype('<f4'), # Normalized amplitude only
+    'float16': np.dtype('<f2') # Normalized amplitude only
+}
+
+def spectrum_write(FILENAME, FT, RATE, N_FRAMES, mode="complex128", window="rectangular", backend="fft", first_bin=0):
+
+    '''
+    This function is used to save the values of the discrete Fourier transform to a file with the extension ".spec".
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path to save the file and its name with the extension ".spec";
+        FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform (for example, from 0 to the Nyquist frequency as returned by "fast_fourier_transform");
+        RATE ("int") - sampling rate of the signal in hertz;
+        N_FRAMES ("int") - number of frames of the transformed signal;
+        mode ("str" "complex128", "complex64", "float32" or "float16") - how the values are stored ("float32" and "float16" store only the normalized amplitude 2*abs(FT)/N_FRAMES);
+        window ("str") - the name of the window applied to the signal before the transform;
+        backend ("str") - the name of the function that calculated the transform;
+        first_bin ("int") - the index of the first bin of FT (if only a range of bins is saved).
+    The result of the function will be a saved file.
+    '''
+
+    if mode not in MODES:
+        raise ValueError(f'The mode "{mode}" is not supported. Available modes: {", ".join(MODES)}.')
+
+    FT = np.asarray(FT)
+    if MODES[mode].kind == 'f':
+        FT = np.minimum(2*abs(FT)/N_FRAMES, np.finfo(MODES[mode]).max) # Normalized signal amplitude
+
+    with open(FILENAME, 'wb') as file:
+        file.write(HEADER.pack(b'SPEC', VERSION, list(MODES).index(mode), RATE, N_FRAMES, first_bin, FT.size, window.encode('ascii')[:12], backend.encode('ascii')[:16]))
+        file.write(memoryview(np.ascontiguousarray(FT, dtype=MODES[mode])).cast('B'))
+
+def spectrum_info(FILENAME):
+
+    '''
+    This function is used to read the header of a file with the extension ".spec".
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".spec".
+    The result of the function:
+        Return values:
+            info ("dict") - the header: "mode", "RATE", "N_FRAMES", "first_bin", "n_bins", "window", "backend".
+    '''
+
+    with open(FILENAME, 'rb') as file:
+        header = file.read(HEADER.size)
+
+    if len(header) < HEADER.size or header[:4] != b'SPEC':
+        raise ValueError(f'The file "{FILENAME}" is not a spectrum file.')
+
+    magic, version, mode, RATE, N_FRAMES, first_bin, n_bins, window, backend = HEADER.unpack(header)
+    if version > VERSION:
+        raise ValueError(f'The version {version} of the spectrum file "{FILENAME}" is not supported.')
+
+    return {
+        'mode': list(MODES)[mode],
+        'RATE': RATE,
+        'N_FRAMES': N_FRAMES,
+        'first_bin': first_bin,
+        'n_bins': n_bins,
+        'window': window.rstrip(b'\0').decode('ascii'),
+        'backend': backend.rstrip(b'\0').decode('ascii')
+    }
+
+def spectrum_read(FILENAME, index_start=0, index_stop=None):
+
+    '''
+    This function is used to read a range of bins from a file with the extension ".spec" (the values are memory-mapped, not copied).
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".spec";
+        index_start, index_stop ("int") - the range of the stored bins (counted from the first stored bin). If index_stop is None, up to the last bin.
+    The result of the function:
+        Return values:
+            FT ("numpy.memmap" with dtype=complex128, complex64, float32 or float16 depending on the mode) - the values of the bins (read-only);
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - the frequencies of the bins in hertz;
+            info ("dict") - the header of the file (please refer to "spectrum_info").
+    '''
+
+    info = spectrum_info(FILENAME)
+    index_stop = info['n_bins'] if index_stop is None else min(index_stop, info['n_bins'])
+    index_start = min(max(index_start, 0), index_stop)
+
+    dtype = MODES[info['mode']]
+    if index_stop > index_start:
+        FT = np.memmap(FILENAME, dtype=dtype, mode='r', offset=HEADER.size + index_start*dtype.itemsize, shape=index_stop - index_start)
+    else:
+        FT = np.zeros(shape=0, dtype=dtype)
+
+    frequency = (info['first_bin'] + np.arange(index_start, index_stop)) * info['RATE'] / info['N_FRAMES']
+    return FT, frequency, info
+
+def spectrum_amplitude(FILENAME, index_start=0, index_stop=None):
+
+    '''
+    This function is used to read the normalized amplitude (as in "fast_fourier_transform") of a range of bins from a file with the extension ".spec".
+    The parameters are the same as for "spectrum_read".
+    The result of the function:
+        Return values:
+            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude;
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz.
+    '''
+
+    FT, frequency, info = spectrum_read(FILENAME, index_start, index_stop)
+    if FT.dtype.kind == 'f':
+        return FT.astype(np.float64), frequency
+    amplitude = 2*abs(FT)/info['N_FRAMES'] # Normalized signal amplitude
+    return amplitude, frequency
+
+def spectrum_inverse(FILENAME):
+
+    '''
+    This function is used to calculate the inverse discrete Fourier transform (function "inverse_fast_fourier_transform") from a file with the extension ".spec".
+        Note: The file must store the complex values of all bins (from 0 to the Nyquist frequency or the whole spectrum) of a signal whose amount of data is a power of two.
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".spec".
+    The result of the function:
+        Please refer to the result of the "inverse_fast_fourier_transform" function implemented in the "inverse_fast_fourier_transform.py" file.
+    '''
+
+    import inverse_fast_fourier_transform
+
+    FT, frequency, info = spectrum_read(FILENAME)
+    if FT.dtype.kind != 'c' or info['first_bin'] != 0:
+        raise ValueError(f'The file "{FILENAME}" does not store the complex values of all bins, the inverse transform is not possible.')
+
+    # The spectrum from 0 to the Nyquist frequency is mirrored, the whole spectrum is used as is.
+    mirror_image = info['n_bins'] != info['N_FRAMES']
+    return inverse_fast_fourier_transform.inverse_fast_fourier_transform(np.array(FT, dtype=np.complex128), mirror_image)
+
+if __name__ == "__main__":
+    import os
+    import time
+    import fast_fourier_transform
+
+    FT, amplitude, frequency = fast_fourier_transform.fast_fourier_transform("../data/examples/signal_440hz_duration_5s-95ms.wav")
+    N_FRAMES = 2*(FT.size - 1)
+
+    for mode in MODES:
+        FILENAME = f"../data/spectrum_440hz_{mode}.spec"
+        start_time = time.time() # Starting the stopwatch
+        spectrum_write(FILENAME, FT, 11025, N_FRAMES, mode)
+        band, band_frequency = spectrum_amplitude(FILENAME, 2550, 2700) # Only these bins are read from the file
+        end_time = time.time() - start_time # Stopping the stopwatch
+        print(f"{mode}: {os.path.getsize(FILENAME)} bytes, the strongest frequency {band_frequency[np.argmax(band)]} Hz. Time spent {'%.4f' % end_time} seconds.")
+
+    iFT, data_signal = spectrum_inverse("../data/spectrum_440hz_complex128.spec")
+    for mode in MODES:
+        os.remove(f"../data/spectrum_440hz_{mode}.spec")
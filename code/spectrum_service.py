@@ -0,0 +1,223 @@
+'''
+This module is used to calculate the spectra of signals on request (a local service based on "asyncio").
+The requests are received on a local socket, one request per line in the ".json" format:
+    {"path": "../data/examples/signal_440hz_duration_5s-95ms.wav", "top": 5} - the spectrum of a ".wav" file;
+    {"pcm_bytes": 131072, "rate": 44100, "sample_format": 2, "top": 5} - the spectrum of the signal data (mono), the "pcm_bytes" bytes of which follow the line;
+    {"command": "stats"} - the statistics of the service (number of requests, queue length and latency).
+The response is one line in the ".json" format: {"status": "ok", "N_FRAMES": ..., "RATE": ..., "peaks": [[frequency, amplitude], ...], ...} or {"status": "error", "message": ...}.
+The files are read in threads, so reading overlaps with calculations, and the discrete Fourier transform is calculated in a shared pool of processes
+    ("fft" from "fast_fourier_transform.py"; if the amount of data is not a power of two, the signal is padded with zeros to the next power of two).
+The queue of requests is bounded: if it is full, the request waits (backpressure) and is rejected after QUEUE_TIMEOUT seconds, so the latency stays stable under load.
+'''
+
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import time # Used to calculate the latency of requests
+
+import numpy as np
+
+import wave_worker
+import isPowerOfTwo
+
+HOST = "127.0.0.1"
+PORT = 8765
+QUEUE_SIZE = 64 # Maximum number of requests waiting for calculation
+QUEUE_TIMEOUT = 5.0 # Time in seconds after which a request that did not get into the queue is rejected
+MAX_PCM_BYTES = 64 * 1024 * 1024 # Maximum size of the signal data in one request
+LATENCY_HISTORY = 1000 # Number of the last requests for which the latency statistics are calculated
+
+def compute_spectrum(data_signal, RATE, top=5):
+
+    '''
+    This function is used to calculate the spectrum of a signal and find its strongest frequencies. (note: It is executed in the pool of processes of the service.)
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        top ("int" and greater than 0) - number of the strongest frequencies returned.
+    The result of the function:
+        Return values:
+            peaks ("list" of "list" ("float", "float")) - the strongest frequencies in hertz and their normalized amplitudes (sorted from the strongest).
+                If the amount of data is not a power of two, the signal is padded with zeros, so the step between the frequencies is RATE/N (N - the padded size);
+            compute_time ("float") - time spent on the calculation in seconds.
+    '''
+
+    import fast_fourier_transform
+
+    start_time = time.perf_counter()
+
+    N_FRAMES = len(data_signal)
+
+    # The direct formula would take N_FRAMES**2 operations for the sizes that are not a power of two, so the signal is padded with zeros for "fft".
+    N = N_FRAMES if isPowerOfTwo.isPowerOfTwo(N_FRAMES) else 1 << N_FRAMES.bit_length()
+    if N != N_FRAMES:
+        data_signal = np.pad(np.asarray(data_signal, dtype=np.float64), (0, N - N_FRAMES))
+    FT = fast_fourier_transform.fft(data_signal)[:int(N/2) + 1]
+
+    amplitude = 2*abs(FT)/N_FRAMES # Normalized signal amplitude (the zeros of the padding do not add to the amplitude)
+
+    top = max(1, min(top, amplitude.size))
+    indices = np.argpartition(amplitude, -top)[-top:]
+    indices = indices[np.argsort(amplitude[indices])[::-1]]
+    peaks = [[float(index * RATE / N), float(amplitude[index])] for index in indices]
+
+    return peaks, time.perf_counter() - start_time
+
+def percentile(values, q):
+
+    '''
+    The q-th percentile of the values (0.0 if there are no values).
+    '''
+
+    return float(np.percentile(values, q)) if len(values) > 0 else 0.0
+
+async def serve(host=HOST, port=PORT, workers=None, queue_size=QUEUE_SIZE, started=None):
+
+    '''
+    This function allows you to start the service.
+    The following parameters are passed to the function:
+        host ("str") - the address of the local socket;
+        port ("int") - the port of the local socket (if 0, a free port is selected);
+        workers ("int" and greater than 0 or None) - number of processes for calculations. If None, the number of cores is used;
+        queue_size ("int" and greater than 0) - maximum number of requests waiting for calculation;
+        started ("asyncio.Future" or None) - if passed, the address of the started service ("tuple" (host, port)) will be set in it.
+    The result of the function will be a working service (the function runs until it is cancelled).
+    '''
+
+    workers = workers or os.cpu_count()
+    loop = asyncio.get_running_loop()
+
+    queue = asyncio.Queue(maxsize=queue_size)
+    latencies = []
+    statistics = {'requests': 0, 'rejected': 0, 'errors': 0}
+
+    process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    async def dispatcher():
+        # Takes requests from the queue: reading the file in a thread, then calculating in the pool of processes.
+        while True:
+            job, result = await queue.get()
+            try:
+                if 'path' in job:
+                    data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = await loop.run_in_executor(io_pool, wave_worker.wave_read, job['path'])
+                else:
+                    data_signal, RATE = job['data_signal'], job['rate']
+                peaks, compute_time = await loop.run_in_executor(process_pool, compute_spectrum, data_signal, RATE, job.get('top', 5))
+                result.set_result({'status': 'ok', 'N_FRAMES': len(data_signal), 'RATE': RATE, 'peaks': peaks, 'compute_time': compute_time})
+            except Exception as error:
+                result.set_result({'status': 'error', 'message': f'{type(error).__name__}: {error}'})
+            finally:
+                queue.task_done()
+
+    async def process(job):
+        start_time = time.perf_counter()
+        result = loop.create_future()
+        try:
+            await asyncio.wait_for(queue.put((job, result)), QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            statistics['rejected'] += 1
+            return {'status': 'error', 'message': 'The service is overloaded, try again later.'}
+
+        response = await result
+        response['latency'] = time.perf_counter() - start_time
+        latencies.append(response['latency'])
+        del latencies[:-LATENCY_HISTORY]
+        return response
+
+    async def handle_client(reader, writer):
+        # Requests of one connection are processed in turn, the connections are processed concurrently.
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                close_connection = False
+                try:
+                    job = json.loads(line)
+                    if job.get('command') == 'stats':
+                        response = {'status': 'ok', **statistics, 'queue': queue.qsize(),
+                                    'latency_p50': percentile(latencies, 50), 'latency_p95': percentile(latencies, 95), 'latency_p99': percentile(latencies, 99)}
+                    elif 'path' in job or 'pcm_bytes' in job:
+                        if 'pcm_bytes' in job:
+                            if type(job['pcm_bytes']) != int or not 0 < job['pcm_bytes'] <= MAX_PCM_BYTES:
+                                # The signal data that follows the line cannot be skipped (its size is not valid), so the connection is closed after the response,
+                                # otherwise the data would be read as the next requests.
+                                close_connection = True
+                                raise ValueError(f'The size of the signal data must be from 1 to {MAX_PCM_BYTES} bytes. The connection is closed.')
+                            raw = await reader.readexactly(job['pcm_bytes'])
+                            job['data_signal'] = wave_worker.decode_frames(raw, job.get('sample_format', 2), job.get('is_float', False))
+                            job['rate'] = job.get('rate', 44100)
+                        # "top" is checked after the signal data is read, so the connection stays in sync.
+                        if type(job.get('top', 5)) != int or job.get('top', 5) < 1:
+                            raise ValueError(f'The number of the strongest frequencies "top" must be an integer greater than 0.')
+                        statistics['requests'] += 1
+                        response = await process(job)
+                    else:
+                        raise ValueError(f'Unknown request. Expected "path", "pcm_bytes" or "command".')
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {'status': 'error', 'message': f'{error}'}
+
+                if response['status'] == 'error':
+                    statistics['errors'] += 1
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain() # Waiting if the client does not read the responses
+                if close_connection:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    dispatchers = [asyncio.create_task(dispatcher()) for _ in range(2 * workers)] # Twice as many as processes, so that the processes do not wait for reading of files
+    server = await asyncio.start_server(handle_client, host, port)
+    address = server.sockets[0].getsockname()[:2]
+    print(f"The spectrum service is running on {address[0]}:{address[1]} ({workers} processes, queue of {queue_size} requests).")
+    if started is not None:
+        started.set_result(address)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in dispatchers:
+            task.cancel()
+        process_pool.shutdown(cancel_futures=True)
+        io_pool.shutdown()
+
+async def request_spectrum(host=HOST, port=PORT, path=None, data_signal=None, RATE=44100, top=5):
+
+    '''
+    This function is used to send one request to the service (client).
+    The following parameters are passed to the function:
+        host ("str"), port ("int") - the address of the service;
+        path ("str" or None) - the path to the ".wav" file;
+        data_signal ("numpy.ndarray" with dtype="numpy.int16" or None) - signal data (used if "path" is None);
+        RATE ("int" and greater than 0) - sampling rate of "data_signal" in hertz;
+        top ("int" and greater than 0) - number of the strongest frequencies returned.
+    The result of the function:
+        Return values:
+            response ("dict") - the response of the service.
+    '''
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if path is not None:
+            writer.write(json.dumps({'path': path, 'top': top}).encode() + b'\n')
+        else:
+            raw = np.ascontiguousarray(data_signal, dtype=np.int16).tobytes()
+            writer.write(json.dumps({'pcm_bytes': len(raw), 'rate': RATE, 'sample_format': 2, 'top': top}).encode() + b'\n')
+            writer.write(raw)
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Enable support for multiprocessing
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"The spectrum service has been stopped.")
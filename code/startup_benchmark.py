@@ -0,0 +1,76 @@
+'''
+This module is used to measure the start time of the program (the time of importing a module in a new interpreter).
+The measurement is made with "python -X importtime", the slowest imports are shown and the total time is compared with the target.
+'''
+
+import subprocess
+import sys
+
+TARGET_SECONDS = 0.1 # Target start time of "main.py" (the menu must be shown without loading "matplotlib", "pyaudio" and the calculation modules)
+
+def import_time(module_name="main", repeat=5):
+
+    '''
+    This function allows you to measure the time of importing a module in a new interpreter (cold start).
+    The following parameters are passed to the function:
+        module_name ("str") - the name of the module to be imported (example: "main");
+        repeat ("int" and greater than 0) - number of measurements. (note: the smallest result is taken, it is the least affected by other programs.)
+    The result of the function:
+        Return values:
+            total_time ("float") - import time of the module in seconds (including the modules it imports);
+            imports ("list" of "tuple" ("str", "float")) - the names of the imported modules and their import time in seconds (including nested imports), sorted from the slowest.
+    '''
+
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ImportError(f'The module "{module_name}" could not be imported:\n{result.stderr}')
+
+        # The lines of the report have the form "import time:      self [us] |    cumulative | imported package".
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imports.append((name.strip(), int(cumulative) / 1e6))
+
+        total_time = next(cumulative for name, cumulative in imports if name == module_name)
+        if best is None or total_time < best[0]:
+            best = (total_time, imports)
+
+    total_time, imports = best
+    imports = sorted(imports, key=lambda item: item[1], reverse=True)
+    return total_time, imports
+
+def startup_benchmark(module_name="main", target_seconds=TARGET_SECONDS, top=10):
+
+    '''
+    This function allows you to check that the start time of a module is less than the target.
+    The following parameters are passed to the function:
+        module_name ("str") - the name of the module to be checked (example: "main");
+        target_seconds ("float" and greater than 0) - the target start time in seconds;
+        top ("int" and greater than 0) - number of the slowest imports shown.
+    The result of the function:
+        Return values:
+            True ("bool") - if the start time is less than the target
+            or
+            False ("bool") - if the start time is greater than the target.
+    '''
+
+    total_time, imports = import_time(module_name)
+
+    print(f'The slowest imports of the module "{module_name}":')
+    for name, cumulative in imports[:top]:
+        print(f"\t{'%.4f' % cumulative} seconds \t {name}")
+
+    print(f'Start time of the module "{module_name}" = {"%.4f" % total_time} seconds (target: {target_seconds} seconds).')
+    if total_time <= target_seconds:
+        print(f"The start time is within the target.")
+        return True
+    else:
+        print(f"The start time exceeds the target.")
+        return False
+
+if __name__ == "__main__":
+    sys.exit(0 if startup_benchmark() else 1)
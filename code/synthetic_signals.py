@@ -0,0 +1,338 @@
+'''
+This module is used to generate test signals for load testing and benchmarking the transforms (signals of any length, reproducible by a seed):
+    "white" - white noise (Gaussian, the same power at all frequencies);
+    "pink" - pink noise (the power falls by 3 dB per octave), the Voss-McCartney algorithm: a sum of PINK_ROWS random values, the row k is changed every 2**(k+1) frames;
+    "brown" - brown noise (the power falls by 6 dB per octave), the white noise through a leaky integrator (the power is limited below BROWN_CUTOFF hertz);
+    "chirp" - a sinusoid whose frequency changes from F_START to F_STOP during the signal, linearly or logarithmically (the same time per octave);
+    "impulses" - a train of unit impulses with the period PERIOD seconds (all frequencies with the same amplitude);
+    "multitone" - a sum of TONES sinusoids with random phases on the bins of a period of MULTITONE_PERIOD frames,
+        the phases are changed by the clipping algorithm until the crest factor (peak/RMS) is not greater than CREST (about 2 can be reached for linearly spaced tones).
+The signals are calculated by "numpy" in pieces of BLOCK frames (the state of the generators is kept between the pieces), and the pieces are written to the file
+    as they are generated ("synthetic_signal_write"), so the length is not limited by the memory. "synthetic_batch" writes many variants in a pool of processes.
+The random numbers are taken from "numpy.random.default_rng(seed)": the same seed gives the same signal, and the variants of a batch get independent seeds from one seed.
+'''
+
+import os
+import time # Used to calculate the generation time
+
+import numpy as np
+
+import wave_worker
+
+BLOCK = wave_worker.CHUNK_FRAMES # Number of frames of a piece
+NOISE_RMS = 0.25 # RMS of the noises relative to the full scale (the values above 4 sigma, about 6e-5 of them, are clipped)
+PINK_ROWS = 16 # Number of the random rows of the pink noise (the spectrum falls by 3 dB per octave over PINK_ROWS octaves)
+BROWN_CUTOFF = 10.0 # Below this frequency the spectrum of the brown noise is flat (otherwise the integrated noise drifts without limit)
+MULTITONE_PERIOD = 2**16 # Number of frames of the period of the multitone signal (the frequencies are the bins of this period)
+CREST_ITERATIONS = 300 # Maximum number of iterations of the reduction of the crest factor
+
+def white_noise(N_FRAMES, RATE, rng, BLOCK=BLOCK):
+
+    '''
+    The white noise: independent Gaussian values with the RMS NOISE_RMS.
+    '''
+
+    for start in range(0, N_FRAMES, BLOCK):
+        yield NOISE_RMS * rng.standard_normal(min(BLOCK, N_FRAMES - start))
+
+def pink_noise(N_FRAMES, RATE, rng, BLOCK=BLOCK):
+
+    '''
+    The pink noise: the sum of a white row and PINK_ROWS rows, the value of the row k for the frame n is the random number number (n + 2**k) >> (k + 1)
+        (only one row is changed in each frame). The last value of each row is kept between the pieces.
+    '''
+
+    scale = NOISE_RMS / np.sqrt(PINK_ROWS + 1)
+    last_index = np.zeros(shape=PINK_ROWS, dtype=np.int64)
+    last_value = rng.standard_normal(PINK_ROWS)
+
+    for start in range(0, N_FRAMES, BLOCK):
+        frames = np.arange(start, min(start + BLOCK, N_FRAMES))
+        data_signal = rng.standard_normal(frames.size)
+        for k in range(PINK_ROWS):
+            index = (frames + (1 << k)) >> (k + 1)
+            first = int(index[0])
+            values = rng.standard_normal(int(index[-1]) - first + 1)
+            if first == last_index[k]:
+                values[0] = last_value[k] # The value continues from the previous piece
+            data_signal += values[index - first]
+            last_index[k], last_value[k] = index[-1], values[-1]
+        data_signal *= scale
+        yield data_signal
+
+def brown_noise(N_FRAMES, RATE, rng, BLOCK=BLOCK, STEP=1024):
+
+    '''
+    The brown noise: y[n] = a*y[n-1] + x[n], a = exp(-2*pi*BROWN_CUTOFF/RATE), x is white noise (scaled so that the RMS of y is NOISE_RMS).
+        The recursion is calculated for STEP frames at once: y[m] = a**m * (a*y_previous + cumsum(x[j] * a**-j)).
+    '''
+
+    a = np.exp(-2*np.pi*BROWN_CUTOFF/RATE)
+    powers = a ** np.arange(STEP)
+    inverse_powers = 1/powers
+    y = NOISE_RMS * rng.standard_normal() # The first value has the stationary distribution
+
+    for start in range(0, N_FRAMES, BLOCK):
+        data_signal = NOISE_RMS * np.sqrt(1 - a*a) * rng.standard_normal(min(BLOCK, N_FRAMES - start))
+        for step in range(0, data_signal.size, STEP):
+            x = data_signal[step:step + STEP]
+            x *= inverse_powers[:x.size]
+            np.cumsum(x, out=x)
+            x += a*y
+            x *= powers[:x.size]
+            y = x[-1]
+        yield data_signal
+
+def chirp(N_FRAMES, RATE, rng, BLOCK=BLOCK, F_START=20.0, F_STOP=None, method="linear"):
+
+    '''
+    The chirp: sin(phase(t)), the frequency changes from F_START to F_STOP (if None, 0.45*RATE) during N_FRAMES frames,
+        "linear" - phase = 2*pi*(F_START*t + (F_STOP - F_START)*t**2/(2*T)), "log" - phase = 2*pi*F_START*T/ln(k)*(k**(t/T) - 1), k = F_STOP/F_START.
+    '''
+
+    if F_STOP is None:
+        F_STOP = 0.45*RATE
+    if method not in ("linear", "log"):
+        raise ValueError(f'The method of the chirp must be "linear" or "log", "{method}" was passed.')
+    if method == "log" and (F_START <= 0 or F_STOP <= 0):
+        raise ValueError(f'The frequencies of the logarithmic chirp must be greater than 0.')
+
+    T = max(N_FRAMES - 1, 1) / RATE
+    k = F_STOP / F_START if method == "log" else 1.0
+    for start in range(0, N_FRAMES, BLOCK):
+        t = np.arange(start, min(start + BLOCK, N_FRAMES)) / RATE
+        if method == "linear" or k == 1.0:
+            phase = 2*np.pi*(F_START*t + (F_STOP - F_START)*t*t/(2*T))
+        else:
+            phase = 2*np.pi*F_START*T/np.log(k)*np.expm1(np.log(k)*t/T)
+        yield np.sin(phase)
+
+def impulses(N_FRAMES, RATE, rng, BLOCK=BLOCK, PERIOD=0.1):
+
+    '''
+    The impulse train: 1 in the frames n = 0, P, 2*P, ... (P = PERIOD*RATE rounded, at least 1), 0 in the other frames.
+    '''
+
+    P = max(1, round(PERIOD*RATE))
+    for start in range(0, N_FRAMES, BLOCK):
+        data_signal = np.zeros(shape=min(BLOCK, N_FRAMES - start))
+        data_signal[-start % P::P] = 1.0
+        yield data_signal
+
+def multitone_period(RATE, rng, TONES=32, F_LOW=50.0, F_HIGH=None, CREST=None, spacing="linear", N=MULTITONE_PERIOD):
+
+    '''
+    This function is used to calculate one period of the multitone signal. (note: It is used for "multitone" but can also be used independently.)
+    The following parameters are passed to the function:
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        rng ("numpy.random.Generator") - the generator of the random phases;
+        TONES ("int" and greater than 0) - number of tones (the tones that fall on the same bin are merged);
+        F_LOW, F_HIGH ("float") - the frequencies of the lowest and the highest tone (if F_HIGH is None, 0.45*RATE);
+        CREST ("float" greater than sqrt(2) or None) - the required crest factor (peak/RMS). If None, the random phases are not changed
+            (the crest factor of random phases is about 3-4, a single sinusoid has sqrt(2)). If CREST is not reached in CREST_ITERATIONS iterations,
+            the phases with the lowest crest factor are used (for the logarithmically spaced tones over a long period, the crest factor is reduced only slightly);
+        spacing ("str" "linear" or "log") - the tones are spaced linearly or logarithmically from F_LOW to F_HIGH;
+        N ("int" and a power of two) - number of frames of the period.
+    The result of the function:
+        Return values:
+            period ("numpy.ndarray" with dtype="numpy.float64") - the period of the signal (the peak is 1);
+            crest ("float") - its crest factor.
+    '''
+
+    import fast_fourier_transform
+    import hermitian_inverse
+
+    if F_HIGH is None:
+        F_HIGH = 0.45*RATE
+    if spacing not in ("linear", "log"):
+        raise ValueError(f'The spacing of the tones must be "linear" or "log", "{spacing}" was passed.')
+    frequencies = np.linspace(F_LOW, F_HIGH, TONES) if spacing == "linear" else np.geomspace(F_LOW, F_HIGH, TONES)
+    bins = np.unique(np.clip(np.rint(frequencies * N / RATE), 1, int(N/2) - 1).astype(np.int64))
+
+    spectrum = np.zeros(shape=int(N/2) + 1, dtype=np.complex128)
+    spectrum[bins] = np.exp(2j*np.pi*rng.random(bins.size))
+
+    # The clipping algorithm: the peaks above CREST*RMS are clipped, and the phases of the tones are taken from the spectrum of the clipped signal (the amplitudes are kept).
+    best, best_crest = None, np.inf
+    for iteration in range(CREST_ITERATIONS if CREST is not None else 1):
+        period = hermitian_inverse.hermitian_ifft(spectrum)
+        rms = np.sqrt(np.mean(period*period))
+        crest = np.abs(period).max() / rms
+        if crest < best_crest:
+            best, best_crest = period.copy(), crest # "period" is clipped below, the clean signal is kept
+        if CREST is None or crest <= CREST:
+            break
+        np.clip(period, -CREST*rms, CREST*rms, out=period)
+        FT = fast_fourier_transform.fft(period)[bins]
+        spectrum[bins] = FT / np.maximum(np.abs(FT), 1e-300)
+
+    return best / np.abs(best).max(), float(best_crest)
+
+def multitone(N_FRAMES, RATE, rng, BLOCK=BLOCK, TONES=32, F_LOW=50.0, F_HIGH=None, CREST=None, spacing="linear"):
+
+    '''
+    The multitone signal: the period of "multitone_period" repeated (the signal is continuous between the periods, all tones are on the bins of the period).
+    '''
+
+    period, crest = multitone_period(RATE, rng, TONES, F_LOW, F_HIGH, CREST, spacing)
+    for start in range(0, N_FRAMES, BLOCK):
+        yield period[np.arange(start, min(start + BLOCK, N_FRAMES)) % period.size]
+
+KINDS = {
+    'white': white_noise,
+    'pink': pink_noise,
+    'brown': brown_noise,
+    'chirp': chirp,
+    'impulses': impulses,
+    'multitone': multitone
+}
+
+def synthetic_chunks(kind, N_FRAMES, RATE, seed=None, BLOCK=BLOCK, **parameters):
+
+    '''
+    This function is used to generate a test signal in pieces (the values are relative to the full scale: from -1 to 1).
+    The following parameters are passed to the function:
+        kind ("str" - one of KINDS) - the signal;
+        N_FRAMES ("int" and not less than 0) - number of frames;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        seed ("int", "numpy.random.SeedSequence" or None) - the seed of the random numbers (if None, the signal is different each time);
+        BLOCK ("int" and greater than 0) - number of frames of a piece;
+        parameters - the parameters of the signal (for example, F_START, F_STOP and method of "chirp", PERIOD of "impulses", TONES, F_LOW, F_HIGH, CREST and spacing of "multitone").
+    The result of the function:
+        Generator of "numpy.ndarray" with dtype="numpy.float64" - the pieces of the signal.
+    '''
+
+    if kind not in KINDS:
+        raise ValueError(f'The signal "{kind}" is not supported. Available signals: {", ".join(KINDS)}.')
+    return KINDS[kind](N_FRAMES, RATE, np.random.default_rng(seed), BLOCK, **parameters)
+
+def synthetic_signal(kind, SECONDS, RATE=44100, seed=None, **parameters):
+
+    '''
+    This function is used to generate a test signal in memory (please refer to "synthetic_chunks").
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="numpy.float64") - the signal from -1 to 1 (int(SECONDS*RATE) frames).
+    '''
+
+    N_FRAMES = int(SECONDS*RATE)
+    pieces = list(synthetic_chunks(kind, N_FRAMES, RATE, seed, **parameters))
+    return np.concatenate(pieces) if pieces else np.zeros(shape=0)
+
+def synthetic_signal_write(FILENAME, kind, SECONDS, RATE=44100, AMPLITUDE=1.0, seed=None, SAMPLE_FORMAT=2, IS_FLOAT=False, **parameters):
+
+    '''
+    This function allows you to generate a test signal of any length and save it to a file with the extension ".wav" (the pieces are written as they are generated).
+    The following parameters are passed to the function:
+        FILENAME ("str") - path to save the file and its name with ".wav" extension;
+        kind ("str" - one of KINDS) - the signal;
+        SECONDS ("float" and greater than 0) - duration of the signal in seconds;
+        RATE ("int" and greater than 0) - sampling rate in hertz;
+        AMPLITUDE ("float" from 0 to 1) - the scale of the signal relative to the full scale of the sound depth (the values outside the full scale are clipped);
+        seed ("int", "numpy.random.SeedSequence" or None) - the seed of the random numbers;
+        SAMPLE_FORMAT ("int" 1, 2, 3 or 4) - sound depth in bytes;
+        IS_FLOAT ("bool") - if "True", 32-bit floating point numbers are written (SAMPLE_FORMAT must be 4);
+        parameters - the parameters of the signal (please refer to "synthetic_chunks").
+    The result of the function:
+        Return values:
+            N_FRAMES ("int") - number of written frames.
+        The signal will be saved to the file.
+    '''
+
+    N_FRAMES = int(SECONDS*RATE)
+    scale = AMPLITUDE * (1.0 if IS_FLOAT else 2**(8*SAMPLE_FORMAT - 1) - 1)
+
+    def pieces():
+        for data_signal in synthetic_chunks(kind, N_FRAMES, RATE, seed, **parameters):
+            data_signal *= scale
+            yield data_signal if IS_FLOAT else np.rint(data_signal, out=data_signal)
+
+    wave_worker.wave_write(FILENAME, pieces(), RATE, 1, SAMPLE_FORMAT, IS_FLOAT)
+    return N_FRAMES
+
+def write_variant(path_to_output, variant, seed):
+
+    '''
+    This function is used to write one variant of a batch. (note: It is executed in the pool of processes of "synthetic_batch".)
+    The result of the function:
+        Return values:
+            result ("dict") - "path", "kind", "frames", "seconds" (the time of the generation), "worker" (the identifier of the process).
+    '''
+
+    start_time = time.perf_counter()
+    variant = dict(variant)
+    kind = variant.pop('kind')
+    N_FRAMES = synthetic_signal_write(path_to_output, kind, seed=variant.pop('seed', seed), **variant)
+    return {'path': path_to_output, 'kind': kind, 'frames': N_FRAMES, 'seconds': time.perf_counter() - start_time, 'worker': os.getpid()}
+
+def synthetic_batch(variants, folder="../data/synthetic", SECONDS=10.0, RATE=44100, seed=0, workers=None, executor=None):
+
+    '''
+    This function allows you to generate many test signals in a pool of processes (for example, a set of files for a benchmark).
+    The following parameters are passed to the function:
+        variants ("list" of "dict") - the signals: "kind" and the parameters of "synthetic_signal_write" (SECONDS, RATE, AMPLITUDE, seed, ... and the parameters of the signal);
+        folder ("str") - the folder for the files (it is created if necessary), the file of the variant i is "<i>_<kind>.wav";
+        SECONDS ("float"), RATE ("int") - the duration and the sampling rate of the variants that do not set them;
+        seed ("int" or None) - the seed of the batch: each variant without its own seed gets an independent seed derived from it ("numpy.random.SeedSequence.spawn"),
+            so the batch is reproducible regardless of the number of processes;
+        workers ("int" and greater than 0 or None) - number of processes. If None, the number of cores;
+        executor ("concurrent.futures.ProcessPoolExecutor" or None) - the pool of processes. If None, a pool is created for this call.
+    The result of the function:
+        Return values:
+            results ("list" of "dict") - the results of the variants in the order of "variants" (please refer to "write_variant").
+    '''
+
+    import concurrent.futures
+
+    os.makedirs(folder, exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(len(variants))
+    width = len(str(max(len(variants) - 1, 0)))
+
+    print(f"The beginning of the generation of {len(variants)} signals.")
+    start_time = time.perf_counter()
+
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+    try:
+        futures = []
+        for i, variant in enumerate(variants):
+            variant = {'SECONDS': SECONDS, 'RATE': RATE, **variant}
+            path_to_output = os.path.join(folder, f"{str(i).zfill(width)}_{variant['kind']}.wav")
+            futures.append(executor.submit(write_variant, path_to_output, variant, seeds[i]))
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+    wall_time = time.perf_counter() - start_time
+    frames = sum(result['frames'] for result in results)
+    print(f"The end of the generation: {frames} frames in {'%.3f' % wall_time} seconds ({'%.1f' % (frames/wall_time if wall_time > 0 else 0)} frames/second).\n")
+    return results
+
+if __name__ == "__main__":
+    variants = [
+        {'kind': 'white'},
+        {'kind': 'pink'},
+        {'kind': 'brown'},
+        {'kind': 'chirp', 'F_START': 20.0, 'F_STOP': 20000.0, 'method': 'linear'},
+        {'kind': 'chirp', 'F_START': 20.0, 'F_STOP': 20000.0, 'method': 'log'},
+        {'kind': 'impulses', 'PERIOD': 0.05},
+        {'kind': 'multitone', 'TONES': 64, 'CREST': 2.2}
+    ]
+    for result in synthetic_batch(variants, "../data/synthetic", SECONDS=10.0, RATE=44100, seed=2024):
+        print(f"\t{result['path']:<40} {result['frames']} frames, {'%.3f' % result['seconds']} seconds")
+
+    # The check of the multitone signal when CREST is not reached: the energy must stay on the bins of the tones, and the crest factor must be that of the returned period.
+    import sys
+    import fast_fourier_transform
+    RATE, TONES = 44100, 64
+    period, crest = multitone_period(RATE, np.random.default_rng(2024), TONES, CREST=1.6, spacing="log")
+    energy = np.abs(fast_fourier_transform.fft(period)[:int(MULTITONE_PERIOD/2) + 1])**2
+    bins = np.unique(np.clip(np.rint(np.geomspace(50.0, 0.45*RATE, TONES) * MULTITONE_PERIOD / RATE), 1, int(MULTITONE_PERIOD/2) - 1).astype(np.int64))
+    outside = 1 - energy[bins].sum()/energy.sum()
+    measured = np.abs(period).max()/np.sqrt(np.mean(period*period))
+    print(f"Multitone check: the energy outside the {bins.size} tones = {'%.1e' % outside}, crest factor {'%.3f' % crest} (measured {'%.3f' % measured}).")
+    if outside > 1e-9 or abs(crest - measured) > 1e-9:
+        sys.exit(1)
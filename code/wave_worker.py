@@ -1,109 +1,311 @@
 '''
 This module is used for working with wave files.
+The ".wav" files are read and written without the "wave" and "pyaudio" libraries, so the analysis modules do not depend on the audio library.
+Supported sound depths: 8, 16, 24 and 32 bits (integer PCM) and 32 bits (floating point).
 '''
 
-import wave
+import struct
 
-import pyaudio
 import numpy as np
 
 types = {
-    1: np.int8,
+    1: np.int8, # 8-bit data is stored unsigned, it is shifted to the range of "numpy.int8"
     2: np.int16,
+    3: np.int32, # 24-bit data is unpacked into "numpy.int32"
     4: np.int32
 }
 
-def convert_to_int16(frames):
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+CHUNK_FRAMES = 65536 # The number of frames converted and written to the ".wav" file at a time (size of the reusable output buffer)
+
+def convert_to_pcm(frames, SAMPLE_FORMAT=2, out=None):
+
+    '''
+    This function is used to convert signal data to the integer type of the sound depth (the type of "types") with clipping to the range of the sound depth.
+        Note: Clipping and conversion are performed in one pass, and the passed "frames" are not changed.
+    The following parameters are passed to the function:
+        frames ("numpy.ndarray") - value of the signal data;
+        SAMPLE_FORMAT ("int" 1, 2, 3 or 4) - sound depth in bytes (24-bit data is clipped to the range of 24 bits and stored in "numpy.int32");
+        out ("numpy.ndarray" with dtype=types[SAMPLE_FORMAT] and the same shape as "frames" or None) - the buffer in which the result will be written. If None, a new array will be allocated.
+    The result of the function:
+        Return values:
+            frames ("numpy.ndarray" with dtype=types[SAMPLE_FORMAT]) - value of the signal data.
+    '''
+
+    if out is None:
+        out = np.empty(shape=frames.shape, dtype=types[SAMPLE_FORMAT])
+
+    # All values greater than the maximum of the sound depth will be replaced with the maximum, all values less than the minimum will be replaced with the minimum.
+    np.clip(frames, -2**(8*SAMPLE_FORMAT - 1), 2**(8*SAMPLE_FORMAT - 1) - 1, out=out, casting='unsafe')
+    return out
+
+def convert_to_int16(frames, out=None):
 
     '''
     The "convert_to_int16" function converts "numpy.ndarray" with a type other than dtype="numpy.int16" to "numpy.ndarray" with dtype="numpy.int16".
+        Note: Clipping and conversion are performed in one pass, and the passed "frames" are not changed.
     The following parameters are passed to the function:
-        frames ("numpy.ndarray" with dtype unequal "numpy.int16") - value of the signal data with dtype unequal "numpy.int16".
+        frames ("numpy.ndarray" with dtype unequal "numpy.int16") - value of the signal data with dtype unequal "numpy.int16";
+        out ("numpy.ndarray" with dtype="numpy.int16" and the same shape as "frames" or None) - the buffer in which the result will be written. If None, a new array will be allocated.
     The result of the function:
         Return values:
             frames ("numpy.ndarray" with dtype="numpy.int16") - value of the signal data with dtype="numpy.int16".
     '''
 
     print(f'The "convert_to_int16" function has been launched.')
-    if frames.max() <= 32767 and frames.min() >= -32768:
-        # The frames values fall within the range of "numpy.int16" values. (Conversion without problems)
-        save_old_type = frames.dtype
-        frames = frames.astype(np.int16)
-        print(f'The type of the passed variable was changed from "numpy.{save_old_type}" to "numpy.{frames.dtype}" without any problems.')
-        return frames
+    if out is None:
+        out = np.empty(shape=frames.shape, dtype=np.int16)
+
+    # All values greater than 32767 will be replaced with 32767, all values less than -32768 will be replaced with -32768.
+    convert_to_pcm(frames, 2, out=out)
+    print(f'The type of the passed variable was changed from "numpy.{frames.dtype}" to "numpy.{out.dtype}" (values not in the range of "numpy.int16" were clipped).')
+    return out
+
+def encode_frames(frames, SAMPLE_FORMAT=2, IS_FLOAT=False):
+
+    '''
+    This function is used to convert signal data into the bytes of a ".wav" file. (note: It is used for "wave_write" but can also be used independently.)
+    The following parameters are passed to the function:
+        frames ("numpy.ndarray") - value of the signal data (values not in the range of the sound depth will be clipped);
+        SAMPLE_FORMAT ("int" 1, 2, 3 or 4) - sound depth in bytes;
+        IS_FLOAT ("bool") - if "True", the data will be stored as 32-bit floating point numbers (SAMPLE_FORMAT must be 4).
+    The result of the function:
+        Generator of "memoryview" - the bytes of the signal data in pieces of CHUNK_FRAMES values.
+            Note: The buffers are reused, so each piece is valid only until the next piece is received.
+    '''
+
+    frames = frames.reshape(-1)
+    size = min(CHUNK_FRAMES, frames.size)
+
+    if IS_FLOAT:
+        buffer = np.empty(shape=size, dtype=np.float32)
     else:
-        # The frames values do not fall within the range of "numpy.int16" values. (Conversion with data change)
-        print(f'The values of the passed variable that are not in the range of "numpy.int16" will be changed:')
-        print(f'\tAll values greater than 32767 will be replaced with 32767;')
-        print(f'\tAll values less than -32768 will be replaced with -32768.')
-        save_old_type = frames.dtype
-        frames[frames > 32767] = 32767 # All values greater than 32767 will be replaced with 32767
-        frames[frames < -32768] = -32768 # All values less than -32768 will be replaced with -32768
-        frames = frames.astype(np.int16)
-        print(f'The type of the passed variable was changed from "numpy.{save_old_type}" to "numpy.{frames.dtype}" with data change.')
-        return frames
+        buffer = np.empty(shape=size, dtype=types[SAMPLE_FORMAT])
+        if SAMPLE_FORMAT == 3:
+            packed = np.empty(shape=(size, 3), dtype=np.uint8) # Three bytes per number
+
+    for start in range(0, frames.size, CHUNK_FRAMES):
+        chunk = frames[start:start + CHUNK_FRAMES]
+        if chunk.dtype == buffer.dtype and SAMPLE_FORMAT in (2, 4):
+            # The data already has the required type, it is written without conversion.
+            yield memoryview(np.ascontiguousarray(chunk)).cast('B')
+            continue
+
+        out = buffer[:chunk.size]
+        if IS_FLOAT:
+            np.copyto(out, chunk, casting='unsafe')
+        else:
+            convert_to_pcm(chunk, SAMPLE_FORMAT, out=out)
+
+        if SAMPLE_FORMAT == 1:
+            # 8-bit data is stored unsigned (offset by 128).
+            out = out.view(np.uint8)
+            out ^= 0x80
+        elif SAMPLE_FORMAT == 3:
+            # The three low bytes of each little-endian "numpy.int32" are kept.
+            out = packed[:chunk.size]
+            out[...] = buffer[:chunk.size].view(np.uint8).reshape(-1, 4)[:, :3]
+
+        yield memoryview(out).cast('B')
+
+def decode_frames(raw, SAMPLE_FORMAT=2, IS_FLOAT=False):
+
+    '''
+    This function is used to convert the bytes of a ".wav" file into signal data. (note: It is used for "wave_read" but can also be used independently.)
+    The following parameters are passed to the function:
+        raw ("bytes" or "numpy.ndarray" with dtype="numpy.uint8") - the bytes of the signal data;
+        SAMPLE_FORMAT ("int" 1, 2, 3 or 4) - sound depth in bytes;
+        IS_FLOAT ("bool") - if "True", the data is stored as 32-bit floating point numbers.
+    The result of the function:
+        Return values:
+            data_signal ("numpy.ndarray" with dtype="np.int<depends on the sound depth>" or dtype="numpy.float32") - value of the signal data.
+    '''
+
+    raw = np.frombuffer(raw, dtype=np.uint8)
 
-def wave_write(FILENAME, FRAMES, RATE, CHANNELS):
+    if IS_FLOAT:
+        return raw.view(np.float32)
+    if SAMPLE_FORMAT == 1:
+        return np.bitwise_xor(raw, 0x80).view(np.int8)
+    if SAMPLE_FORMAT == 3:
+        # The three bytes are placed in the high bytes of "numpy.int32", the arithmetic shift restores the sign.
+        data_signal = np.zeros(shape=raw.size // 3, dtype=np.int32)
+        data_signal.view(np.uint8).reshape(-1, 4)[:, 1:] = raw[:data_signal.size * 3].reshape(-1, 3)
+        data_signal >>= 8
+        return data_signal
+    return raw.view(types[SAMPLE_FORMAT])
+
+def wave_info(FILENAME):
+
+    '''
+    This function is used to read the header of a wave file.
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav").
+    The result of the function:
+        Return values:
+            N_FRAMES ("int") - number of frames;
+            RATE ("int") - sampling rate in hertz;
+            CHANNELS ("int") - number of audio tracks;
+            SAMPLE_FORMAT ("int") - sound depth in bytes;
+            IS_FLOAT ("bool") - "True" if the data is stored as floating point numbers;
+            data_offset ("int") - position of the signal data in the file in bytes.
+    '''
+
+    with open(FILENAME, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f'The file "{FILENAME}" is not a wave file.')
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f'The file "{FILENAME}" does not contain signal data.')
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                format_tag, CHANNELS, RATE, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE:
+                    format_tag = struct.unpack('<H', fmt[24:26])[0] # The first two bytes of the subformat
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f'The file "{FILENAME}" does not contain a format description.')
+                data_offset = f.tell()
+                f.seek(0, 2)
+                data_size = min(chunk_size, f.tell() - data_offset) # The size may be unknown if the writing was interrupted
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1) # The chunks are aligned to two bytes
+
+    if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        raise ValueError(f'The format of the file "{FILENAME}" is not supported. Supported formats are integer PCM and 32-bit floating point.')
+
+    SAMPLE_FORMAT = block_align // CHANNELS
+    IS_FLOAT = format_tag == WAVE_FORMAT_IEEE_FLOAT
+    if SAMPLE_FORMAT not in types or (IS_FLOAT and SAMPLE_FORMAT != 4):
+        raise ValueError(f'The sound depth of the file "{FILENAME}" ({bits} bits) is not supported.')
+
+    N_FRAMES = data_size // block_align
+
+    return N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset
+
+def wave_write(FILENAME, FRAMES, RATE, CHANNELS, SAMPLE_FORMAT=2, IS_FLOAT=False):
 
     '''
     This function is used to write data to a wave file.
         Note: If the file does not exist, it will be created; if the file exists, its content will be overwritten.
     The following parameters are passed to the function:
         FILENAME ("str") - path to save the file and its name with ".wav" extension. (example: "../the_path_to_save_the_file/name_of_the_saved_file.wav");
-        FRAMES ("bytes" или "numpy.ndarray" with dtype="numpy.int16") - value of the signal data:
-            If the data type is "bytes":
-                Two bytes per number.
-            If the data type is "numpy.ndarray":
-                If a FRAMES with a dtype that is not "numpy.int16", then the signal data will be converted to this type using the "convert_to_int16" function.
+        FRAMES ("bytes", "numpy.ndarray" or an iterable of "numpy.ndarray") - value of the signal data:
+            If the data type is "bytes" ("bytearray" and "memoryview" are also supported):
+                SAMPLE_FORMAT bytes per number.
+            If the data type is "numpy.ndarray" (including "numpy.memmap"):
+                The signal data will be clipped to the range of the sound depth and converted. 
+                The data is written in pieces of CHUNK_FRAMES frames, so an array larger than RAM (a "numpy.memmap") can be written.
+            If the data is an iterable (for example, a generator) of "numpy.ndarray":
+                The pieces are written one after another, so a signal of any length can be written without keeping it in memory.
         RATE ("int" and greater than 0) - sampling rate in hertz. (note: 44100 is enough for a voice); 
-        CHANNELS ("int" and greater than 0) - number of audio tracks. (note: use 1 (mono sound)).
+        CHANNELS ("int" and greater than 0) - number of audio tracks. (note: use 1 (mono sound));
+        SAMPLE_FORMAT ("int" 1, 2, 3 or 4) - sound depth in bytes. (note: 2 bytes = 16 bits is used by default);
+        IS_FLOAT ("bool") - if "True", the data will be stored as 32-bit floating point numbers (SAMPLE_FORMAT must be 4).
     The result of the function will be a saved wave file according to the provided parameters.
     '''
 
-    SAMPLE_FORMAT = pyaudio.paInt16 # Sound depth = 16 bits = 2 bytes
-
-    if type(FRAMES) == np.ndarray:
-        # Checking "FRAMES" for compliance with the type "numpy.int16".
-        if (FRAMES.dtype != np.int16):
-            FRAMES = convert_to_int16(FRAMES)
-        
-        # Converting int to bytes for further writing to the ".wav" file.
-        FRAMES = FRAMES.tobytes()
+    if SAMPLE_FORMAT not in types or (IS_FLOAT and SAMPLE_FORMAT != 4):
+        raise ValueError(f'Writing data to the wave file is not possible due to an incorrect sound depth. Expected values are 1, 2, 3 or 4 bytes (4 bytes for floating point numbers).')
 
-    elif type(FRAMES) != bytes:
+    if isinstance(FRAMES, (bytes, bytearray, memoryview, np.ndarray)):
+        pieces = (FRAMES,)
+    elif hasattr(FRAMES, '__iter__'):
+        pieces = FRAMES
+    else:
         raise TypeError('Writing data to the wave file is not possible due to an incorrect data type for "FRAMES". Expected data types are "bytes" or "numpy.ndarray".')
 
-    # Creating ".wav" file and writing signal data to it in bytes.
-    with wave.open(FILENAME, 'wb') as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(pyaudio.get_sample_size(SAMPLE_FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(FRAMES)
+    format_tag = WAVE_FORMAT_IEEE_FLOAT if IS_FLOAT else WAVE_FORMAT_PCM
+    fmt_size = 18 if IS_FLOAT else 16 # The floating point format has an additional field (cbSize)
+    block_align = CHANNELS * SAMPLE_FORMAT
 
-def wave_read(FILENAME):
+    def header(data_size):
+        fmt = struct.pack('<4sIHHIIHH', b'fmt ', fmt_size, format_tag, CHANNELS, RATE, RATE * block_align, block_align, 8 * SAMPLE_FORMAT)
+        if IS_FLOAT:
+            fmt += struct.pack('<H4sII', 0, b'fact', 4, data_size // block_align)
+        riff_size = 4 + len(fmt) + 8 + data_size + data_size % 2
+        return struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE') + fmt + struct.pack('<4sI', b'data', data_size)
+
+    # Creating ".wav" file and writing signal data to it. (The header is updated when all the data has been written.)
+    with open(FILENAME, 'wb') as f:
+        f.write(header(0))
+        data_size = 0
+
+        for piece in pieces:
+            if isinstance(piece, np.ndarray):
+                # The data is written through a "memoryview" without copying it into "bytes".
+                for chunk in encode_frames(piece, SAMPLE_FORMAT, IS_FLOAT):
+                    data_size += f.write(chunk)
+            else:
+                data_size += f.write(piece)
+
+        if data_size % 2:
+            f.write(b'\x00') # The pad byte
+        f.seek(0)
+        f.write(header(data_size))
+
+def wave_read(FILENAME, USE_MMAP=False):
 
     '''
     This function is used to read data from a wave file.
     The following parameters are passed to the function:
-        FILENAME ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav").
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
+        USE_MMAP ("bool") - if "True", the signal data will be returned as a read-only "numpy.memmap" (the file is not read into memory).
+            Note: Only for 16-bit, 32-bit and floating point data; 8-bit and 24-bit data is always read into memory.
     The result of the function:
         Return values:
-            data_signal ("numpy.ndarray" with dtype="np.int<depends on the sound depth>") - value of the signal data;
+            data_signal ("numpy.ndarray" with dtype="np.int<depends on the sound depth>" or dtype="numpy.float32") - value of the signal data;
             N_FRAMES ("int") - number of frames;
             RATE ("int") - sampling rate in hertz;
             CHANNELS ("int") - number of audio tracks;
             SAMPLE_FORMAT ("int") - sound depth.
     '''
 
-    with wave.open(FILENAME, 'rb') as wf:
-        SAMPLE_FORMAT = wf.getsampwidth()
-        CHANNELS = wf.getnchannels()
-        RATE = wf.getframerate()
-        N_FRAMES = wf.getnframes()
-        data_signal = np.frombuffer(wf.readframes(N_FRAMES), dtype=types[SAMPLE_FORMAT]) # Reading the signal from the file and converting bytes to int
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_info(FILENAME)
+    count = N_FRAMES * CHANNELS
+
+    if SAMPLE_FORMAT in (2, 4):
+        dtype = np.float32 if IS_FLOAT else types[SAMPLE_FORMAT]
+        if USE_MMAP and count > 0:
+            data_signal = np.memmap(FILENAME, dtype=dtype, mode='r', offset=data_offset, shape=(count,))
+        else:
+            data_signal = np.fromfile(FILENAME, dtype=dtype, count=count, offset=data_offset)
+    else:
+        raw = np.fromfile(FILENAME, dtype=np.uint8, count=count * SAMPLE_FORMAT, offset=data_offset)
+        data_signal = decode_frames(raw, SAMPLE_FORMAT, IS_FLOAT)
 
     return data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT
 
+def wave_read_chunks(FILENAME, CHUNK=CHUNK_FRAMES):
+
+    '''
+    This function is used to read data from a wave file in pieces (the file is not read into memory entirely).
+    The following parameters are passed to the function:
+        FILENAME ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
+        CHUNK ("int" and greater than 0) - number of frames in one piece.
+    The result of the function:
+        Generator of "numpy.ndarray" with dtype="np.int<depends on the sound depth>" or dtype="numpy.float32" - value of the signal data in pieces of CHUNK frames (the last piece may be shorter).
+    '''
+
+    N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT, IS_FLOAT, data_offset = wave_info(FILENAME)
+    block_align = CHANNELS * SAMPLE_FORMAT
+
+    with open(FILENAME, 'rb') as f:
+        f.seek(data_offset)
+        for start in range(0, N_FRAMES, CHUNK):
+            raw = f.read(min(CHUNK, N_FRAMES - start) * block_align)
+            yield decode_frames(raw, SAMPLE_FORMAT, IS_FLOAT)
+
 def wave_concatenate(FILENAMES = None, FILENAME_Output = "../data/concatenated_signal.wav"):
 
     '''
@@ -137,7 +339,7 @@ def wave_concatenate(FILENAMES = None, FILENAME_Output = "../data/concatenated_s
     else:
         FILENAME_Output = "./" + FILENAME_Output
 
-    frames = np.array([], dtype=np.int16)
+    frames = []
     rate = []
     channels = []
     sample_format = []
@@ -145,13 +347,13 @@ def wave_concatenate(FILENAMES = None, FILENAME_Output = "../data/concatenated_s
     for file_name in FILENAMES:
         data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = wave_read(file_name)
         
-        frames = np.concatenate([frames, data_signal])
+        frames.append(data_signal)
         rate.append(RATE)
         channels.append(CHANNELS)
         sample_format.append(SAMPLE_FORMAT)
 
     if len(set(rate)) == 1 and len(set(channels)) == 1 and len(set(sample_format)) == 1:
-        wave_write(FILENAME_Output, frames, rate[0], channels[0])
+        wave_write(FILENAME_Output, frames, rate[0], channels[0], sample_format[0], frames[0].dtype == np.float32) # The signals are written one after another without joining them in memory
     else:
         raise ValueError(f'Invalid audio parameters: different sample rates, channel counts, or sample formats in the concatenated signals.')
 
@@ -170,3 +372,9 @@ if __name__ == "__main__":
 
     print(f"\nThe data read from the file after their concatenation:")
     print(wave_read(filename_out))
+
+    filename_24bit = "../data/test_24bit.wav"
+    wave_write(filename_24bit, data_signal * 1000, rate, channels, SAMPLE_FORMAT=3)
+
+    print(f"\nThe data read from the 24-bit file:")
+    print(wave_read(filename_24bit))
@@ -0,0 +1,118 @@
+'''
+This module is used to get the windows applied to a signal before the discrete Fourier transform (a recording cut off without a window is a rectangular window, whose spectrum leaks far from the tones).
+The windows are periodic (the window of N frames is the first N frames of a symmetric window of N+1 frames), as usual for spectral analysis:
+    "rectangular" - no window;
+    "hann", "hamming" - moderate leakage, narrow peaks;
+    "blackman_harris" - the 4-term Blackman-Harris window, very low leakage (-92 dB), wide peaks;
+    "kaiser" - the leakage is set by the parameter beta (more - lower leakage and wider peaks);
+    "flat_top" - the amplitude of a tone between two bins is measured with an error below 0.01 dB (the widest peaks).
+A window reduces the amplitude of the tones by its mean value (coherent gain), so the normalized amplitude is 2*abs(FT)/(N_FRAMES*coherent_gain) (function "window_amplitude").
+The coefficients are calculated once for each (window, length, dtype) and cached (read-only arrays), and "apply_window" multiplies the signal by the window
+    and converts it to the type of the transform in one pass (integer frames are not copied to a floating point array first).
+'''
+
+import numpy as np
+
+KAISER_BETA = 8.6 # Parameter of the Kaiser window by default (the leakage is close to that of the Blackman-Harris window)
+
+COSINE_WINDOWS = { # Coefficients a_m of the windows sum((-1)**m * a_m * cos(2*pi*m*n/N))
+    'hann': (0.5, 0.5),
+    'hamming': (0.54, 0.46),
+    'blackman_harris': (0.35875, 0.48829, 0.14128, 0.01168),
+    'flat_top': (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368)
+}
+WINDOWS = ('rectangular',) + tuple(COSINE_WINDOWS) + ('kaiser',)
+window_cache = {} # The coefficients of the windows for each (window, N_FRAMES, dtype, beta)
+
+def window_coefficients(window="hann", N_FRAMES=1024, dtype=np.float64, beta=KAISER_BETA):
+
+    '''
+    This function is used to get the coefficients of a window (calculated once and cached).
+    The following parameters are passed to the function:
+        window ("str" - one of WINDOWS, or "numpy.ndarray") - the window (an array is returned as is, converted to dtype);
+        N_FRAMES ("int" and greater than 0) - number of frames of the window;
+        dtype ("numpy.dtype") - the type of the coefficients ("numpy.float64" or "numpy.float32");
+        beta ("float") - parameter of the Kaiser window.
+    The result of the function:
+        Return values:
+            coefficients ("numpy.ndarray" with the dtype "dtype") - the coefficients of the window (read-only, shared between the calls).
+    '''
+
+    if type(window) == np.ndarray:
+        return window.astype(dtype, copy=False)
+
+    key = (window, N_FRAMES, np.dtype(dtype), beta if window == 'kaiser' else None)
+    if key in window_cache:
+        return window_cache[key]
+
+    if window == 'rectangular':
+        coefficients = np.ones(shape=N_FRAMES)
+    elif window in COSINE_WINDOWS:
+        angle = 2*np.pi*np.arange(N_FRAMES)/N_FRAMES
+        coefficients = np.zeros(shape=N_FRAMES)
+        for m, a in enumerate(COSINE_WINDOWS[window]):
+            coefficients += (-1)**m * a * np.cos(m*angle)
+    elif window == 'kaiser':
+        coefficients = np.kaiser(N_FRAMES + 1, beta)[:-1]
+    else:
+        raise ValueError(f'The window "{window}" is not supported. Available windows: {", ".join(WINDOWS)}.')
+
+    coefficients = coefficients.astype(dtype)
+    coefficients.setflags(write=False)
+    window_cache[key] = coefficients
+    return coefficients
+
+def coherent_gain(window="hann", N_FRAMES=1024, beta=KAISER_BETA):
+
+    '''
+    This function is used to get the coherent gain of a window: the mean value of its coefficients (1 for the rectangular window, 0.5 for the Hann window).
+        The amplitude of a tone in the spectrum of the windowed signal is multiplied by this value.
+    '''
+
+    return float(np.mean(window_coefficients(window, N_FRAMES, np.float64, beta))) if N_FRAMES > 0 else 1.0
+
+def apply_window(frames, window="hann", out=None, beta=KAISER_BETA):
+
+    '''
+    This function is used to multiply frames by a window (the last axis of "frames" is the axis of the window, for example, one segment per row).
+    The following parameters are passed to the function:
+        frames ("numpy.ndarray") - signal data (integer or floating point);
+        window ("str" - one of WINDOWS, or "numpy.ndarray") - the window;
+        out ("numpy.ndarray" with a floating point or complex dtype, or None) - the array for the result (can be "frames" itself if it is floating point).
+            If None, an array with dtype="numpy.float64" is created. For a complex "out", the window is written to the real part and the imaginary part is set to zero;
+        beta ("float") - parameter of the Kaiser window.
+    The result of the function:
+        Return values:
+            windowed ("numpy.ndarray") - the windowed frames (the "out" array if it was passed).
+    '''
+
+    frames = np.asarray(frames)
+    if out is None:
+        out = np.empty(shape=frames.shape, dtype=np.float64)
+
+    target = out
+    if out.dtype.kind == 'c':
+        out.imag = 0
+        target = out.real # The view of the real part, the product is written there without a temporary array
+
+    coefficients = window_coefficients(window, frames.shape[-1], np.float32 if target.dtype == np.float32 else np.float64, beta)
+    np.multiply(frames, coefficients, out=target, casting='unsafe') # The integer frames are converted inside the multiplication
+    return out
+
+def window_amplitude(FT, N_FRAMES, window="rectangular", beta=KAISER_BETA):
+
+    '''
+    This function is used to normalize the amplitude of the spectrum of a windowed signal: 2*abs(FT)/(N_FRAMES*coherent_gain).
+        With the rectangular window, it is the usual normalized amplitude 2*abs(FT)/N_FRAMES.
+    '''
+
+    return 2*abs(FT)/(N_FRAMES*coherent_gain(window, N_FRAMES, beta))
+
+if __name__ == "__main__":
+    import fast_fourier_transform
+
+    RATE, N_FRAMES = 8000, 4096
+    data_signal = (10000*np.sin(2*np.pi*1000.5*RATE/N_FRAMES*np.arange(N_FRAMES)/RATE)).astype(np.int16) # The tone between two bins
+    for window in WINDOWS:
+        amplitude = window_amplitude(fast_fourier_transform.fft(apply_window(data_signal, window))[:int(N_FRAMES/2) + 1], N_FRAMES, window)
+        print(f"{window:<16} coherent gain = {'%.4f' % coherent_gain(window, N_FRAMES)}, peak amplitude = {'%8.1f' % amplitude.max()}, leakage 100 bins away = {'%6.1f' % (20*np.log10(amplitude[1100]/amplitude.max()))} dB")
@@ -0,0 +1,137 @@
+'''
+This module is used to calculate the discrete Fourier transform in a narrow frequency band with a chosen resolution (zoom FFT), normalize the result and plot it on a graph (the graph is plotted if necessary).
+The transform is calculated by the chirp-z algorithm (Bluestein's algorithm) using "fft" from "fast_fourier_transform.py" and "ifft" from "inverse_fast_fourier_transform.py":
+    M values in the band [f1, f2] are calculated for N frames in O((N+M)*log(N+M)) operations, the amount of data does not have to be a power of two.
+Unlike slicing the spectrum of "fast_fourier_transform", the step between the frequencies is not limited by RATE/N_FRAMES (for example, the notes of "signal_generator_sequence" can be inspected with a step of less than one hertz).
+'''
+
+import time # Used to calculate the time spent on the zoom FFT
+
+import numpy as np
+
+import wave_worker
+import fast_fourier_transform
+import inverse_fast_fourier_transform
+
+def czt(data_signal, M, w, a=1.0+0j, PERIOD=None):
+
+    '''
+    This function is used to calculate the chirp-z transform X[k] = sum(data_signal[n] * a**(-n) * w**(n*k)), k = 0 ... M-1, using the fast Fourier transform.
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        M ("int" and greater than 0) - number of calculated values;
+        w ("complex") - ratio between the points of the contour (for the zoom FFT: exp(-2j*pi*step/RATE));
+        a ("complex") - starting point of the contour (for the zoom FFT: exp(2j*pi*f1/RATE));
+        PERIOD ("int" and greater than 0 or None) - if w = exp(-2j*pi/PERIOD) or exp(2j*pi/PERIOD), the period of w**n (the phase of the chirp is reduced exactly, please refer below).
+    The result of the function:
+        Return values:
+            X ("numpy.ndarray" with dtype="numpy.complex128") - values of the chirp-z transform.
+    '''
+
+    N_FRAMES = len(data_signal)
+    L = 1 << (N_FRAMES + M - 2).bit_length() # The power of two not less than N_FRAMES + M - 1 (the size of the fast Fourier transform)
+
+    # w**(n*n/2) is calculated through the angle of w. In general, the error of the angle is multiplied by n*n, so the error of the phase grows with n*n.
+    # If the period of w**n is known, w**(n*n/2) is periodic in n*n with the period 2*PERIOD, and n*n is reduced in integers, so the phase is accurate for long signals.
+    theta = -np.angle(w)
+    n = np.arange(max(N_FRAMES, M), dtype=np.int64)
+    chirp = np.exp(-0.5j*theta*(n*n if PERIOD is None else (n*n) % (2*PERIOD))) # w**(n*n/2)
+
+    y = np.zeros(shape=L, dtype=np.complex128)
+    y[:N_FRAMES] = data_signal * a**(-np.arange(N_FRAMES)) * chirp[:N_FRAMES]
+
+    v = np.zeros(shape=L, dtype=np.complex128)
+    v[:M] = 1/chirp[:M] # w**(-m*m/2)
+    v[L - N_FRAMES + 1:] = 1/chirp[1:N_FRAMES][::-1]
+
+    convolution = inverse_fast_fourier_transform.ifft(fast_fourier_transform.fft(y) * fast_fourier_transform.fft(v))
+
+    return convolution[:M] * chirp[:M]
+
+def zoom_fft(data_signal, f1, f2, M, RATE):
+
+    '''
+    This function is used to calculate the discrete Fourier transform at M frequencies evenly spaced in the band [f1, f2].
+    The following parameters are passed to the function:
+        data_signal ("numpy.ndarray") - signal data;
+        f1, f2 ("int" or "float", 0 <= f1 < f2 <= RATE) - the band in hertz;
+        M ("int" and greater than 1) - number of frequencies in the band (the step is (f2 - f1)/(M - 1) hertz);
+        RATE ("int" and greater than 0) - sampling rate in hertz.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform at the frequencies;
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - the frequencies in hertz.
+    '''
+
+    step = (f2 - f1)/(M - 1)
+    w = np.exp(-2j*np.pi*step/RATE)
+    a = np.exp(2j*np.pi*f1/RATE)
+
+    FT = czt(data_signal, M, w, a)
+    frequency = f1 + np.arange(M)*step
+
+    return FT, frequency
+
+def zoom_fourier_transform(path_to_signal="../data/input_signal.wav", f1=0.0, f2=3000.0, M=3001, need_to_plot=False):
+
+    '''
+    This function allows you to calculate the discrete Fourier transform in the band [f1, f2] (zoom FFT) for a signal from a file with the extension ".wav", normalize the result of this transformation and plot the result on a graph (the graph is plotted if necessary).
+    The following parameters are passed to the function:
+        path_to_signal ("str") - the path where the file is stored and its name with the extension ".wav". (example: "../the_path_where_the_file_is_stored/file_name.wav");
+        f1, f2 ("int" or "float", 0 <= f1 < f2 <= RATE/2) - the band in hertz;
+        M ("int" and greater than 1) - number of frequencies in the band (the step is (f2 - f1)/(M - 1) hertz);
+        need_to_plot ("bool") - if "True", the "building_a_fourier_transform_graph" function will be called, if "False", the "building_a_fourier_transform_graph" function will not be called.
+    The result of the function:
+        Return values:
+            FT ("numpy.ndarray" with dtype="numpy.complex128") - values of the discrete Fourier transform in the band;
+            amplitude ("numpy.ndarray" with dtype="numpy.float64") - signal amplitude (normalized as in "fast_fourier_transform");
+            frequency ("numpy.ndarray" with dtype="numpy.float64") - signal frequency in hertz.
+        Discrete Fourier transform graph (if "need_to_plot" = True):
+            Please refer to the result of the "building_a_fourier_transform_graph" function implemented in the "building_a_fourier_transform_graph.py" file.
+    '''
+
+    # Checking for the correctness of the input data
+    if type(path_to_signal) != str or '.wav' not in path_to_signal:
+        path_to_signal = "../data/input_signal.wav"
+        print(f'The path to the signal for zoom_fourier_transform is specified incorrectly. The default value is set:\n\t path_to_signal = "{path_to_signal}"')
+
+    if type(M) != int or M <= 1:
+        M = 3001
+        print(f'The number of frequencies is specified incorrectly. The default value is set:\n\t M = {M}')
+
+    if type(need_to_plot) != bool:
+        need_to_plot = False
+        print(f'The boolean key value "need_to_plot" is specified incorrectly. The default value is set:\n\t need_to_plot = "{need_to_plot}"')
+
+    data_signal, N_FRAMES, RATE, CHANNELS, SAMPLE_FORMAT = wave_worker.wave_read(path_to_signal)
+
+    if not 0 <= f1 < f2 <= RATE/2:
+        f1, f2 = 0.0, min(3000.0, RATE/2)
+        print(f'The band is specified incorrectly (0 <= f1 < f2 <= {RATE/2}). The default value is set:\n\t f1 = {f1}, f2 = {f2}')
+
+    print(f"Info about zoom Fourier transform:")
+    print(f"\tSampling rate = {RATE}")
+    print(f"\tBand = {f1} - {f2} Hz")
+    print(f"\tStep = {(f2 - f1)/(M - 1)} Hz (the step of the full spectrum is {RATE/N_FRAMES} Hz)")
+
+    print(f"The beginning of the calculation of the zoom fast Fourier transform.")
+    start_time = time.time() # Starting the stopwatch
+
+    FT, frequency = zoom_fft(data_signal, f1, f2, M, RATE)
+
+    end_time = time.time() - start_time # Stopping the stopwatch
+    print(f"The end of the calculation of the zoom fast Fourier transform. Time spent {'%.3f' % end_time} seconds.\n")
+
+    amplitude = abs(FT) # Unnormalized signal amplitude
+    amplitude = 2*amplitude/N_FRAMES # Normalized signal amplitude
+
+    if need_to_plot == True:
+        import building_a_fourier_transform_graph # "matplotlib" is loaded only when the graph is needed
+        building_a_fourier_transform_graph.building_a_fourier_transform_graph(frequency, amplitude, path_to_signal) # Plotting a discrete Fourier transform
+
+    return (FT, amplitude, frequency)
+
+if __name__ == "__main__":
+    # The 440 Hz tone with a step of 0.01 Hz (the step of the full spectrum of this file is about 0.17 Hz).
+    FT, amplitude, frequency = zoom_fourier_transform("../data/examples/signal_440hz_duration_5s-95ms.wav", 435.0, 445.0, 1001)
+    print(f"The strongest frequency: {frequency[np.argmax(amplitude)]} Hz")